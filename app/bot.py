@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import cast
 from uuid import UUID
@@ -7,13 +8,22 @@ from discord.ext import commands
 from discord.interactions import Interaction
 
 from .core import ui
-from .core.wordle import UnequalInLengthError, WordleGame
+from .core.leaderboard import LeaderboardMetric, leaderboard
+from .core.solver import PatternMatrixMissingError, get_solver
+from .core.wordle import (
+    UnequalInLengthError,
+    WordleGame,
+    WordleGameNotFoundError,
+)
 from .models.wordle import Wordle, WordleStatus
 from .settings import BotSettings, settings
-from .storage.guess import guess_repo
+from .storage.archive import archive_repo
+from .storage.guess_writer import guess_writer
 from .storage.player import player_repo
-from .storage.trivia import trivia_repo
+from .storage.player_stats import player_stats_repo
+from .storage.trivia_pool import trivia_pool
 from .storage.wordle import wordle_repo
+from .word_generator import wordgen_loader
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +35,20 @@ class Bot(commands.Bot):
         self.settings = settings
         super().__init__(settings.COMMAND_PREFIX, intents=Intents.default())
 
+    async def setup_hook(self) -> None:
+        """Overriden method setup_hook."""
+        wordgen_loader.start()
+        trivia_pool.start()
+        leaderboard.start()
+        archive_repo.start()
+
+    async def close(self) -> None:
+        """Overriden method close, committing the queued guesses first."""
+        await archive_repo.stop()
+        await leaderboard.stop()
+        await guess_writer.stop()
+        await super().close()
+
     async def on_ready(self) -> None:
         """Overriden method on_ready."""
         logger.warning(
@@ -71,9 +95,13 @@ async def start_wordle(interaction: Interaction[Client]) -> None:
     description="make a guess on the wordle",
     guild=Object(id=settings.GUILD_ID),
 )
-async def guess(interaction: Interaction[Client], word: str) -> None:
+async def guess(interaction: Interaction[Client], word: str) -> None:  # noqa: PLR0911
     """User guess the wordle."""
-    wordle_game = WordleGame()
+    # awaiting the build would outlive the interaction
+    if not wordgen_loader.ready:
+        await interaction.response.send_message(ui.LOADING_MESSAGE)
+        return
+    wordle_game = WordleGame(wordgen_loader.get())
 
     if not wordle_game.check_valid_word(word=word.upper()):
         await interaction.response.send_message(
@@ -92,7 +120,7 @@ async def guess(interaction: Interaction[Client], word: str) -> None:
     match wordle.status:
         case WordleStatus.ACTIVE.value:
             try:
-                await wordle_game.guess(
+                remaining = await wordle_game.guess(
                     user_id=interaction.user.id,
                     guess=word.upper(),
                 )
@@ -106,6 +134,7 @@ async def guess(interaction: Interaction[Client], word: str) -> None:
                     guesses=await wordle_repo.get_guesses(
                         user_id=interaction.user.id
                     ),
+                    remaining=remaining,
                 )
 
                 await interaction.response.send_message(embed=embed)
@@ -121,10 +150,10 @@ async def guess(interaction: Interaction[Client], word: str) -> None:
 
     if not (await wordle_game.check_guess(interaction.user.id)):
         await wordle_game.wrong_guess(id=wordle.id)
-        wordle = await wordle_repo.get_pending_wordle(interaction.user.id)
+        pending = await wordle_repo.get_pending_wordle(interaction.user.id)
 
-        if wordle:
-            await trivial(interaction=interaction, wordle_id=wordle.id)
+        if pending:
+            await trivial(interaction=interaction, wordle_id=pending.id)
             return
     else:
         results = await wordle_repo.get_guesses(interaction.user.id)
@@ -135,6 +164,36 @@ async def guess(interaction: Interaction[Client], word: str) -> None:
         await wordle_game.win(interaction.user.id)
 
 
+@bot.tree.command(
+    name="best-guess",
+    description="Suggest the most informative guesses",
+    guild=Object(id=settings.GUILD_ID),
+)
+async def best_guess(interaction: Interaction[Client]) -> None:
+    """Suggest the guesses that narrow down the word the most."""
+    wordle = await wordle_repo.get_ongoing_wordle(interaction.user.id)
+    if wordle is None:
+        message = "Please start the wordle game before asking for a guess."
+        await interaction.response.send_message(message)
+        return
+
+    await interaction.response.defer()
+    solver = get_solver(await wordgen_loader.wait())
+    history = [(guess.content, list(guess.result)) for guess in wordle.guesses]
+    try:
+        ranked = await asyncio.to_thread(
+            solver.rank, len(wordle.word), history
+        )
+    except PatternMatrixMissingError:
+        message = "The solver is not ready for words of this length yet."
+        await interaction.followup.send(message)
+        return
+
+    await interaction.followup.send(
+        embed=ui.BestGuessEmbed(user=interaction.user, ranked=ranked)
+    )
+
+
 @bot.tree.command(
     name="end-wordle",
     description="end the current wordle game",
@@ -142,20 +201,17 @@ async def guess(interaction: Interaction[Client], word: str) -> None:
 )
 async def end_wordle(interaction: Interaction[Client]) -> None:
     """User end the current wordle game."""
-    if await wordle_repo.get_active_wordle_by_user_id(
-        user_id=interaction.user.id,
-    ) or await wordle_repo.get_pending_wordle(user_id=interaction.user.id):
-        await interaction.response.send_message("The current game ends")
-
+    try:
         await WordleGame().end(interaction.user.id)
-
-    else:
+    except WordleGameNotFoundError:
         await interaction.response.send_message("You are not in a game yet.")
+    else:
+        await interaction.response.send_message("The current game ends")
 
 
 async def trivial(interaction: Interaction[Client], wordle_id: UUID) -> None:
     """Show the trivial question."""
-    trivia_ques = await trivia_repo.get_random()
+    trivia_ques = await trivia_pool.get_random(user_id=interaction.user.id)
 
     view = ui.TrivialSelectionView(
         correct_answer=trivia_ques.correct_answer,
@@ -184,15 +240,7 @@ async def trivial(interaction: Interaction[Client], wordle_id: UUID) -> None:
 )
 async def show_player_stats(interaction: Interaction[Client]) -> None:
     """Show the player stats."""
-    wordles = await wordle_repo.get_by_user_id(interaction.user.id)
-    wins = [
-        wordle
-        for wordle in wordles
-        if wordle.status == WordleStatus.COMPLETED.value
-    ]
-    num_guesses = await guess_repo.count_by_wordle_ids(
-        [wordle.id for wordle in wordles]
-    )
+    stats = await player_stats_repo.get(interaction.user.id)
     player = await player_repo.get(interaction.user.id)
     player_id = player.id if player else interaction.user.id
     player_name = player.display_name if player else "unknown"
@@ -200,9 +248,54 @@ async def show_player_stats(interaction: Interaction[Client]) -> None:
         embed=ui.PlayerStatEmbed(
             player_id,
             player_name,
-            len(wordles),
-            len(wins),
-            num_guesses,
+            stats.games if stats else 0,
+            stats.wins if stats else 0,
+            stats.guesses if stats else 0,
+            stats.histogram if stats else {},
+        )
+    )
+
+
+@bot.tree.command(
+    name="leaderboard",
+    description="Show the best players",
+    guild=Object(id=settings.GUILD_ID),
+)
+async def show_leaderboard(
+    interaction: Interaction[Client],
+    metric: LeaderboardMetric = LeaderboardMetric.WINS,
+) -> None:
+    """Show the best players of a metric."""
+    standings = leaderboard.top(metric, ui.LeaderboardEmbed.TOP)
+    user_ids = [standing.user_id for standing in standings]
+    players = await player_repo.get_many(user_ids) if user_ids else []
+    await interaction.response.send_message(
+        embed=ui.LeaderboardEmbed(
+            metric,
+            standings,
+            {player.id: player.display_name for player in players},
+        )
+    )
+
+
+@bot.tree.command(
+    name="rank",
+    description="Show your ranks on the leaderboards",
+    guild=Object(id=settings.GUILD_ID),
+)
+async def show_rank(interaction: Interaction[Client]) -> None:
+    """Show the ranks of the player."""
+    await interaction.response.send_message(
+        embed=ui.RankEmbed(
+            interaction.user,
+            {
+                metric: leaderboard.standing(metric, interaction.user.id)
+                for metric in LeaderboardMetric
+            },
+            {
+                metric: len(ranking)
+                for metric, ranking in leaderboard.rankings.items()
+            },
         )
     )
 
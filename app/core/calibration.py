@@ -0,0 +1,185 @@
+"""Difficulty calibration by simulated games.
+
+Every word is played against by a deterministic solver:
+it opens with a given word,
+then always guesses the first word still consistent with the feedback,
+in a shuffled order of the words of that length.
+An opener and an order play one game against every answer at once,
+by splitting the answers by feedback pattern, guess after guess.
+The expected guess count of a word is its mean over the games,
+WordGenerator.random() buckets the difficulties by it.
+
+Run with ``python -m app.core.calibration``.
+"""
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import numpy.typing as npt
+
+from app.core.scoring import Codes, encode_words, score_codes
+from app.core.solver import pack_patterns, pack_result
+from app.enums import MatchResult
+from app.word_generator import Difficulty, WordGenerator, get_wordgen
+
+logger = logging.getLogger(__name__)
+
+GAMES: Final[int] = 1000
+GAMES_PER_TASK: Final[int] = 16
+SEED: Final[int] = 2024
+
+Guesses = npt.NDArray[np.uint16]
+
+
+def play(codes: Codes, opener: int, order: npt.NDArray[np.intp]) -> Guesses:
+    """Number of guesses the solver needs to find every answer."""
+    guesses = np.zeros(len(codes), dtype=np.uint16)
+    solved = pack_result(
+        [MatchResult.CORRECT_LETTER_CORRECT_POSITION] * codes.shape[1]
+    )
+    pending = [(opener, order, 1)]
+    while pending:
+        guess, answers, depth = pending.pop()
+        patterns = pack_patterns(score_codes(codes[guess], codes[answers]))
+        hit = patterns == solved
+        guesses[answers[hit]] = depth
+        answers, patterns = answers[~hit], patterns[~hit]
+        if not len(answers):
+            continue
+        # a stable sort keeps every group in the shuffled order
+        ordered = np.argsort(patterns, kind="stable")
+        answers, patterns = answers[ordered], patterns[ordered]
+        splits = np.flatnonzero(patterns[1:] != patterns[:-1]) + 1
+        for group in np.split(answers, splits):
+            if len(group) == 1:
+                guesses[group[0]] = depth + 1
+            else:
+                pending.append((group[0], group, depth + 1))
+    return guesses
+
+
+def play_games(
+    codes: Codes,
+    seeds: list[tuple[int, ...]],
+) -> npt.NDArray[np.float64]:
+    """Total guesses of every answer over the games of the given seeds."""
+    total = np.zeros(len(codes))
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(codes))
+        total += play(codes, int(order[0]), order)
+    return total
+
+
+_worker_codes: dict[int, Codes] = {}
+
+
+def _init_worker(codes: dict[int, Codes]) -> None:
+    _worker_codes.update(codes)
+
+
+def _play_task(
+    task: tuple[int, list[tuple[int, ...]]],
+) -> tuple[int, npt.NDArray[np.float64]]:
+    length, seeds = task
+    return length, play_games(_worker_codes[length], seeds)
+
+
+def calibrate(
+    wordgen: WordGenerator,
+    games: int = GAMES,
+    workers: int | None = None,
+) -> dict[int, dict[str, float]]:
+    """Expected guess count of every word, by word length."""
+    words = {
+        length: [word for diff in Difficulty for word in by_difficulty[diff]]
+        for length, by_difficulty in wordgen.mp_len_words.items()
+    }
+    words = {length: bank for length, bank in words.items() if bank}
+    codes = {length: encode_words(bank) for length, bank in words.items()}
+    tasks = [
+        (
+            length,
+            [
+                (SEED, length, game)
+                for game in range(start, min(start + GAMES_PER_TASK, games))
+            ],
+        )
+        for length in codes
+        for start in range(0, games, GAMES_PER_TASK)
+    ]
+    totals = {length: np.zeros(len(bank)) for length, bank in codes.items()}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(codes,),
+    ) as pool:
+        for length, total in pool.map(_play_task, tasks):
+            totals[length] += total
+    return {
+        length: dict(
+            zip(words[length], (totals[length] / games).tolist(), strict=True)
+        )
+        for length in codes
+    }
+
+
+def write_calibration(
+    path: str | Path,
+    wordgen: WordGenerator,
+    games: int,
+    expected: dict[int, dict[str, float]],
+) -> None:
+    """Save the expected guess counts for the word bank they belong to."""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {
+                "checksum": wordgen.bank.checksum,
+                "games": games,
+                "lengths": {
+                    str(length): {
+                        word: round(guesses, 4)
+                        for word, guesses in table.items()
+                    }
+                    for length, table in expected.items()
+                },
+            }
+        )
+    )
+    tmp_path.replace(path)
+
+
+def main() -> None:
+    """Calibrate the word bank from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=GAMES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--output", type=Path, default=Path(WordGenerator.CALIBRATION_PATH)
+    )
+    args = parser.parse_args()
+
+    wordgen = get_wordgen()
+    started = time.perf_counter()
+    expected = calibrate(wordgen, args.games, args.workers)
+    write_calibration(args.output, wordgen, args.games, expected)
+    logger.info(
+        "[calibration] %d words x %d games in %.1fs, saved to %s",
+        sum(map(len, expected.values())),
+        args.games,
+        time.perf_counter() - started,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
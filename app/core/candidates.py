@@ -0,0 +1,188 @@
+import math
+from collections.abc import Sequence
+from typing import Final
+from uuid import UUID
+
+import numpy as np
+
+from app.core.scoring import DEVIATED_THRESHOLD, encode_words
+from app.enums import MatchResult
+from app.word_generator import Difficulty, WordGenerator
+
+
+class CandidateIndex:
+    """Per-position letter bitsets over every word of a length.
+
+    Bit i of a bitset stands for the i-th word,
+    narrowing the candidates down is a few ANDs of python ints.
+    The five-colour feedback only looks at letters one at a time,
+    every code of a guess letter translates into one bitset:
+
+    - 💚 the letter is at this position
+    - 💛 the letter is in the word, not at this position
+    - 💙 the letter is not in the word, a deviated one is at this position
+    - 💜 the letter is not in the word, a deviated one is elsewhere only
+    - ❤️  neither the letter nor a deviated one is in the word
+    """
+
+    def __init__(self, words: Sequence[str]) -> None:
+        self.words: list[str] = [word.upper() for word in words]
+        self.all: int = (1 << len(self.words)) - 1
+        self.positions: list[dict[str, int]] = []
+        self.present: dict[str, int] = {}
+        self._near_at: dict[tuple[int, str], int] = {}
+        self._near_any: dict[str, int] = {}
+        if not self.words:
+            return
+
+        codes = encode_words(self.words)
+        for position in range(codes.shape[1]):
+            column = codes[:, position]
+            bitsets = {
+                chr(char): self._bitset(column == char)
+                for char in np.unique(column)
+            }
+            self.positions.append(bitsets)
+            for char, bitset in bitsets.items():
+                self.present[char] = self.present.get(char, 0) | bitset
+
+    @staticmethod
+    def _bitset(mask: np.ndarray) -> int:
+        return int.from_bytes(
+            np.packbits(mask, bitorder="little").tobytes(), "little"
+        )
+
+    def _deviated(self, char: str) -> list[str]:
+        return [
+            other
+            for other in self.present
+            if abs(ord(other) - ord(char)) < DEVIATED_THRESHOLD
+        ]
+
+    def near_at(self, position: int, char: str) -> int:
+        """Words with the char or a deviated one at the position."""
+        key = (position, char)
+        if key not in self._near_at:
+            bitset = 0
+            for other in self._deviated(char):
+                bitset |= self.positions[position].get(other, 0)
+            self._near_at[key] = bitset
+        return self._near_at[key]
+
+    def near_any(self, char: str) -> int:
+        """Words with the char or a deviated one anywhere."""
+        if char not in self._near_any:
+            bitset = 0
+            for other in self._deviated(char):
+                bitset |= self.present[other]
+            self._near_any[char] = bitset
+        return self._near_any[char]
+
+    def narrow(
+        self, candidates: int, guess: str, result: Sequence[int]
+    ) -> int:
+        """Keep the candidates that would give this result to the guess."""
+        for position, (char, code) in enumerate(
+            zip(guess.upper(), result, strict=False)
+        ):
+            at = self.positions[position].get(char, 0)
+            anywhere = self.present.get(char, 0)
+            match code:
+                case MatchResult.CORRECT_LETTER_CORRECT_POSITION:
+                    candidates &= at
+                case MatchResult.CORRECT_LETTER_WRONG_POSITION:
+                    candidates &= anywhere & ~at
+                case MatchResult.DEVIATED_LETTER_CORRECT_POSITION:
+                    candidates &= self.near_at(position, char) & ~anywhere
+                case MatchResult.DEVIATED_LETTER_WRONG_POSITION:
+                    candidates &= self.near_any(char) & ~(
+                        self.near_at(position, char) | anywhere
+                    )
+                case _:
+                    candidates &= ~self.near_any(char)
+        return candidates
+
+    def letter_spread(self, candidates: int, position: int) -> float:
+        """Entropy of the letters the candidates have at a position."""
+        total = candidates.bit_count()
+        if total == 0:
+            return 0.0
+        spread = 0.0
+        for bitset in self.positions[position].values():
+            count = (candidates & bitset).bit_count()
+            if count:
+                spread -= count / total * math.log2(count / total)
+        return spread
+
+    def decode(self, candidates: int) -> list[str]:
+        """Words of a candidate bitset."""
+        words: list[str] = []
+        while candidates:
+            lowest = candidates & -candidates
+            words.append(self.words[lowest.bit_length() - 1])
+            candidates ^= lowest
+        return words
+
+
+class CandidateSet:
+    """Words still consistent with the guesses of one game."""
+
+    def __init__(self, index: CandidateIndex) -> None:
+        self.index = index
+        self.bits: int = index.all
+        self.applied: int = 0
+
+    def apply(self, history: Sequence[tuple[str, Sequence[int]]]) -> int:
+        """Narrow down with the guesses not applied yet, return the count."""
+        for guess, result in history[self.applied :]:
+            self.bits = self.index.narrow(self.bits, guess, result)
+        self.applied = max(self.applied, len(history))
+        return len(self)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+
+class CandidateTracker:
+    """Candidate sets of the games in progress."""
+
+    MAX_GAMES: Final[int] = 4096
+
+    def __init__(self) -> None:
+        self._indexes: dict[int, CandidateIndex] = {}
+        self._games: dict[UUID, CandidateSet] = {}
+
+    def index(self, wordgen: WordGenerator, length: int) -> CandidateIndex:
+        """Index of every word of a length, built on first use."""
+        if length not in self._indexes:
+            self._indexes[length] = CandidateIndex(
+                [
+                    word
+                    for difficulty in Difficulty
+                    for word in wordgen.mp_len_words.get(length, {}).get(
+                        difficulty, []
+                    )
+                ]
+            )
+        return self._indexes[length]
+
+    def get(
+        self,
+        wordgen: WordGenerator,
+        wordle_id: UUID,
+        length: int,
+    ) -> CandidateSet:
+        """Candidate set of a game, started over if it is not tracked."""
+        if wordle_id not in self._games:
+            if len(self._games) >= self.MAX_GAMES:
+                self._games.pop(next(iter(self._games)))
+            self._games[wordle_id] = CandidateSet(self.index(wordgen, length))
+        return self._games[wordle_id]
+
+    def discard(self, wordle_id: UUID) -> None:
+        """Forget a finished game."""
+        self._games.pop(wordle_id, None)
+
+
+# TODO: move this to a container
+candidate_tracker = CandidateTracker()
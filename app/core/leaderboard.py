@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import os
+import random
+from collections.abc import Iterable, Iterator
+from enum import StrEnum
+from typing import Any, Final, NamedTuple
+
+from app.models.player_stats import PlayerStats
+from app.storage.player_stats import PlayerStatsRepo, player_stats_repo
+
+logger = logging.getLogger(__name__)
+
+Key = tuple[Any, ...]
+
+
+class _Node:
+    __slots__ = ("key", "priority", "size", "left", "right")
+
+    def __init__(self, key: Key, priority: int) -> None:
+        self.key: Key = key
+        self.priority: int = priority
+        self.size: int = 1
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+
+    def update(self) -> "_Node":
+        self.size = 1 + _size(self.left) + _size(self.right)
+        return self
+
+
+def _size(node: _Node | None) -> int:
+    return node.size if node is not None else 0
+
+
+def _split(node: _Node | None, key: Key) -> tuple[_Node | None, _Node | None]:
+    """Split a treap into the keys below the key and the others."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return node.update(), right
+    left, node.left = _split(node.left, key)
+    return left, node.update()
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    """Merge two treaps, the keys of the left one being the lowest."""
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return left.update()
+    right.left = _merge(left, right.left)
+    return right.update()
+
+
+def _remove(node: _Node | None, key: Key) -> _Node | None:
+    if node is None:
+        return None
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    elif node.key < key:
+        node.right = _remove(node.right, key)
+    else:
+        return _merge(node.left, node.right)
+    return node.update()
+
+
+class RankedSet:
+    """Sorted set of keys, knowing the rank of each of them.
+
+    It is a treap whose nodes count the keys under them,
+    adding, removing, ranking a key and finding the key at a rank
+    are O(log n) on average.
+    """
+
+    def __init__(
+        self, keys: Iterable[Key] = (), seed: int | None = None
+    ) -> None:
+        self._root: _Node | None = None
+        self._random = random.Random(seed)  # noqa: S311
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __contains__(self, key: Key) -> bool:
+        node = self._root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[Key]:
+        stack: list[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key
+            node = node.right
+
+    def __getitem__(self, index: int) -> Key:
+        """Key at a rank, counted from 0."""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        node = self._root
+        while node is not None:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index > left:
+                index -= left + 1
+                node = node.right
+            else:
+                return node.key
+        raise AssertionError
+
+    def add(self, key: Key) -> None:
+        """Add a key, if it is not in the set yet."""
+        if key in self:
+            return
+        left, right = _split(self._root, key)
+        node = _Node(key, self._random.getrandbits(32))
+        self._root = _merge(_merge(left, node), right)
+
+    def discard(self, key: Key) -> None:
+        """Remove a key, if it is in the set."""
+        self._root = _remove(self._root, key)
+
+    def rank(self, key: Key) -> int:
+        """Number of keys lower than a key."""
+        rank = 0
+        node = self._root
+        while node is not None:
+            if node.key < key:
+                rank += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+
+class LeaderboardMetric(StrEnum):
+    """What players are ranked on."""
+
+    WINS = "Wins"
+    WIN_RATE = "Win rate"
+    AVERAGE_GUESSES = "Average guesses"
+
+
+class Standing(NamedTuple):
+    """Place of a player on a leaderboard, ranks start at 1."""
+
+    rank: int
+    user_id: int
+    value: float
+
+
+class Leaderboard:
+    """Rankings of every player, kept in memory.
+
+    The rankings are loaded from the player stats at startup,
+    a player is re-ranked when one of their games is won or ended,
+    and a background task reconciles all of them with the database.
+    Win rates only rank players with a few games,
+    average guesses players with a few won games.
+    """
+
+    MIN_GAMES: Final[int] = int(os.getenv("LEADERBOARD_MIN_GAMES", "5"))
+    RECONCILE_SECONDS: Final[float] = float(
+        os.getenv("LEADERBOARD_RECONCILE_SECONDS", "600")
+    )
+    # the sort keys are (value, user_id), negated to rank the highest first
+    SIGNS: Final[dict[LeaderboardMetric, int]] = {
+        LeaderboardMetric.WINS: -1,
+        LeaderboardMetric.WIN_RATE: -1,
+        LeaderboardMetric.AVERAGE_GUESSES: 1,
+    }
+
+    def __init__(
+        self,
+        repo: PlayerStatsRepo,
+        min_games: int | None = None,
+        reconcile_seconds: float | None = None,
+    ) -> None:
+        self.repo = repo
+        self.min_games: int = (
+            self.MIN_GAMES if min_games is None else min_games
+        )
+        self.reconcile_seconds: float = (
+            reconcile_seconds or self.RECONCILE_SECONDS
+        )
+        self.rankings: dict[LeaderboardMetric, RankedSet] = {
+            metric: RankedSet() for metric in LeaderboardMetric
+        }
+        self._keys: dict[int, dict[LeaderboardMetric, Key]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def _sort_keys(self, stats: PlayerStats) -> dict[LeaderboardMetric, Key]:
+        values: dict[LeaderboardMetric, float] = {
+            LeaderboardMetric.WINS: stats.wins
+        }
+        if stats.games >= max(self.min_games, 1):
+            values[LeaderboardMetric.WIN_RATE] = stats.wins / stats.games
+        # averaged over the won games, an aborted game has no guess count
+        if stats.wins >= max(self.min_games, 1):
+            values[LeaderboardMetric.AVERAGE_GUESSES] = (
+                sum(
+                    int(guesses) * wins
+                    for guesses, wins in stats.histogram.items()
+                )
+                / stats.wins
+            )
+        return {
+            metric: (self.SIGNS[metric] * value, stats.user_id)
+            for metric, value in values.items()
+        }
+
+    def _rank(self, user_id: int, keys: dict[LeaderboardMetric, Key]) -> None:
+        for metric, key in self._keys.pop(user_id, {}).items():
+            self.rankings[metric].discard(key)
+        for metric, key in keys.items():
+            self.rankings[metric].add(key)
+        if keys:
+            self._keys[user_id] = keys
+
+    def update(self, stats: PlayerStats) -> None:
+        """Re-rank a player from their stats."""
+        self._rank(stats.user_id, self._sort_keys(stats))
+
+    async def refresh(self, user_id: int) -> None:
+        """Re-rank a player from their saved stats."""
+        stats = await self.repo.get(user_id)
+        self._rank(user_id, {} if stats is None else self._sort_keys(stats))
+
+    async def reconcile(self) -> int:
+        """Re-rank every player whose stats changed, return how many."""
+        keys = {
+            stats.user_id: self._sort_keys(stats)
+            for stats in await self.repo.get_all()
+        }
+        stale = [
+            user_id
+            for user_id in self._keys.keys() | keys.keys()
+            if self._keys.get(user_id) != keys.get(user_id)
+        ]
+        for user_id in stale:
+            self._rank(user_id, keys.get(user_id, {}))
+        return len(stale)
+
+    def _standing(
+        self, metric: LeaderboardMetric, rank: int, key: Key
+    ) -> Standing:
+        return Standing(rank + 1, key[1], self.SIGNS[metric] * key[0])
+
+    def top(self, metric: LeaderboardMetric, n: int) -> list[Standing]:
+        """Best players of a metric."""
+        standings = []
+        for rank, key in enumerate(self.rankings[metric]):
+            if rank == n:
+                break
+            standings.append(self._standing(metric, rank, key))
+        return standings
+
+    def standing(
+        self,
+        metric: LeaderboardMetric,
+        user_id: int,
+    ) -> Standing | None:
+        """Place of a player, None if they are not ranked on the metric."""
+        key = self._keys.get(user_id, {}).get(metric)
+        if key is None:
+            return None
+        return self._standing(metric, self.rankings[metric].rank(key), key)
+
+    async def _reconcile_forever(self) -> None:
+        while True:
+            try:
+                stale = await self.reconcile()
+            except Exception:
+                logger.exception("[leaderboard] reconciliation failed")
+            else:
+                logger.info("[leaderboard] re-ranked %d players", stale)
+            await asyncio.sleep(self.reconcile_seconds)
+
+    def start(self) -> None:
+        """Load the rankings, then reconcile them periodically."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reconcile_forever())
+
+    async def stop(self) -> None:
+        """Stop the reconciliation task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# TODO: move this to a container
+leaderboard = Leaderboard(player_stats_repo)
@@ -0,0 +1,170 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Final
+
+import numpy as np
+import numpy.typing as npt
+
+from app.enums import MatchResult
+
+DEVIATED_THRESHOLD: Final[int] = 4
+BATCH_SIZE: Final[int] = 1 << 16
+ALPHABET_SIZE: Final[int] = 26
+
+# DEVIATION_TABLE[a][b]: letters a and b are closer than the threshold
+DEVIATION_TABLE: Final[tuple[tuple[bool, ...], ...]] = tuple(
+    tuple(abs(a - b) < DEVIATED_THRESHOLD for b in range(ALPHABET_SIZE))
+    for a in range(ALPHABET_SIZE)
+)
+# NEIGHBOURHOOD_MASKS[a]: bit b is set when letters a and b are deviated
+NEIGHBOURHOOD_MASKS: Final[tuple[int, ...]] = tuple(
+    sum(1 << b for b, near in enumerate(row) if near)
+    for row in DEVIATION_TABLE
+)
+
+Codes = npt.NDArray[np.uint8]
+
+
+def encode_words(words: Sequence[str]) -> Codes:
+    """Encode equal-length words into an (n, length) array of char codes.
+
+    Words are encoded in latin-1, the word bank only holds ASCII.
+    """
+    if not words:
+        return np.empty((0, 0), dtype=np.uint8)
+    length = len(words[0])
+    raw = "".join(words).encode("latin-1")
+    if len(raw) != length * len(words):
+        msg = "all words must have the same length"
+        raise ValueError(msg)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(len(words), length)
+
+
+def score_codes(guesses: Codes, words: Codes) -> Codes:
+    """Score encoded guesses against encoded words.
+
+    Both arrays are (n, length) or broadcastable to it,
+    e.g. a (1, length) guess against a whole bucket of words.
+    The result holds the MatchResult of every letter,
+    exactly as WordleGame.gen_colors_for_guess yields them.
+    """
+    # uint8 arithmetic wraps around, |g - w| < t <=> (g - w + t - 1) < 2t - 1
+    delta = guesses[..., :, None] - words[..., None, :]
+    same = delta == 0
+    delta += DEVIATED_THRESHOLD - 1
+    near = delta < 2 * DEVIATED_THRESHOLD - 1
+
+    result = np.full(
+        np.broadcast_shapes(guesses.shape, words.shape),
+        MatchResult.WRONG_LETTER,
+        dtype=np.uint8,
+    )
+    # from the weakest match to the strongest, so the strongest wins
+    result[near.any(axis=-1)] = MatchResult.DEVIATED_LETTER_WRONG_POSITION
+    result[np.diagonal(near, axis1=-2, axis2=-1)] = (
+        MatchResult.DEVIATED_LETTER_CORRECT_POSITION
+    )
+    result[same.any(axis=-1)] = MatchResult.CORRECT_LETTER_WRONG_POSITION
+    result[np.diagonal(same, axis1=-2, axis2=-1)] = (
+        MatchResult.CORRECT_LETTER_CORRECT_POSITION
+    )
+    return result
+
+
+def _score_batched(guesses: Codes, words: Codes) -> Codes:
+    rows = max(len(guesses), len(words))
+    if rows <= BATCH_SIZE:
+        return score_codes(guesses, words)
+    result = np.empty((rows, words.shape[-1]), dtype=np.uint8)
+    for start in range(0, rows, BATCH_SIZE):
+        batch = slice(start, start + BATCH_SIZE)
+        result[batch] = score_codes(
+            guesses if len(guesses) == 1 else guesses[batch],
+            words if len(words) == 1 else words[batch],
+        )
+    return result
+
+
+def score_pairs(guesses: Sequence[str], words: Sequence[str]) -> Codes:
+    """Score every guess against the word at the same index."""
+    if len(guesses) != len(words):
+        msg = "guesses and words must be paired"
+        raise ValueError(msg)
+    return _score_batched(encode_words(guesses), encode_words(words))
+
+
+def score_bucket(guess: str, words: Sequence[str] | Codes) -> Codes:
+    """Score one guess against every word of a bucket."""
+    if not isinstance(words, np.ndarray):
+        words = encode_words(words)
+    if len(words) == 0:
+        return np.empty((0, len(guess)), dtype=np.uint8)
+    return _score_batched(encode_words([guess]), words)
+
+
+def _letter_base(text: str) -> int | None:
+    """Code of "A" or "a" if text is only letters of that case."""
+    if not (text.isascii() and text.isalpha()):
+        return None
+    if text.isupper():
+        return ord("A")
+    if text.islower():
+        return ord("a")
+    return None
+
+
+@dataclass(frozen=True)
+class WordMasks:
+    """Letter masks of a target word for scoring single guesses."""
+
+    word: str
+    base: int
+    letters: tuple[int, ...]
+    # bit i: letter i is in the word
+    presence: int
+    # bit i: letter i is deviated from at least one letter of the word
+    neighbourhood: int
+
+    def score(self, guess: str) -> list[int] | None:
+        """Score a guess, None if it is not made of letters of the same case.
+
+        The result matches WordleGame.gen_colors_for_guess.
+        """
+        if _letter_base(guess) != self.base:
+            return None
+        colors: list[int] = []
+        for guesschar, wordchar, letter in zip(
+            guess, self.word, self.letters, strict=False
+        ):
+            guessed = ord(guesschar) - self.base
+            if guesschar == wordchar:
+                colors.append(MatchResult.CORRECT_LETTER_CORRECT_POSITION)
+            elif self.presence >> guessed & 1:
+                colors.append(MatchResult.CORRECT_LETTER_WRONG_POSITION)
+            elif DEVIATION_TABLE[guessed][letter]:
+                colors.append(MatchResult.DEVIATED_LETTER_CORRECT_POSITION)
+            elif self.neighbourhood >> guessed & 1:
+                colors.append(MatchResult.DEVIATED_LETTER_WRONG_POSITION)
+            else:
+                colors.append(MatchResult.WRONG_LETTER)
+        return colors
+
+
+def word_masks(word: str) -> WordMasks | None:
+    """Masks of a word, None if it is not made of letters of the same case."""
+    base = _letter_base(word)
+    if base is None:
+        return None
+    letters = tuple(ord(char) - base for char in word)
+    presence = 0
+    neighbourhood = 0
+    for letter in letters:
+        presence |= 1 << letter
+        neighbourhood |= NEIGHBOURHOOD_MASKS[letter]
+    return WordMasks(
+        word=word,
+        base=base,
+        letters=letters,
+        presence=presence,
+        neighbourhood=neighbourhood,
+    )
@@ -0,0 +1,302 @@
+"""Entropy based guess ranking.
+
+Every (guess, answer) pair of a length and difficulty is scored once
+into a pattern matrix, its MatchResult codes packed in base 5,
+saved to disk and memory-mapped on first use.
+Ranking a guess is then counting how it splits the remaining answers.
+
+Build the matrices offline with ``python -m app.core.solver build``.
+"""
+
+import argparse
+import logging
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Final, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from app.core.scoring import encode_words, score_codes
+from app.enums import MatchResult
+from app.word_generator import Difficulty, WordGenerator, get_wordgen
+
+logger = logging.getLogger(__name__)
+
+PATTERN_BASE: Final[int] = len(MatchResult)
+ROWS_PER_TASK: Final[int] = 256
+
+Patterns = npt.NDArray[np.unsignedinteger]
+
+
+class PatternMatrixMissingError(Exception):
+    """The pattern matrix of a length and difficulty is not built yet."""
+
+
+class RankedGuess(NamedTuple):
+    """A guess and the information it is expected to give, in bits."""
+
+    word: str
+    entropy: float
+    possible: bool
+
+
+def pattern_dtype(length: int) -> type[np.unsignedinteger]:
+    """Smallest unsigned type holding every pattern of a word length."""
+    largest = PATTERN_BASE**length - 1
+    for dtype in (np.uint16, np.uint32, np.uint64):
+        if largest <= np.iinfo(dtype).max:
+            return dtype
+    msg = f"patterns of {length} letters do not fit in 64 bits"
+    raise ValueError(msg)
+
+
+def pack_patterns(codes: npt.NDArray[np.uint8]) -> Patterns:
+    """Pack (..., length) MatchResult codes into base 5 integers."""
+    length = codes.shape[-1]
+    dtype = pattern_dtype(length)
+    powers = PATTERN_BASE ** np.arange(length, dtype=dtype)
+    return (codes.astype(dtype) * powers).sum(axis=-1, dtype=dtype)
+
+
+def pack_result(result: Sequence[int]) -> int:
+    """Pack the MatchResult codes of one guess."""
+    return sum(code * PATTERN_BASE**idx for idx, code in enumerate(result))
+
+
+def entropies(patterns: Patterns) -> npt.NDArray[np.float64]:
+    """Entropy of the pattern distribution of every row, in bits."""
+    n_rows, n_cols = patterns.shape
+    if n_cols == 0:
+        return np.zeros(n_rows)
+    ordered = np.sort(patterns, axis=1)
+    run_start = np.ones((n_rows, n_cols), dtype=bool)
+    run_start[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    rows, cols = np.nonzero(run_start)
+    run_end = np.empty_like(cols)
+    run_end[:-1] = cols[1:]
+    last_of_row = np.ones(len(rows), dtype=bool)
+    last_of_row[:-1] = rows[1:] != rows[:-1]
+    run_end[last_of_row] = n_cols
+    share = (run_end - cols) / n_cols
+    return np.bincount(rows, weights=-share * np.log2(share), minlength=n_rows)
+
+
+_worker_answers: npt.NDArray[np.uint8] | None = None
+
+
+def _init_worker(answers: npt.NDArray[np.uint8]) -> None:
+    global _worker_answers  # noqa: PLW0603
+    _worker_answers = answers
+
+
+def _score_rows(guesses: list[str]) -> Patterns:
+    assert _worker_answers is not None, "worker is not initialized"
+    return np.stack(
+        [
+            pack_patterns(score_codes(guess[None, :], _worker_answers))
+            for guess in encode_words(guesses)
+        ]
+    )
+
+
+class Solver:
+    """Rank guesses over the answers left by a guess history."""
+
+    PATTERNS_DIR: Final[str] = os.getenv("PATTERNS_DIR", "./patterns")
+
+    def __init__(
+        self,
+        wordgen: WordGenerator,
+        directory: str | Path | None = None,
+    ) -> None:
+        self.wordgen = wordgen
+        # rows and columns follow the buckets, calibration reorders them
+        layout = f"{wordgen.bank.checksum:08x}"
+        if wordgen.calibration_checksum is not None:
+            layout += f"-{wordgen.calibration_checksum:08x}"
+        self.directory = Path(directory or self.PATTERNS_DIR) / layout
+        self._matrices: dict[tuple[int, Difficulty], Patterns] = {}
+        self._guess_rows: dict[int, dict[str, int]] = {}
+
+    def guesses(self, length: int) -> list[str]:
+        """Every valid word of a length, the rows of its matrices."""
+        return [
+            word
+            for difficulty in Difficulty
+            for word in self.wordgen.mp_len_words[length][difficulty]
+        ]
+
+    def guess_row(self, length: int, word: str) -> int:
+        """Matrix row of a guess."""
+        if length not in self._guess_rows:
+            self._guess_rows[length] = {
+                guess: row for row, guess in enumerate(self.guesses(length))
+            }
+        return self._guess_rows[length][word]
+
+    def path(self, length: int, difficulty: Difficulty) -> Path:
+        """File of the pattern matrix of a length and difficulty."""
+        return self.directory / f"{length}-{difficulty.value.lower()}.npy"
+
+    def build(
+        self,
+        length: int,
+        difficulty: Difficulty,
+        workers: int | None = None,
+    ) -> Path:
+        """Score every guess against every answer in a process pool."""
+        guesses = self.guesses(length)
+        answers = encode_words(
+            list(self.wordgen.mp_len_words[length][difficulty])
+        )
+        path = self.path(length, difficulty)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.tmp.npy")
+        matrix = np.lib.format.open_memmap(
+            tmp_path,
+            mode="w+",
+            dtype=pattern_dtype(length),
+            shape=(len(guesses), len(answers)),
+        )
+        chunks = [
+            guesses[start : start + ROWS_PER_TASK]
+            for start in range(0, len(guesses), ROWS_PER_TASK)
+        ]
+        if len(answers):
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(answers,),
+            ) as pool:
+                for idx, rows in enumerate(pool.map(_score_rows, chunks)):
+                    start = idx * ROWS_PER_TASK
+                    matrix[start : start + len(rows)] = rows
+        matrix.flush()
+        del matrix
+        tmp_path.replace(path)
+        self._matrices.pop((length, difficulty), None)
+        logger.info(
+            "[solver] built %s: %d guesses x %d answers",
+            path,
+            len(guesses),
+            len(answers),
+        )
+        return path
+
+    def matrix(self, length: int, difficulty: Difficulty) -> Patterns:
+        """Memory-map the pattern matrix of a length and difficulty."""
+        key = (length, difficulty)
+        if key not in self._matrices:
+            path = self.path(length, difficulty)
+            if not path.exists():
+                raise PatternMatrixMissingError(path)
+            self._matrices[key] = np.load(path, mmap_mode="r")
+        return self._matrices[key]
+
+    def remaining(
+        self,
+        length: int,
+        history: Iterable[tuple[str, Sequence[int]]],
+        difficulties: Iterable[Difficulty] = tuple(Difficulty),
+    ) -> dict[Difficulty, npt.NDArray[np.intp]]:
+        """Answers of every difficulty still consistent with the history."""
+        rows = [
+            (self.guess_row(length, guess.lower()), pack_result(result))
+            for guess, result in history
+        ]
+        remaining: dict[Difficulty, npt.NDArray[np.intp]] = {}
+        for difficulty in difficulties:
+            matrix = self.matrix(length, difficulty)
+            consistent = np.ones(matrix.shape[1], dtype=bool)
+            for row, pattern in rows:
+                consistent &= matrix[row] == pattern
+            remaining[difficulty] = np.flatnonzero(consistent)
+        return remaining
+
+    def rank(
+        self,
+        length: int,
+        history: Iterable[tuple[str, Sequence[int]]] = (),
+        difficulties: Iterable[Difficulty] = tuple(Difficulty),
+        top: int = 5,
+    ) -> list[RankedGuess]:
+        """Best guesses by expected information over the remaining answers.
+
+        Guesses that could still be the answer win ties.
+        """
+        remaining = self.remaining(length, history, difficulties)
+        patterns = np.hstack(
+            [
+                self.matrix(length, difficulty)[:, columns]
+                for difficulty, columns in remaining.items()
+            ]
+        )
+        guesses = self.guesses(length)
+        possible = np.zeros(len(guesses), dtype=bool)
+        for difficulty, columns in remaining.items():
+            words = self.wordgen.mp_len_words[length][difficulty]
+            possible[
+                [self.guess_row(length, words[col]) for col in columns]
+            ] = True
+        scores = entropies(patterns)
+        order = np.lexsort((~possible, -scores))[:top]
+        return [
+            RankedGuess(guesses[row], float(scores[row]), bool(possible[row]))
+            for row in order
+        ]
+
+
+@lru_cache
+def get_solver(wordgen: WordGenerator) -> Solver:
+    """Ensure only 1 solver is used per word generator."""
+    return Solver(wordgen)
+
+
+def main() -> None:
+    """Build pattern matrices or rank guesses from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build")
+    build.add_argument("--length", type=int, action="append")
+    build.add_argument("--workers", type=int, default=None)
+    rank = commands.add_parser("rank")
+    rank.add_argument("--length", type=int, required=True)
+    rank.add_argument(
+        "--guess",
+        action="append",
+        default=[],
+        metavar="WORD:RESULT",
+        help="a previous guess and its result, e.g. crane:40132",
+    )
+    args = parser.parse_args()
+
+    solver = get_solver(get_wordgen())
+    if args.command == "build":
+        lengths = args.length or range(
+            WordGenerator.WORD_LENGTH_MIN, WordGenerator.WORD_LENGTH_MAX + 1
+        )
+        for length in lengths:
+            for difficulty in Difficulty:
+                solver.build(length, difficulty, args.workers)
+        return
+
+    history = [
+        (word, list(map(int, result)))
+        for word, result in (guess.split(":") for guess in args.guess)
+    ]
+    for ranked in solver.rank(args.length, history):
+        logger.info(
+            "%s %.3f bits%s",
+            ranked.word,
+            ranked.entropy,
+            " (possible answer)" if ranked.possible else "",
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -14,11 +14,17 @@ from discord import (
 from discord.app_commands import Command
 from discord.ui import Select, View
 
+from app.core.leaderboard import LeaderboardMetric, Standing
+from app.core.solver import RankedGuess
 from app.core.wordle import WordleGame
 from app.models.guess import Guess
+from app.models.guess_result import GuessResult
 from app.storage.wordle import wordle_repo
-from app.word_generator import Difficulty
+from app.word_generator import Difficulty, wordgen_loader
 
+LOADING_MESSAGE: Final[str] = (
+    "The word list is still loading, please try again in a moment."
+)
 EMOJI: Final[list[str]] = [
     ":green_heart:",
     ":yellow_heart:",
@@ -34,9 +40,14 @@ class GuessEmbed(Embed):
     _2_SPACES: Final[str] = "  "
     _4_SPACES: Final[str] = "    "
 
-    def __init__(self, user: User | Member, guesses: Sequence[Guess]) -> None:
+    def __init__(
+        self,
+        user: User | Member,
+        guesses: Sequence[Guess],
+        remaining: int | None = None,
+    ) -> None:
         super().__init__(title=f"{user.name}'s Wordle Guess")
-        self.color = 0xFF0000 if int(guesses[-1].result) != 0 else 0x00FF00
+        self.color = 0x00FF00 if guesses[-1].result.won else 0xFF0000
 
         for idx, guess in enumerate(guesses):
             self.add_field(
@@ -47,6 +58,9 @@ class GuessEmbed(Embed):
                 inline=False,
             )
 
+        if remaining is not None:
+            self.set_footer(text=f"{remaining} word(s) still possible")
+
     def _format_guess_word(self, word: str) -> str:
         """Format the guess word to show on the embed."""
         new_word = f"{self._2_SPACES}{self._4_SPACES.join(word)}"
@@ -57,9 +71,30 @@ class GuessEmbed(Embed):
             .replace("I", "  I ")
         )
 
-    def _format_guess_result(self, word: str) -> str:
+    def _format_guess_result(self, result: GuessResult) -> str:
         """Format the result into emoji to show on the embed."""
-        return " ".join(EMOJI[int(val)] for val in word)
+        return " ".join(EMOJI[color] for color in result)
+
+
+class BestGuessEmbed(Embed):
+    """Embed that show the most informative guesses."""
+
+    def __init__(
+        self,
+        user: User | Member,
+        ranked: Sequence[RankedGuess],
+    ) -> None:
+        super().__init__(title=f"{user.name}'s best guesses")
+
+        for idx, guess in enumerate(ranked):
+            self.add_field(
+                name=f"#{idx + 1} {guess.word.upper()}",
+                value=(
+                    f"{guess.entropy:.2f} bits of information"
+                    f"{", could be the word" if guess.possible else ""}"
+                ),
+                inline=False,
+            )
 
 
 class PlayerStatEmbed(Embed):
@@ -72,6 +107,7 @@ class PlayerStatEmbed(Embed):
         num_wordle_games: int,
         num_wins: int,
         num_guesses: int,
+        histogram: dict[str, int] | None = None,
     ) -> None:
         super().__init__(title=f"{player_name}'s stats")
 
@@ -107,10 +143,83 @@ class PlayerStatEmbed(Embed):
 
         self.add_field(
             name="Average guesses per game",
-            value=num_guesses // num_wordle_games,
+            value=num_guesses // max(num_wordle_games, 1),
             inline=False,
         )
 
+        if histogram:
+            self.add_field(
+                name="Wins by guesses",
+                value="\n".join(
+                    f"{guesses} guess(es): {wins}"
+                    for guesses, wins in sorted(
+                        histogram.items(), key=lambda item: int(item[0])
+                    )
+                ),
+                inline=False,
+            )
+
+
+def format_metric(metric: LeaderboardMetric, value: float) -> str:
+    """Format the value of a leaderboard metric."""
+    match metric:
+        case LeaderboardMetric.WINS:
+            return f"{value:.0f} win(s)"
+        case LeaderboardMetric.WIN_RATE:
+            return f"{value:.0%} won"
+        case LeaderboardMetric.AVERAGE_GUESSES:
+            return f"{value:.2f} guesses per game"
+
+
+class LeaderboardEmbed(Embed):
+    """Embed that show the best players of a metric."""
+
+    TOP: Final[int] = 10
+
+    def __init__(
+        self,
+        metric: LeaderboardMetric,
+        standings: Sequence[Standing],
+        player_names: dict[int, str],
+    ) -> None:
+        super().__init__(title=f"Leaderboard: {metric}")
+
+        if not standings:
+            self.description = "Nobody is ranked yet."
+        for standing in standings:
+            self.add_field(
+                name=(
+                    f"#{standing.rank} "
+                    f"{player_names.get(standing.user_id, "unknown")}"
+                ),
+                value=format_metric(metric, standing.value),
+                inline=False,
+            )
+
+
+class RankEmbed(Embed):
+    """Embed that show the ranks of a player on every leaderboard."""
+
+    def __init__(
+        self,
+        user: User | Member,
+        standings: dict[LeaderboardMetric, Standing | None],
+        ranked: dict[LeaderboardMetric, int],
+    ) -> None:
+        super().__init__(title=f"{user.name}'s ranks")
+
+        for metric, standing in standings.items():
+            self.add_field(
+                name=metric,
+                value=(
+                    "Not ranked yet"
+                    if standing is None
+                    else f"#{standing.rank} of {ranked[metric]}, "
+                    f"{format_metric(metric, standing.value)}"
+                ),
+                inline=False,
+            )
+
 
 class HelpEmbed(Embed):
     """Embed for the help comment."""
@@ -142,7 +251,11 @@ class StartSelectionView(View):
 
     async def start(self, interaction: Interaction[Client]) -> None:
         """Start the Wordle Game."""
-        await WordleGame().start(
+        # awaiting the build would outlive the interaction
+        if not wordgen_loader.ready:
+            await interaction.response.send_message(LOADING_MESSAGE)
+            return
+        await WordleGame(wordgen_loader.get()).start(
             interaction=interaction,
             length_select=self.length_select,
             difficulty_select=self.difficulty_select,
@@ -285,7 +398,7 @@ class TrivialSelectionView(View):
         await interaction.response.send_message("Correct Answer")
         await wordle_repo.change_status(id=self.wordle_id, is_winning=False)
 
-        wordle_game = WordleGame()
+        wordle_game = WordleGame(await wordgen_loader.wait())
         wordle = await wordle_repo.get_ongoing_wordle(
             user_id=interaction.user.id
         )
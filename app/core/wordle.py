@@ -8,9 +8,15 @@ from discord import Client
 from discord.interactions import Interaction
 from discord.ui import Select, View
 
+from app.core.candidates import candidate_tracker
+from app.core.leaderboard import leaderboard
+from app.core.scoring import DEVIATED_THRESHOLD, WordMasks, word_masks
 from app.enums import MatchResult
+from app.models.guess_result import GuessResult
+from app.models.wordle import WordleStatus
 from app.storage.guess import guess_repo
-from app.storage.wordle import wordle_repo
+from app.storage.seen import SeenRepo, seen_repo
+from app.storage.wordle import OngoingWordleExistsError, wordle_repo
 from app.word_generator import Difficulty, Word, WordGenerator, get_wordgen
 
 logger = logging.getLogger(__name__)
@@ -29,22 +35,43 @@ class WordleGame:
 
     WORD_LENGTH_MIN: Final[int] = 5
     WORD_LENGTH_MAX: Final[int] = 15
-    DEVIATED_THRESHOLD: Final[int] = 4
+    DEVIATED_THRESHOLD: Final[int] = DEVIATED_THRESHOLD
 
-    def __init__(self) -> None:
-        self.wordgen: WordGenerator = get_wordgen()
+    def __init__(self, wordgen: WordGenerator | None = None) -> None:
+        self._wordgen = wordgen
+
+    @property
+    def wordgen(self) -> WordGenerator:
+        """The word generator, resolved on first use."""
+        if self._wordgen is None:
+            self._wordgen = get_wordgen()
+        return self._wordgen
 
     def _random_length(self) -> int:
         return self.WORD_LENGTH_MIN + secrets.randbelow(
             self.WORD_LENGTH_MAX - self.WORD_LENGTH_MIN + 1,
         )
 
-    def _gen_word(self, length: int | None, difficulty: Difficulty) -> str:
-        """Generate a new word."""
+    async def _gen_word(
+        self,
+        length: int | None,
+        difficulty: Difficulty,
+        user_id: int | None = None,
+    ) -> str:
+        """Generate a new word, one the player has not played yet if given."""
         length = length or self._random_length()
-        return self.wordgen.random(
-            length=length, difficulty=difficulty
-        ).word.upper()
+        if user_id is None:
+            return self.wordgen.random(
+                length=length, difficulty=difficulty
+            ).word.upper()
+        # word bank indexes change with the bank, so do the bitmaps
+        idx = await seen_repo.pick(
+            user_id,
+            f"{SeenRepo.WORD}:{self.wordgen.bank.checksum:08x}",
+            self.wordgen.bucket(length, difficulty),
+            (length, difficulty),
+        )
+        return self.wordgen.word_at(idx).word.upper()
 
     def _gen_color(
         self,
@@ -78,8 +105,19 @@ class WordleGame:
         self,
         guess: str,
         word: str,
+        masks: WordMasks | None = None,
     ) -> Generator[int, Any, Any]:
-        """Generate the guess result in integers."""
+        """Generate the guess result in integers.
+
+        Letter words are scored with the masks of the target word,
+        the ones cached with the game when they are given,
+        anything else is compared char by char.
+        """
+        masks = masks or word_masks(word)
+        colors = masks.score(guess) if masks else None
+        if colors is not None:
+            yield from colors
+            return
         for guesschar, wordchar in zip(guess, word, strict=False):
             yield self._gen_color(guesschar, wordchar, word)
 
@@ -90,9 +128,10 @@ class WordleGame:
         difficulty_select: Select[View],
     ) -> str:
         """Start the game."""
-        word = self._gen_word(
+        word = await self._gen_word(
             length=int(length_select.values[0]),  # noqa:PD011
             difficulty=Difficulty(difficulty_select.values[0]),  # noqa:PD011
+            user_id=interaction.user.id,
         )
         message = "You word is chosen."
         message += (
@@ -102,7 +141,13 @@ class WordleGame:
         )
         message += "You can start guessing the word now."
 
-        await wordle_repo.create(word, interaction.user.id)
+        try:
+            await wordle_repo.create(word, interaction.user.id)
+        except OngoingWordleExistsError:
+            message = (
+                "You already starts the wordle game\n"
+                "Please complete the current game to start a new game"
+            )
         await interaction.response.send_message(content=message)
         return word
 
@@ -110,27 +155,44 @@ class WordleGame:
         self,
         user_id: int,
         guess: str,
-    ) -> None:
-        """Save the guess result into the DB."""
-        wordle = await wordle_repo.get_active_wordle_by_user_id(
-            user_id=user_id,
-        )
-        if wordle is None:
+    ) -> int:
+        """Save the guess result into the DB.
+
+        Return how many words are still consistent with the guesses.
+        """
+        wordle = await wordle_repo.get_ongoing_wordle(user_id=user_id)
+        if wordle is None or wordle.status != WordleStatus.ACTIVE.value:
             raise ValueError("wordle game not found for user %d" % user_id)
 
         if len(guess) != len(wordle.word):
             raise UnequalInLengthError
 
-        colors = self.gen_colors_for_guess(guess=guess, word=wordle.word)
+        masks = (
+            wordle_repo.cache.masks(wordle.id)
+            if wordle_repo.cache is not None
+            else None
+        )
+        colors = list(
+            self.gen_colors_for_guess(
+                guess=guess, word=wordle.word, masks=masks
+            )
+        )
+        history = [
+            (prev.content, list(prev.result)) for prev in wordle.guesses
+        ]
+        history.append((guess, colors))
         await guess_repo.create(
             content=guess,
-            result="".join(map(str, colors)),
+            result=GuessResult.from_colors(colors),
             wordle_id=wordle.id,
         )
+        return candidate_tracker.get(
+            self.wordgen, wordle.id, len(wordle.word)
+        ).apply(history)
 
     async def end(self, user_id: int) -> None:
         """End the current wordle game of a user."""
-        wordle = await wordle_repo.get_ongoing_wordle(
+        wordle = await wordle_repo.get_ongoing_state(
             user_id=user_id,
         )
         if not wordle:
@@ -140,10 +202,12 @@ class WordleGame:
             is_winning=False,
             is_ending=True,
         )
+        candidate_tracker.discard(wordle.id)
+        await leaderboard.refresh(user_id)
 
     async def win(self, user_id: int) -> None:
         """Win the current wordle game of a user."""
-        wordle = await wordle_repo.get_ongoing_wordle(
+        wordle = await wordle_repo.get_ongoing_state(
             user_id=user_id,
         )
         if not wordle:
@@ -153,13 +217,13 @@ class WordleGame:
             is_winning=True,
             is_ending=False,
         )
+        candidate_tracker.discard(wordle.id)
+        await leaderboard.refresh(user_id)
 
     async def check_guess(self, user_id: int) -> bool:
         """Return True if the guess match the active wordle."""
         guesses = await wordle_repo.get_guesses(user_id=user_id)
-        latest_guess = guesses[-1].result
-
-        return not any(map(int, latest_guess))
+        return guesses[-1].result.won
 
     def check_valid_word(self, word: str) -> bool:
         """Return True if the word is valid."""
@@ -184,9 +248,33 @@ class WordleGame:
                 .join(target_word.synonyms)}"
 
     async def get_letter_hint(self, user_id: int) -> str:
-        """Return the correct letter at specific position."""
+        """Return the correct letter at specific position.
+
+        The position is one where the words still possible disagree most.
+        """
         wordle_game = await wordle_repo.get_ongoing_wordle(user_id=user_id)
-        position = secrets.randbelow(len(wordle_game.word))
+        if not wordle_game:
+            raise WordleGameNotFoundError
+        candidates = candidate_tracker.get(
+            self.wordgen, wordle_game.id, len(wordle_game.word)
+        )
+        candidates.apply(
+            [
+                (guess.content, list(guess.result))
+                for guess in wordle_game.guesses
+            ]
+        )
+        spreads = [
+            candidates.index.letter_spread(candidates.bits, position)
+            for position in range(len(wordle_game.word))
+        ]
+        position = secrets.choice(
+            [
+                position
+                for position, spread in enumerate(spreads)
+                if spread == max(spreads)
+            ]
+        )
 
         return (
             f"{wordle_game.word[position]} is at the position {position + 1}"
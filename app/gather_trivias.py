@@ -1,19 +1,34 @@
 # ref: https://github.com/blobfysh/opentdb-api/blob/master/index.js
+"""Ingestion of the opentdb questions into ``trivia.db``.
+
+Pages are fetched concurrently on one pooled client,
+every page is inserted in one transaction,
+and a checkpoint file keeps the session token and the progress,
+so an interrupted run resumes where it stopped.
+Questions already stored, by their content hash, are skipped.
+Run it with ``python -m app.gather_trivias``,
+or with ``--compact`` to deduplicate and vacuum the file.
+"""
+
+import argparse
 import asyncio
+import json
 import logging
 import os
-from typing import Final, TypedDict
+import random
+from dataclasses import asdict, dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Final, TypedDict
 
 import httpx
 
-from .models.base import Base
-from .models.trivia import Trivia, TriviaDifficulty
+from .models.trivia import TriviaDifficulty
 from .storage.database import trivia_database
-from .storage.trivia import trivia_repo
+from .storage.migrations import migrate_trivia
+from .storage.trivia import TriviaRepo, trivia_repo
 
-OPENTDB_ENDPOINT: Final[str] = (
-    "https://opentdb.com/api.php?amount=50&type=multiple&token={token}"
-)
+OPENTDB_URL: Final[str] = "https://opentdb.com"
 HTTP_200_OK: Final[int] = 200
 logger = logging.getLogger("gather_trivia")
 
@@ -36,6 +51,21 @@ class OpentdbResponse(TypedDict):
     results: list[OpentdbResult]
 
 
+class OpentdbCode(IntEnum):
+    """Response codes of opentdb."""
+
+    SUCCESS = 0
+    NO_RESULTS = 1
+    INVALID_PARAMETER = 2
+    TOKEN_NOT_FOUND = 3
+    TOKEN_EMPTY = 4
+    RATE_LIMIT = 5
+
+
+class OpentdbError(Exception):
+    """opentdb refused a request."""
+
+
 def esc(text: str) -> str:
     """De-escape all escaped strings."""
     return (
@@ -54,64 +84,243 @@ def esc(text: str) -> str:
     )
 
 
-async def main() -> None:
-    """The main gather function."""
-    token: str = os.environ["TOKEN"]
-    response_code: int = 0
+def to_trivia(result: OpentdbResult) -> dict[str, Any]:
+    """Trivia row of an opentdb result."""
+    incorrect_answers = [esc(answer) for answer in result["incorrect_answers"]]
+    return {
+        "difficulty": TriviaDifficulty(result["difficulty"]),
+        "category": esc(result["category"]),
+        "question": esc(result["question"]),
+        "correct_answer": esc(result["correct_answer"]),
+        "incorrect_answer_1": incorrect_answers[0],
+        "incorrect_answer_2": incorrect_answers[1],
+        "incorrect_answer_3": incorrect_answers[2],
+    }
+
 
-    while response_code == 0:
+@dataclass
+class Checkpoint:
+    """Progress of an ingestion, saved after every page."""
+
+    token: str
+    pages: int = 0
+    trivias: int = 0
+    done: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint | None":
+        """Read a checkpoint, None if there is none."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url=OPENTDB_ENDPOINT.format(token=token),
-                    timeout=None,
-                )
+            return cls(**json.loads(path.read_text()))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: Path) -> None:
+        """Write the checkpoint, replacing the previous one at once."""
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self)))
+        tmp.replace(path)
+
+
+class TriviaGatherer:
+    """Fetches every question of an opentdb session token.
+
+    The token makes opentdb never serve a question twice,
+    so concurrent fetches get distinct pages
+    until it reports the token empty.
+    Requests of every worker are spaced by the rate limit of opentdb,
+    so the workers only overlap the fetch of a page
+    with the insert of the previous one.
+    Failed and rate-limited requests are retried
+    with an exponential backoff.
+    """
+
+    PAGE_SIZE: Final[int] = 50
+    CONCURRENCY: Final[int] = int(os.getenv("GATHER_CONCURRENCY", "2"))
+    RETRIES: Final[int] = int(os.getenv("GATHER_RETRIES", "6"))
+    # opentdb allows a request every 5 seconds per IP
+    INTERVAL_SECONDS: Final[float] = float(
+        os.getenv("GATHER_INTERVAL_SECONDS", "5")
+    )
+    BACKOFF_SECONDS: Final[float] = float(
+        os.getenv("GATHER_BACKOFF_SECONDS", "5")
+    )
+    MAX_BACKOFF_SECONDS: Final[float] = 60
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: httpx.AsyncClient,
+        repo: TriviaRepo,
+        checkpoint_path: Path,
+        *,
+        concurrency: int | None = None,
+        retries: int | None = None,
+        backoff_seconds: float | None = None,
+        interval_seconds: float | None = None,
+        page_size: int | None = None,
+    ) -> None:
+        self.client = client
+        self.repo = repo
+        self.checkpoint_path = checkpoint_path
+        self.concurrency: int = concurrency or self.CONCURRENCY
+        self.retries: int = self.RETRIES if retries is None else retries
+        self.backoff_seconds: float = (
+            self.BACKOFF_SECONDS
+            if backoff_seconds is None
+            else backoff_seconds
+        )
+        self.interval_seconds: float = (
+            self.INTERVAL_SECONDS
+            if interval_seconds is None
+            else interval_seconds
+        )
+        self.page_size: int = page_size or self.PAGE_SIZE
+        self._lock = asyncio.Lock()
+        self._rate_lock = asyncio.Lock()
+        self._next_request: float = 0
+
+    async def _wait_turn(self) -> None:
+        """Wait until a request is allowed, shared by every worker."""
+        loop = asyncio.get_running_loop()
+        async with self._rate_lock:
+            delay = self._next_request - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request = loop.time() + self.interval_seconds
+
+    async def _get(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        """GET a JSON response, retrying errors and rate limits."""
+        for attempt in range(self.retries + 1):
+            await self._wait_turn()
+            try:
+                response = await self.client.get(path, params=params)
                 if response.status_code != HTTP_200_OK:
                     logger.warning(
                         "abnormal status_code %d", response.status_code
                     )
-                    continue
-                response_dict: OpentdbResponse = response.json()
-                response_code = response_dict.get("response_code", 0)
-                for result in response_dict.get("results", []):
-                    logger.info(result)
-                    await trivia_repo.create(
-                        Trivia(
-                            difficulty=TriviaDifficulty(result["difficulty"]),
-                            category=esc(result["category"]),
-                            question=esc(result["question"]),
-                            correct_answer=esc(result["correct_answer"]),
-                            incorrect_answer_1=esc(
-                                result["incorrect_answers"][0]
-                            ),
-                            incorrect_answer_2=esc(
-                                result["incorrect_answers"][1]
-                            ),
-                            incorrect_answer_3=esc(
-                                result["incorrect_answers"][2]
-                            ),
-                        )
-                    )
-        except Exception as exc:
-            logger.exception(exc)
-            continue
+                else:
+                    body: dict[str, Any] = response.json()
+                    if body.get("response_code") != OpentdbCode.RATE_LIMIT:
+                        return body
+                    logger.info("rate limited")
+            except httpx.HTTPError as exc:
+                logger.warning("request failed: %r", exc)
+            if attempt < self.retries:
+                delay = min(
+                    self.backoff_seconds * 2**attempt,
+                    self.MAX_BACKOFF_SECONDS,
+                )
+                # jitter spreads the concurrent retries apart
+                await asyncio.sleep(delay * random.uniform(1, 1.5))  # noqa: S311
+        msg = f"{path} failed after {self.retries + 1} attempts"
+        raise OpentdbError(msg)
+
+    async def request_token(self) -> str:
+        """Start a new session token."""
+        body = await self._get("/api_token.php", {"command": "request"})
+        if body.get("response_code") != OpentdbCode.SUCCESS:
+            raise OpentdbError(body)
+        token: str = body["token"]
+        return token
+
+    async def fetch_page(self, token: str) -> list[OpentdbResult]:
+        """Next unseen questions of the token, none once it is empty."""
+        body = await self._get(
+            "/api.php",
+            {"amount": self.page_size, "type": "multiple", "token": token},
+        )
+        code = body.get("response_code")
+        if code in (OpentdbCode.NO_RESULTS, OpentdbCode.TOKEN_EMPTY):
+            return []
+        if code != OpentdbCode.SUCCESS:
+            raise OpentdbError(body)
+        results: list[OpentdbResult] = body["results"]
+        return results
+
+    async def _worker(self, checkpoint: Checkpoint) -> None:
+        while not checkpoint.done:
+            results = await self.fetch_page(checkpoint.token)
+            if not results:
+                checkpoint.done = True
+                break
+            stored = await self.repo.create_many(
+                [to_trivia(result) for result in results]
+            )
+            async with self._lock:
+                checkpoint.pages += 1
+                checkpoint.trivias += stored
+                checkpoint.save(self.checkpoint_path)
+            logger.info(
+                "page %d: %d trivias", checkpoint.pages, checkpoint.trivias
+            )
+
+    async def run(self, token: str | None = None) -> Checkpoint:
+        """Fetch and store every question, resuming from the checkpoint."""
+        checkpoint = Checkpoint.load(self.checkpoint_path)
+        if checkpoint is None:
+            checkpoint = Checkpoint(token or await self.request_token())
+            checkpoint.save(self.checkpoint_path)
+        elif checkpoint.done:
+            return checkpoint
+        else:
+            logger.info("resuming after %d pages", checkpoint.pages)
+
+        workers = [
+            asyncio.create_task(self._worker(checkpoint))
+            for _ in range(self.concurrency)
+        ]
+        try:
+            await asyncio.gather(*workers)
         finally:
-            await asyncio.sleep(2)
+            # a failed worker stops the others, the checkpoint is kept
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        checkpoint.save(self.checkpoint_path)
+        return checkpoint
 
 
-async def init_db() -> None:
-    """Initialize database."""
-    async with trivia_database.engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def main(checkpoint_path: Path, concurrency: int) -> None:
+    """The main gather function."""
+    await migrate_trivia(trivia_database)
+    async with httpx.AsyncClient(
+        base_url=OPENTDB_URL,
+        timeout=httpx.Timeout(30),
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+        gatherer = TriviaGatherer(
+            client, trivia_repo, checkpoint_path, concurrency=concurrency
+        )
+        checkpoint = await gatherer.run(os.getenv("TOKEN"))
+    logger.info("%d trivias in %d pages", checkpoint.trivias, checkpoint.pages)
 
 
-async def get_random() -> None:
-    """Return a random trivia."""
-    logger.info((await trivia_repo.get_random()).as_dict())
+async def compact() -> None:
+    """Delete the duplicate trivias and shrink ``trivia.db``."""
+    await migrate_trivia(trivia_database)
+    deleted = await trivia_repo.compact()
+    logger.info("deleted %d duplicate trivias", deleted)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=Path("trivia.checkpoint.json"),
+        help="progress file, delete it to start a new session",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=TriviaGatherer.CONCURRENCY
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="deduplicate the stored trivias and vacuum, then exit",
+    )
+    args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
-    asyncio.run(init_db())
-    asyncio.run(main())
-    asyncio.run(get_random())
+    if args.compact:
+        asyncio.run(compact())
+    else:
+        asyncio.run(main(args.checkpoint, args.concurrency))
@@ -1,10 +1,12 @@
 from datetime import datetime
-from uuid import UUID, uuid4
+from uuid import UUID
 
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from .base import Base
+from .guess_result import GuessResult, PackedGuessResult
+from .ids import uuid7
 from .wordle import Wordle
 
 
@@ -12,15 +14,30 @@ class Guess(Base):
     """Guess model."""
 
     __tablename__ = "guess"
+    __table_args__ = (
+        # guesses are read by wordle in the order of their time-ordered ids
+        Index("ix_guess_wordle_id_id", "wordle_id", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
         index=True,
-        default=uuid4,
+        default=uuid7,
     )
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     content: Mapped[str]
-    result: Mapped[str]
+    result: Mapped[GuessResult] = mapped_column(PackedGuessResult)
     wordle_id: Mapped[UUID] = mapped_column(ForeignKey("wordle.id"))
 
     wordle: Mapped[Wordle] = relationship(back_populates="guesses")
+
+    @validates("result")
+    def validate_result(
+        self,
+        key: str,  # noqa: ARG002
+        result: GuessResult | str,
+    ) -> GuessResult:
+        """Pack results given as digits."""
+        if isinstance(result, str):
+            return GuessResult.parse(result)
+        return result
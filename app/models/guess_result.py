@@ -0,0 +1,113 @@
+from collections.abc import Iterable, Iterator
+from functools import cache
+from typing import Any, Final
+
+from sqlalchemy import Dialect, Integer
+from sqlalchemy.types import TypeDecorator
+
+BITS: Final[int] = 3
+MASK: Final[int] = (1 << BITS) - 1
+
+
+@cache
+def _ones(length: int) -> int:
+    """The lowest bit of every field of a result."""
+    return sum(1 << (BITS * idx) for idx in range(length))
+
+
+class GuessResult:
+    """Colours of the letters of a guess, packed into an int.
+
+    Every letter takes 3 bits, the first letter in the lowest ones,
+    and a bit above the last letter keeps the length.
+    A colour is a MatchResult, 0 is the correct letter at its position,
+    so a winning result is the length bit alone.
+    Colours are only unpacked when iterated.
+    """
+
+    __slots__ = ("packed",)
+
+    def __init__(self, packed: int) -> None:
+        self.packed: int = packed
+
+    @classmethod
+    def from_colors(cls, colors: Iterable[int]) -> "GuessResult":
+        """Pack the colours of the letters of a guess."""
+        packed = 0
+        length = 0
+        for color in colors:
+            packed |= color << (BITS * length)
+            length += 1
+        return cls(packed | 1 << (BITS * length))
+
+    @classmethod
+    def parse(cls, digits: str) -> "GuessResult":
+        """Pack colours written as digits, as in "40132"."""
+        return cls.from_colors(map(int, digits))
+
+    def __len__(self) -> int:
+        return (self.packed.bit_length() - 1) // BITS
+
+    def __iter__(self) -> Iterator[int]:
+        packed = self.packed
+        for _ in range(len(self)):
+            yield packed & MASK
+            packed >>= BITS
+
+    def __str__(self) -> str:
+        return "".join(map(str, self))
+
+    def __repr__(self) -> str:
+        return f"GuessResult({str(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GuessResult):
+            return self.packed == other.packed
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.packed)
+
+    @property
+    def won(self) -> bool:
+        """Whether every letter is correct."""
+        return self.packed & (self.packed - 1) == 0
+
+    @property
+    def any_correct(self) -> bool:
+        """Whether a letter is correct.
+
+        Subtracting 1 from every field only borrows from the zero ones,
+        the borrow sets the top bit of a field the colour did not set.
+        """
+        length = len(self)
+        ones = _ones(length)
+        fields = self.packed ^ 1 << (BITS * length)
+        return (fields - ones) & ~fields & ones << (BITS - 1) != 0
+
+
+class PackedGuessResult(TypeDecorator[GuessResult]):
+    """GuessResult stored as an INTEGER column, digits are accepted too."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(
+        self,
+        value: GuessResult | str | None,
+        dialect: Dialect,  # noqa: ARG002
+    ) -> int | None:
+        """Pack a result to be saved."""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = GuessResult.parse(value)
+        return value.packed
+
+    def process_result_value(
+        self,
+        value: Any,  # noqa: ANN401
+        dialect: Dialect,  # noqa: ARG002
+    ) -> GuessResult | None:
+        """Wrap a saved result, without unpacking its colours."""
+        return None if value is None else GuessResult(value)
@@ -0,0 +1,44 @@
+import secrets
+import threading
+import time
+from typing import Final
+from uuid import UUID
+
+COUNTER_BITS: Final[int] = 12
+VERSION: Final[int] = 7
+VARIANT: Final[int] = 0b10
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7(ms: int | None = None) -> UUID:
+    """Time-ordered UUID, as UUIDv7 of RFC 9562.
+
+    The first 48 bits are the unix time in milliseconds,
+    then a 12-bit counter keeps the ids of a millisecond in order,
+    the last 62 bits are random.
+    Given a time, ids are not kept in order with the other ones.
+    """
+    global _last_ms, _counter  # noqa: PLW0603
+    if ms is not None:
+        counter = secrets.randbits(COUNTER_BITS)
+    else:
+        with _lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > _last_ms:
+                _last_ms, _counter = ms, secrets.randbits(COUNTER_BITS - 1)
+            else:
+                # same millisecond or the clock went back, count on
+                _counter += 1
+                if _counter >> COUNTER_BITS:
+                    _last_ms, _counter = _last_ms + 1, 0
+            ms, counter = _last_ms, _counter
+    return UUID(
+        int=ms << 80
+        | VERSION << 76
+        | counter << 64
+        | VARIANT << 62
+        | secrets.randbits(62)
+    )
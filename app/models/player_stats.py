@@ -0,0 +1,20 @@
+from sqlalchemy import JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class PlayerStats(Base):
+    """Wordle stats of a player, kept up to date by every game event."""
+
+    __tablename__ = "player_stats"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    games: Mapped[int] = mapped_column(server_default="0")
+    wins: Mapped[int] = mapped_column(server_default="0")
+    aborted: Mapped[int] = mapped_column(server_default="0")
+    guesses: Mapped[int] = mapped_column(server_default="0")
+    # number of won games by number of guesses, keys are strings in JSON
+    histogram: Mapped[dict[str, int]] = mapped_column(
+        JSON, server_default="{}"
+    )
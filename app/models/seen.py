@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class Seen(Base):
+    """Bitmap of the trivias or words a player has already been given."""
+
+    __tablename__ = "seen"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(primary_key=True)
+    bitmap: Mapped[bytes]
+    updated_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
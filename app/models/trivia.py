@@ -1,6 +1,10 @@
+import hashlib
+from collections.abc import Iterable
 from datetime import datetime
 from enum import StrEnum, auto
 
+from sqlalchemy import String
+from sqlalchemy.engine.default import DefaultExecutionContext
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -14,6 +18,39 @@ class TriviaDifficulty(StrEnum):
     HARD = auto()
 
 
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def trivia_hash(
+    question: str,
+    correct_answer: str,
+    incorrect_answers: Iterable[str],
+) -> str:
+    """Hash of a question and its answers.
+
+    Case and whitespace are ignored, and so is the order
+    of the incorrect answers.
+    """
+    parts = [
+        _normalize(question),
+        _normalize(correct_answer),
+        *sorted(map(_normalize, incorrect_answers)),
+    ]
+    # the unit separator cannot be typed in a question
+    content = "\x1f".join(parts).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _default_hash(context: DefaultExecutionContext) -> str:
+    params = context.get_current_parameters()
+    return trivia_hash(
+        params["question"],
+        params["correct_answer"],
+        [params[f"incorrect_answer_{idx}"] for idx in range(1, 4)],
+    )
+
+
 class Trivia(Base):
     """Trivia model."""
 
@@ -32,3 +69,9 @@ class Trivia(Base):
     incorrect_answer_1: Mapped[str]
     incorrect_answer_2: Mapped[str]
     incorrect_answer_3: Mapped[str]
+    # the same question is only stored once
+    content_hash: Mapped[str] = mapped_column(
+        String(32),
+        unique=True,
+        default=_default_hash,
+    )
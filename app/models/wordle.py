@@ -1,12 +1,13 @@
 from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid4
+from uuid import UUID
 
-from sqlalchemy import asc, text
+from sqlalchemy import Index, asc, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
+from .ids import uuid7
 
 if TYPE_CHECKING:
     from .guess import Guess
@@ -25,20 +26,39 @@ class Wordle(Base):
     """Wordle model."""
 
     __tablename__ = "wordle"
+    __table_args__ = (
+        Index("ix_wordle_user_id_status", "user_id", "status"),
+        Index("ix_wordle_user_id_created_at", "user_id", "created_at"),
+        # at most one ACTIVE or PENDING wordle per user
+        Index(
+            "uq_wordle_user_id_ongoing",
+            "user_id",
+            unique=True,
+            sqlite_where=text(
+                f"status IN ({WordleStatus.ACTIVE.value}, "
+                f"{WordleStatus.PENDING.value})"
+            ),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
         index=True,
-        default=uuid4,
+        default=uuid7,
     )
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
     word: Mapped[str]
     user_id: Mapped[int]
     status: Mapped[int]
 
+    # the repositories load the guesses explicitly where they are shown
     guesses: Mapped[list["Guess"]] = relationship(
         back_populates="wordle",
-        order_by=asc(text("Guess.created_at")),
-        lazy="selectin",
+        # ids are time-ordered
+        order_by=asc(text("Guess.id")),
+        lazy="raise_on_sql",
     )
@@ -0,0 +1,34 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class WordleArchive(Base):
+    """Finished wordle moved out of the live tables, with its guesses.
+
+    The guesses are packed into the row, all of them have the length
+    of the word, so the contents and results are concatenated,
+    and the guess times are comma-separated microseconds
+    since the wordle was created.
+    """
+
+    __tablename__ = "wordle_archive"
+    __table_args__ = (
+        Index("ix_wordle_archive_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime]
+    updated_at: Mapped[datetime]
+    archived_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    word: Mapped[str]
+    user_id: Mapped[int]
+    status: Mapped[int]
+    guesses: Mapped[int]
+    contents: Mapped[str]
+    results: Mapped[str]
+    offsets: Mapped[str]
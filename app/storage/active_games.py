@@ -0,0 +1,87 @@
+from typing import Final
+from uuid import UUID
+
+from app.core.scoring import WordMasks, word_masks
+from app.models.guess import Guess
+from app.models.wordle import Wordle, WordleStatus
+
+
+class ActiveGameCache:
+    """Ongoing wordles of the players with their guesses and status.
+
+    The scoring masks of a wordle are kept along with it,
+    from its first guess until it is dropped.
+
+    Rows are detached from their session,
+    they are only changed in memory once the matching write is committed.
+    The bot runs in a single process,
+    which makes this process the only writer of the ongoing games.
+    """
+
+    MAX_GAMES: Final[int] = 4096
+    ONGOING: Final[frozenset[int]] = frozenset(
+        (WordleStatus.ACTIVE.value, WordleStatus.PENDING.value)
+    )
+
+    def __init__(self) -> None:
+        self._by_user: dict[int, Wordle] = {}
+        self._by_id: dict[UUID, Wordle] = {}
+        self._masks: dict[UUID, WordMasks | None] = {}
+
+    def get(self, user_id: int) -> Wordle | None:
+        """Ongoing wordle of a user, None if it is not cached."""
+        return self._by_user.get(user_id)
+
+    def get_by_id(self, id: UUID) -> Wordle | None:
+        """Ongoing wordle by id, None if it is not cached."""
+        return self._by_id.get(id)
+
+    def masks(self, id: UUID) -> WordMasks | None:
+        """Scoring masks of an ongoing wordle, None if it is not cached."""
+        wordle = self._by_id.get(id)
+        if wordle is None:
+            return None
+        if id not in self._masks:
+            self._masks[id] = word_masks(wordle.word)
+        return self._masks[id]
+
+    def put(self, wordle: Wordle) -> None:
+        """Cache an ongoing wordle with its loaded guesses."""
+        if wordle.status not in self.ONGOING:
+            return
+        if wordle.user_id not in self._by_user and (
+            len(self._by_user) >= self.MAX_GAMES
+        ):
+            self.discard(next(iter(self._by_user.values())).id)
+        self._by_user[wordle.user_id] = wordle
+        self._by_id[wordle.id] = wordle
+
+    def add_guess(self, guess: Guess) -> None:
+        """Append a saved guess to its wordle."""
+        wordle = self._by_id.get(guess.wordle_id)
+        if wordle is not None:
+            wordle.guesses.append(guess)
+
+    def set_status(self, id: UUID, status: int) -> None:
+        """Apply a saved status, finished wordles are dropped."""
+        wordle = self._by_id.get(id)
+        if wordle is None:
+            return
+        if status not in self.ONGOING:
+            self.discard(id)
+            return
+        wordle.status = status
+
+    def discard(self, id: UUID) -> None:
+        """Forget a wordle."""
+        wordle = self._by_id.pop(id, None)
+        self._masks.pop(id, None)
+        if wordle is not None:
+            self._by_user.pop(wordle.user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._by_user)
+
+
+# TODO: move this to a container
+active_games = ActiveGameCache()
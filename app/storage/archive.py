@@ -0,0 +1,224 @@
+"""Archival of the finished wordles.
+
+Finished wordles are moved with their guesses out of the live tables
+into ``wordle_archive``, one packed row per wordle.
+Run it once with ``python -m app.storage.archive``,
+the bot also archives periodically.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, Final
+from uuid import UUID
+
+from sqlalchemy import Connection, Row, delete, insert, select
+from sqlalchemy.orm import load_only
+
+from app.models.guess import Guess
+from app.models.wordle import Wordle, WordleStatus
+from app.models.wordle_archive import WordleArchive
+
+from .database import Database, database
+
+logger = logging.getLogger(__name__)
+
+MICROSECOND: Final[timedelta] = timedelta(microseconds=1)
+FINISHED: Final[list[int]] = [
+    WordleStatus.COMPLETED.value,
+    WordleStatus.ABORTED.value,
+]
+
+
+def pack(wordle: Row[Any], guesses: Sequence[Row[Any]]) -> dict[str, Any]:
+    """Archive row of a wordle and its guesses, oldest guess first."""
+    return {
+        "id": wordle.id,
+        "created_at": wordle.created_at,
+        "updated_at": wordle.updated_at,
+        "word": wordle.word,
+        "user_id": wordle.user_id,
+        "status": wordle.status,
+        "guesses": len(guesses),
+        "contents": "".join(guess.content for guess in guesses),
+        "results": "".join(str(guess.result) for guess in guesses),
+        "offsets": ",".join(
+            str((guess.created_at - wordle.created_at) // MICROSECOND)
+            for guess in guesses
+        ),
+    }
+
+
+def unpack(archived: WordleArchive, *, guesses: bool = True) -> Wordle:
+    """Rebuild a detached wordle, and its guesses unless told otherwise."""
+    wordle = Wordle(
+        id=archived.id,
+        created_at=archived.created_at,
+        updated_at=archived.updated_at,
+        word=archived.word,
+        user_id=archived.user_id,
+        status=archived.status,
+    )
+    if not guesses:
+        return wordle
+    length = len(archived.word)
+    offsets = archived.offsets.split(",") if archived.guesses else []
+    wordle.guesses = [
+        Guess(
+            created_at=archived.created_at
+            + timedelta(microseconds=int(offset)),
+            content=archived.contents[idx * length : (idx + 1) * length],
+            result=archived.results[idx * length : (idx + 1) * length],
+            wordle_id=archived.id,
+        )
+        for idx, offset in enumerate(offsets)
+    ]
+    return wordle
+
+
+def archive_finished(conn: Connection, cutoff: datetime, limit: int) -> int:
+    """Move finished wordles last changed before the cutoff, at most limit."""
+    wordles = conn.execute(
+        select(
+            Wordle.id,
+            Wordle.created_at,
+            Wordle.updated_at,
+            Wordle.word,
+            Wordle.user_id,
+            Wordle.status,
+        )
+        .where(Wordle.status.in_(FINISHED), Wordle.updated_at < cutoff)
+        .limit(limit)
+    ).all()
+    if not wordles:
+        return 0
+
+    ids = [wordle.id for wordle in wordles]
+    guesses: dict[UUID, list[Row[Any]]] = {}
+    for guess in conn.execute(
+        select(Guess.wordle_id, Guess.created_at, Guess.content, Guess.result)
+        .where(Guess.wordle_id.in_(ids))
+        .order_by(Guess.wordle_id, Guess.id)
+    ):
+        guesses.setdefault(guess.wordle_id, []).append(guess)
+
+    conn.execute(
+        insert(WordleArchive),
+        [pack(wordle, guesses.get(wordle.id, [])) for wordle in wordles],
+    )
+    conn.execute(delete(Guess).where(Guess.wordle_id.in_(ids)))
+    conn.execute(delete(Wordle).where(Wordle.id.in_(ids)))
+    return len(wordles)
+
+
+class ArchiveRepo:
+    """Repository for the archived wordles."""
+
+    AFTER_DAYS: Final[float] = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    BATCH: Final[int] = int(os.getenv("ARCHIVE_BATCH", "500"))
+    INTERVAL_SECONDS: Final[float] = float(
+        os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600")
+    )
+
+    def __init__(self, db: Database) -> None:
+        self.db: Database = db
+        self._task: asyncio.Task[None] | None = None
+
+    async def archive(
+        self,
+        after: timedelta | None = None,
+        batch: int | None = None,
+    ) -> int:
+        """Archive the wordles finished for a while, return how many.
+
+        Every batch is its own short transaction,
+        the bot keeps playing in between.
+        """
+        if after is None:
+            after = timedelta(days=self.AFTER_DAYS)
+        # the wordle times are naive UTC
+        cutoff = datetime.utcnow() - after  # noqa: DTZ003
+        batch = batch or self.BATCH
+        archived = 0
+        while True:
+            async with self.db.engine.begin() as conn:
+                moved = await conn.run_sync(archive_finished, cutoff, batch)
+            archived += moved
+            if moved < batch:
+                break
+        logger.info("[archive] archived %d wordles", archived)
+        return archived
+
+    async def get(self, id: UUID) -> Wordle | None:
+        """Get an archived wordle with its guesses."""
+        async with self.db.create_read_session() as session:
+            archived = await session.get(WordleArchive, id)
+        return None if archived is None else unpack(archived)
+
+    async def get_by_user_id(self, user_id: int) -> Sequence[Wordle]:
+        """Get the archived wordles of a user, without their guesses."""
+        async with self.db.create_read_session() as session:
+            stmt = (
+                select(WordleArchive)
+                .where(WordleArchive.user_id == user_id)
+                .options(
+                    load_only(
+                        WordleArchive.id,
+                        WordleArchive.created_at,
+                        WordleArchive.updated_at,
+                        WordleArchive.word,
+                        WordleArchive.user_id,
+                        WordleArchive.status,
+                    )
+                )
+            )
+            result = await session.execute(stmt)
+            return [
+                unpack(archived, guesses=False)
+                for archived in result.scalars()
+            ]
+
+    async def _archive_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.INTERVAL_SECONDS)
+            try:
+                await self.archive()
+            except Exception:
+                logger.exception("[archive] archival failed")
+
+    def start(self) -> None:
+        """Archive periodically in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._archive_forever())
+
+    async def stop(self) -> None:
+        """Stop archiving."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# TODO: move this to a container
+archive_repo = ArchiveRepo(database)
+
+
+def main() -> None:
+    """Archive the finished wordles from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--days",
+        type=float,
+        default=ArchiveRepo.AFTER_DAYS,
+        help="archive the wordles finished for that many days",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(archive_repo.archive(timedelta(days=args.days)))
+
+
+if __name__ == "__main__":
+    main()
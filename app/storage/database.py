@@ -1,24 +1,109 @@
+import os
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from functools import cached_property
-from typing import Any
+from typing import Any, Final
 
+from sqlalchemy import event, make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
 
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """PRAGMAs applied to every pooled SQLite connection.
+
+    WAL lets readers run alongside the writer,
+    synchronous=NORMAL only fsyncs at checkpoints in WAL mode.
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    # negative sizes are in KiB
+    cache_size: int = -64 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+    read_pool_size: int = 5
+    # read-only connections skip locking and change detection,
+    # only for files that are never written while the app runs,
+    # SQLite may return wrong results or SQLITE_CORRUPT otherwise
+    immutable: bool = False
+
+    def pragmas(self, *, read_only: bool = False) -> list[str]:
+        """PRAGMA statements of a writer or a read-only connection."""
+        pragmas = [
+            f"PRAGMA busy_timeout = {self.busy_timeout_ms}",
+            f"PRAGMA mmap_size = {self.mmap_size}",
+            f"PRAGMA cache_size = {self.cache_size}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+        if read_only:
+            return [*pragmas, "PRAGMA query_only = ON"]
+        return [
+            f"PRAGMA journal_mode = {self.journal_mode}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            *pragmas,
+        ]
+
+
 class Database:
-    """Database wrapper."""
+    """Database wrapper.
+
+    With a SQLite profile, sessions opened by create_read_session
+    use a separate pool of read-only connections,
+    so stats queries never hold the writer's connections.
+    """
+
+    MEMORY: Final[frozenset[str | None]] = frozenset((None, "", ":memory:"))
 
-    def __init__(self, url: str, **kw: dict[str, Any]) -> None:
+    def __init__(
+        self,
+        url: str,
+        profile: SQLiteProfile | None = None,
+        **kw: dict[str, Any],
+    ) -> None:
+        self.url = make_url(url)
+        self.profile = profile
         self.engine = create_async_engine(
             url,
             pool_pre_ping=True,
             echo=kw.pop("echo", False),
         )
+        if profile is not None:
+            self._apply_profile(self.engine, profile.pragmas())
+
+    @staticmethod
+    def _apply_profile(engine: AsyncEngine, pragmas: list[str]) -> None:
+        def on_connect(dbapi_connection: Any, _: Any) -> None:  # noqa: ANN401
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+        event.listen(engine.sync_engine, "connect", on_connect)
+
+    @cached_property
+    def read_engine(self) -> AsyncEngine:
+        """Engine of read-only connections, the main one without a profile."""
+        if self.profile is None or self.url.database in self.MEMORY:
+            return self.engine
+        immutable = "&immutable=1" if self.profile.immutable else ""
+        engine = create_async_engine(
+            self.url.set(
+                database=f"file:{self.url.database}?mode=ro{immutable}",
+                query={"uri": "true"},
+            ),
+            pool_pre_ping=True,
+            pool_size=self.profile.read_pool_size,
+        )
+        self._apply_profile(engine, self.profile.pragmas(read_only=True))
+        return engine
 
     @cached_property
     def session_maker(self) -> async_sessionmaker[AsyncSession]:
@@ -29,6 +114,15 @@ class Database:
             expire_on_commit=False,
         )
 
+    @cached_property
+    def read_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """Cached session maker of the read-only pool."""
+        return async_sessionmaker(
+            self.read_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
     @asynccontextmanager
     async def create_session(self) -> AsyncIterator[AsyncSession]:
         """Create a session context manager."""
@@ -41,7 +135,29 @@ class Database:
             finally:
                 await async_session.close()
 
+    @asynccontextmanager
+    async def create_read_session(self) -> AsyncIterator[AsyncSession]:
+        """Create a session on the read-only pool."""
+        async with self.read_session_maker() as async_session:
+            try:
+                yield async_session
+            finally:
+                await async_session.close()
+
+    async def dispose(self) -> None:
+        """Close the connections of every pool."""
+        read_engine = self.__dict__.get("read_engine", self.engine)
+        if read_engine is not self.engine:
+            await read_engine.dispose()
+        await self.engine.dispose()
+
 
 # TODO: move this to a container
-database = Database("sqlite+aiosqlite:///./test.db")
-trivia_database = Database("sqlite+aiosqlite:///./trivia.db")
+database = Database("sqlite+aiosqlite:///./test.db", SQLiteProfile())
+# only for a frozen trivia.db, gather_trivias writes to it otherwise
+TRIVIA_DB_IMMUTABLE: Final[bool] = os.getenv("TRIVIA_DB_IMMUTABLE", "0") == "1"
+# trivia only changes when gather_trivias runs, without a WAL to replay
+trivia_database = Database(
+    "sqlite+aiosqlite:///./trivia.db",
+    SQLiteProfile(journal_mode="DELETE", immutable=TRIVIA_DB_IMMUTABLE),
+)
@@ -2,33 +2,59 @@ from collections.abc import Sequence
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import Result, select
+from sqlalchemy import Result, func, select
 from sqlalchemy.sql.functions import count
 
 from app.models.guess import Guess
+from app.models.guess_result import GuessResult
+from app.models.wordle_archive import WordleArchive
 
+from .active_games import ActiveGameCache, active_games
+from .archive import ArchiveRepo
 from .database import Database, database
+from .guess_writer import GuessWriter, guess_writer
+from .player_stats import count_guess
 
 
 class GuessRepo:
-    """Repository for interacting with Guess."""
+    """Repository for interacting with Guess.
 
-    def __init__(self, db: Database) -> None:
+    With a writer, guesses are committed in groups by its task.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        cache: ActiveGameCache | None = None,
+        writer: GuessWriter | None = None,
+    ) -> None:
         self.db: Database = db
+        self.cache: ActiveGameCache | None = cache
+        self.writer: GuessWriter | None = writer
+
+    @property
+    def archive(self) -> ArchiveRepo:
+        """Archived wordles of the same database."""
+        return ArchiveRepo(self.db)
 
     async def create(
         self,
         content: str,
-        result: str,
+        result: GuessResult | str,
         wordle_id: UUID,
     ) -> Guess:
-        """Create a guess."""
-        async with self.db.create_session() as session:
-            guess = Guess(content=content, result=result, wordle_id=wordle_id)
-            session.add(guess)
-            await session.commit()
-            await session.refresh(guess)
-            return guess
+        """Create a guess, appended to its wordle if it is cached."""
+        guess = Guess(content=content, result=result, wordle_id=wordle_id)
+        if self.writer is not None:
+            await self.writer.write(guess)
+        else:
+            async with self.db.create_session() as session:
+                session.add(guess)
+                await session.execute(count_guess(wordle_id))
+                await session.commit()
+        if self.cache is not None:
+            self.cache.add_guess(guess)
+        return guess
 
     async def get(self, id: UUID) -> Guess | None:
         """Get guess by id."""
@@ -39,20 +65,27 @@ class GuessRepo:
             return guess
 
     async def get_by_wordle_id(self, wordle_id: UUID) -> Sequence[Guess]:
-        """Get all guesses by wordle ID."""
+        """Get all guesses by wordle ID, archived ones included."""
         async with self.db.create_session() as session:
             stmt = select(Guess).where(Guess.wordle_id == wordle_id)
             result: Result[Any] = await session.execute(stmt)
             guesses: Sequence[Guess] = result.scalars().all()
+        if guesses:
             return guesses
+        archived = await self.archive.get(wordle_id)
+        return [] if archived is None else archived.guesses
 
     async def count_by_wordle_ids(self, wordle_ids: Sequence[UUID]) -> int:
-        """Count number of guesses by all wordle IDs."""
-        async with self.db.create_session() as session:
-            stmt = (
+        """Count the guesses of all wordle IDs, archived ones included."""
+        async with self.db.create_read_session() as session:
+            stmt = select(
                 select(count())
                 .select_from(Guess)
                 .where(Guess.wordle_id.in_(wordle_ids))
+                .scalar_subquery()
+                + select(func.coalesce(func.sum(WordleArchive.guesses), 0))
+                .where(WordleArchive.id.in_(wordle_ids))
+                .scalar_subquery()
             )
             result: Result[Any] = await session.execute(stmt)
             cnt: int = result.scalar()
@@ -60,4 +93,8 @@ class GuessRepo:
 
 
 # TODO: move this to a container
-guess_repo = GuessRepo(database)
+guess_repo = GuessRepo(
+    database,
+    active_games,
+    guess_writer if GuessWriter.ENABLED else None,
+)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Final
+
+from app.models.guess import Guess
+
+from .database import Database, database
+from .player_stats import count_guess
+
+logger = logging.getLogger(__name__)
+
+
+class GuessWriter:
+    """Write-behind queue committing the guesses in groups.
+
+    A single task waits for the first queued guess,
+    lets more arrive for a few milliseconds,
+    then inserts all of them in one transaction, paying one fsync.
+    Callers wait until their guess is committed.
+    When a group fails, its guesses are retried one by one,
+    so only the faulty ones fail.
+    """
+
+    ENABLED: Final[bool] = os.getenv("GUESS_WRITE_BEHIND", "0") == "1"
+    FLUSH_MS: Final[float] = float(os.getenv("GUESS_FLUSH_MS", "5"))
+    MAX_BATCH: Final[int] = int(os.getenv("GUESS_MAX_BATCH", "256"))
+
+    def __init__(
+        self,
+        db: Database,
+        flush_ms: float | None = None,
+        max_batch: int | None = None,
+    ) -> None:
+        self.db: Database = db
+        self.flush_ms: float = self.FLUSH_MS if flush_ms is None else flush_ms
+        self.max_batch: int = max_batch or self.MAX_BATCH
+        self.queue: asyncio.Queue[tuple[Guess, asyncio.Future[None]]] = (
+            asyncio.Queue()
+        )
+        self._task: asyncio.Task[None] | None = None
+
+    async def write(self, guess: Guess) -> None:
+        """Queue a guess and wait until it is committed."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((guess, future))
+        await future
+
+    async def _commit(self, guesses: list[Guess]) -> None:
+        async with self.db.create_session() as session:
+            session.add_all(guesses)
+            for wordle_id, count in Counter(
+                guess.wordle_id for guess in guesses
+            ).items():
+                await session.execute(count_guess(wordle_id, count))
+            await session.commit()
+
+    async def _flush(
+        self,
+        batch: list[tuple[Guess, asyncio.Future[None]]],
+    ) -> None:
+        try:
+            await self._commit([guess for guess, _ in batch])
+        # the error is handed over to the callers
+        except Exception as exc:  # noqa: BLE001
+            if len(batch) > 1:
+                logger.warning(
+                    "[guess] group of %d failed, retrying one by one",
+                    len(batch),
+                )
+                for item in batch:
+                    await self._flush([item])
+                return
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(exc)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(self.flush_ms / 1000)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Commit the queued guesses, then stop the writer task."""
+        if self._task is None:
+            return
+        await self.queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+# TODO: move this to a container
+guess_writer = GuessWriter(database)
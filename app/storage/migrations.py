@@ -0,0 +1,243 @@
+"""Schema migrations of the SQLite databases.
+
+The schema version is kept in ``PRAGMA user_version``.
+Missing tables are created from the models,
+then every migration newer than the version runs in one transaction.
+``test.db`` and ``trivia.db`` have their own tables and migrations.
+Append new migrations at the end, never reorder them.
+"""
+
+import logging
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
+from typing import Final
+
+from sqlalchemy import Connection, Table
+
+# every model is imported, so the metadata knows all the tables
+from app.models import (  # noqa: F401
+    guess,
+    player,
+    player_stats,
+    seen,
+    trivia,
+    wordle_archive,
+)
+from app.models.base import Base
+from app.models.guess_result import GuessResult
+from app.models.ids import uuid7
+from app.models.wordle import WordleStatus
+
+from .database import Database
+from .player_stats import rebuild_player_stats
+from .trivia import dedupe_trivias
+
+logger = logging.getLogger(__name__)
+
+TRIVIA_TABLES: Final[list[Table]] = [Base.metadata.tables["trivia"]]
+TABLES: Final[list[Table]] = [
+    table
+    for table in Base.metadata.sorted_tables
+    if table not in TRIVIA_TABLES
+]
+PACK_BATCH: Final[int] = 10_000
+PACKED_GUESS_TABLE: Final[str] = """
+CREATE TABLE guess (
+    id CHAR(32) NOT NULL,
+    created_at DATETIME NOT NULL,
+    content VARCHAR NOT NULL,
+    result INTEGER NOT NULL,
+    wordle_id CHAR(32) NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(wordle_id) REFERENCES wordle (id)
+)
+"""
+PACKED_GUESS_INDEXES: Final[dict[str, str]] = {
+    "ix_guess_id": "id",
+    "ix_guess_wordle_id_created_at": "wordle_id, created_at",
+}
+
+
+def _create_indexes(conn: Connection) -> None:
+    """Create the indexes declared on the models."""
+    for table in TABLES:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _one_ongoing_wordle(conn: Connection) -> None:
+    """Abort all but the latest ongoing wordle of every user."""
+    ongoing = f"({WordleStatus.ACTIVE.value}, {WordleStatus.PENDING.value})"
+    result = conn.exec_driver_sql(
+        f"""
+        UPDATE wordle SET status = {WordleStatus.ABORTED.value}
+        WHERE status IN {ongoing} AND EXISTS (
+            SELECT 1 FROM wordle AS newer
+            WHERE newer.user_id = wordle.user_id
+            AND newer.status IN {ongoing}
+            AND (
+                newer.created_at > wordle.created_at
+                OR (
+                    newer.created_at = wordle.created_at
+                    AND newer.id > wordle.id
+                )
+            )
+        )
+        """  # noqa: S608
+    )
+    logger.info("[migrations] aborted %d duplicate wordles", result.rowcount)
+
+
+def _index_hot_queries(conn: Connection) -> None:
+    _one_ongoing_wordle(conn)
+    _create_indexes(conn)
+
+
+def _backfill_player_stats(conn: Connection) -> None:
+    rebuild_player_stats(conn)
+
+
+def _pack_guess_results(conn: Connection) -> None:
+    """Rebuild the guess table with the results packed into integers."""
+    columns = conn.exec_driver_sql(
+        "SELECT name, type FROM pragma_table_info('guess')"
+    )
+    if dict(columns.tuples().all())["result"] == "INTEGER":
+        return
+    conn.exec_driver_sql("ALTER TABLE guess RENAME TO guess_text")
+    # the schema of this version, later changes to the model do not apply
+    for index in PACKED_GUESS_INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+    conn.exec_driver_sql(PACKED_GUESS_TABLE)
+    for index, indexed in PACKED_GUESS_INDEXES.items():
+        conn.exec_driver_sql(f"CREATE INDEX {index} ON guess ({indexed})")
+
+    rows = conn.exec_driver_sql(
+        "SELECT id, created_at, content, result, wordle_id FROM guess_text"
+    )
+    packed = 0
+    for partition in rows.partitions(PACK_BATCH):
+        conn.exec_driver_sql(
+            "INSERT INTO guess (id, created_at, content, result, wordle_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    id,
+                    created_at,
+                    content,
+                    GuessResult.parse(result).packed,
+                    wordle_id,
+                )
+                for id, created_at, content, result, wordle_id in partition
+            ],
+        )
+        packed += len(partition)
+    conn.exec_driver_sql("DROP TABLE guess_text")
+    logger.info("[migrations] packed the results of %d guesses", packed)
+
+
+def _uuid7_at(created_at: str) -> str:
+    # the times are saved as naive UTC
+    ms = datetime.fromisoformat(created_at).replace(tzinfo=UTC).timestamp()
+    return uuid7(int(ms * 1000)).hex
+
+
+def _time_ordered_ids(conn: Connection) -> None:
+    """Re-key random ids with time-ordered ones from the creation times."""
+    for table in ("wordle", "wordle_archive", "guess"):
+        # the 13th hex digit of an id is its UUID version
+        ids = [
+            (_uuid7_at(created_at), id)
+            for id, created_at in conn.exec_driver_sql(
+                f"SELECT id, created_at FROM {table}"  # noqa: S608
+                " WHERE substr(id, 13, 1) != '7'"
+            )
+        ]
+        if not ids:
+            continue
+        conn.exec_driver_sql(
+            f"UPDATE {table} SET id = ? WHERE id = ?",  # noqa: S608
+            ids,
+        )
+        if table == "wordle":
+            conn.exec_driver_sql(
+                "UPDATE guess SET wordle_id = ? WHERE wordle_id = ?", ids
+            )
+        logger.info("[migrations] re-keyed %d %s rows", len(ids), table)
+
+
+def _hash_trivias(conn: Connection) -> None:
+    """Add the content hashes of the trivias, dropping the duplicates."""
+    columns = conn.exec_driver_sql(
+        "SELECT name FROM pragma_table_info('trivia')"
+    )
+    if "content_hash" in columns.scalars().all():
+        return
+    # SQLite cannot add a UNIQUE column, the index is created after
+    conn.exec_driver_sql(
+        "ALTER TABLE trivia ADD COLUMN content_hash VARCHAR(32)"
+    )
+    dedupe_trivias(conn)
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX uq_trivia_content_hash ON trivia (content_hash)"
+    )
+
+
+def _moved_hash_trivias(_: Connection) -> None:
+    """Hashed the trivias, they moved to the trivia.db migrations."""
+
+
+def _index_guesses_by_id(conn: Connection) -> None:
+    """Index the guesses of a wordle by their time-ordered ids."""
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_guess_wordle_id_created_at")
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_guess_wordle_id_id "
+        "ON guess (wordle_id, id)"
+    )
+
+
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    _index_hot_queries,
+    _backfill_player_stats,
+    _pack_guess_results,
+    _time_ordered_ids,
+    _moved_hash_trivias,
+    _index_guesses_by_id,
+]
+TRIVIA_MIGRATIONS: list[Callable[[Connection], None]] = [
+    _hash_trivias,
+]
+
+
+def schema_version(conn: Connection) -> int:
+    """Version of the schema of a database."""
+    version: int = conn.exec_driver_sql("PRAGMA user_version").scalar_one()
+    return version
+
+
+def _migrate(
+    conn: Connection,
+    migrations: Sequence[Callable[[Connection], None]],
+    tables: Sequence[Table],
+) -> None:
+    Base.metadata.create_all(conn, tables=tables)
+    version = schema_version(conn)
+    for target, migration in enumerate(migrations[version:], version + 1):
+        logger.info("[migrations] %s -> %d", migration.__name__, target)
+        migration(conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {target}")
+
+
+async def migrate(
+    db: Database,
+    migrations: Sequence[Callable[[Connection], None]] = MIGRATIONS,
+    tables: Sequence[Table] = TABLES,
+) -> None:
+    """Bring the schema of a database up to date, test.db by default."""
+    async with db.engine.begin() as conn:
+        await conn.run_sync(_migrate, migrations, tables)
+
+
+async def migrate_trivia(db: Database) -> None:
+    """Bring the schema of a trivia database up to date."""
+    await migrate(db, TRIVIA_MIGRATIONS, TRIVIA_TABLES)
@@ -1,3 +1,5 @@
+from collections.abc import Sequence
+
 from sqlalchemy import select
 
 from app.models.player import Player
@@ -26,7 +28,6 @@ class PlayerRepo:
             )
             session.add(player)
             await session.commit()
-            await session.refresh(player)
             return player
 
     async def get(self, id: int) -> Player | None:
@@ -37,5 +38,12 @@ class PlayerRepo:
             player: Player | None = result.scalar()
             return player
 
+    async def get_many(self, ids: Sequence[int]) -> Sequence[Player]:
+        """Get the players of some ids."""
+        async with self.db.create_read_session() as session:
+            stmt = select(Player).where(Player.id.in_(ids))
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
 
 player_repo = PlayerRepo(database)
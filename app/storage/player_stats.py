@@ -0,0 +1,179 @@
+"""Materialized wordle stats of the players.
+
+Every game event bumps the counters in the same transaction as its write,
+rebuild them from the games with
+``python -m app.storage.player_stats``.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import (
+    Connection,
+    Insert,
+    String,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.sqlite import insert as upsert
+from sqlalchemy.sql.functions import count
+
+from app.models.guess import Guess
+from app.models.player_stats import PlayerStats
+from app.models.wordle import Wordle, WordleStatus
+from app.models.wordle_archive import WordleArchive
+
+from .database import Database, database
+
+logger = logging.getLogger(__name__)
+
+
+def count_game(user_id: int) -> Insert:
+    """Statement counting a started game."""
+    stmt = upsert(PlayerStats).values(user_id=user_id, games=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[PlayerStats.user_id],
+        set_={"games": PlayerStats.games + 1},
+    )
+
+
+def _count_for_wordle(wordle_id: UUID, column: str, amount: int = 1) -> Insert:
+    stmt = upsert(PlayerStats).from_select(
+        ["user_id", column],
+        select(Wordle.user_id, literal(amount)).where(Wordle.id == wordle_id),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[PlayerStats.user_id],
+        set_={column: getattr(PlayerStats, column) + amount},
+    )
+
+
+def count_guess(wordle_id: UUID, guesses: int = 1) -> Insert:
+    """Statement counting the guesses of a wordle."""
+    return _count_for_wordle(wordle_id, "guesses", guesses)
+
+
+def count_abort(wordle_id: UUID) -> Insert:
+    """Statement counting an ended wordle."""
+    return _count_for_wordle(wordle_id, "aborted")
+
+
+def count_win(wordle_id: UUID) -> Insert:
+    """Statement counting a won wordle and its guesses in the histogram."""
+    guesses = (
+        select(count())
+        .select_from(Guess)
+        .where(Guess.wordle_id == wordle_id)
+        .scalar_subquery()
+    )
+    path = literal('$."') + cast(guesses, String) + literal('"')
+    stmt = upsert(PlayerStats).from_select(
+        ["user_id", "wins", "histogram"],
+        select(
+            Wordle.user_id,
+            literal(1),
+            func.json_object(cast(guesses, String), 1),
+        ).where(Wordle.id == wordle_id),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[PlayerStats.user_id],
+        set_={
+            "wins": PlayerStats.wins + 1,
+            "histogram": func.json_set(
+                PlayerStats.histogram,
+                path,
+                func.coalesce(
+                    func.json_extract(PlayerStats.histogram, path), 0
+                )
+                + 1,
+            ),
+        },
+    )
+
+
+def rebuild_player_stats(conn: Connection) -> int:
+    """Recompute the stats of every player from the live and archived games."""
+    rows = conn.execute(
+        select(Wordle.user_id, Wordle.status, count(Guess.id))
+        .outerjoin(Guess, Guess.wordle_id == Wordle.id)
+        .group_by(Wordle.id)
+        .union_all(
+            select(
+                WordleArchive.user_id,
+                WordleArchive.status,
+                WordleArchive.guesses,
+            )
+        )
+    )
+    stats: dict[int, dict[str, Any]] = {}
+    for user_id, status, guesses in rows:
+        player = stats.setdefault(
+            user_id,
+            {
+                "user_id": user_id,
+                "games": 0,
+                "wins": 0,
+                "aborted": 0,
+                "guesses": 0,
+                "histogram": Counter(),
+            },
+        )
+        player["games"] += 1
+        player["guesses"] += guesses
+        if status == WordleStatus.COMPLETED.value:
+            player["wins"] += 1
+            player["histogram"][str(guesses)] += 1
+        elif status == WordleStatus.ABORTED.value:
+            player["aborted"] += 1
+
+    conn.execute(delete(PlayerStats))
+    if stats:
+        conn.execute(
+            insert(PlayerStats),
+            [
+                {**player, "histogram": dict(player["histogram"])}
+                for player in stats.values()
+            ],
+        )
+    logger.info("[stats] rebuilt the stats of %d players", len(stats))
+    return len(stats)
+
+
+class PlayerStatsRepo:
+    """Repository for reading the player stats."""
+
+    def __init__(self, db: Database) -> None:
+        self.db: Database = db
+
+    async def get(self, user_id: int) -> PlayerStats | None:
+        """Get the stats of a player."""
+        async with self.db.create_read_session() as session:
+            return await session.get(PlayerStats, user_id)
+
+    async def get_all(self) -> Sequence[PlayerStats]:
+        """Get the stats of every player."""
+        async with self.db.create_read_session() as session:
+            result = await session.execute(select(PlayerStats))
+            return result.scalars().all()
+
+    async def rebuild(self) -> int:
+        """Recompute the stats of every player from the games."""
+        async with self.db.engine.begin() as conn:
+            return await conn.run_sync(rebuild_player_stats)
+
+
+# TODO: move this to a container
+player_stats_repo = PlayerStatsRepo(database)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(player_stats_repo.rebuild())
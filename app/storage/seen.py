@@ -0,0 +1,150 @@
+import secrets
+from collections.abc import Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Final
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.models.seen import Seen
+
+from .database import Database, database
+
+
+class Bitmap:
+    """Set of small non-negative ints, one bit each."""
+
+    def __init__(self, data: bytes = b"") -> None:
+        self.data = bytearray(data)
+
+    def __contains__(self, idx: int) -> bool:
+        byte = idx >> 3
+        return byte < len(self.data) and bool(self.data[byte] >> (idx & 7) & 1)
+
+    def add(self, idx: int) -> None:
+        """Set the bit of an int."""
+        byte = idx >> 3
+        if byte >= len(self.data):
+            self.data.extend(bytes(byte + 1 - len(self.data)))
+        self.data[byte] |= 1 << (idx & 7)
+
+    def discard_all(self, ids: Iterable[int]) -> None:
+        """Clear the bits of the ints."""
+        for idx in ids:
+            byte = idx >> 3
+            if byte < len(self.data):
+                self.data[byte] &= ~(1 << (idx & 7)) & 0xFF
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.data.rstrip(b"\x00"))
+
+
+@dataclass
+class SeenSet:
+    """What a player has seen of one kind of item."""
+
+    bitmap: Bitmap
+    # unseen items of the buckets that are mostly seen
+    leftovers: dict[Hashable, list[int]] = field(default_factory=dict)
+
+    def take(self, idx: int) -> bool:
+        """Mark an item as seen, False if it already was."""
+        if idx in self.bitmap:
+            return False
+        self.bitmap.add(idx)
+        return True
+
+    def pick(self, bucket: Sequence[int], key: Hashable) -> int:
+        """Pick an unseen item of the bucket and mark it as seen.
+
+        Random tries succeed right away while most items are unseen.
+        Once they keep failing, the unseen items left are listed once
+        and drawn until none is left, then the bucket starts over.
+        """
+        leftovers = self.leftovers.get(key)
+        if leftovers is None:
+            for _ in range(SeenRepo.TRIES):
+                idx = secrets.choice(bucket)
+                if self.take(idx):
+                    return idx
+            leftovers = [idx for idx in bucket if idx not in self.bitmap]
+            self.leftovers[key] = leftovers
+
+        while leftovers:
+            # swap-remove a random leftover
+            pos = secrets.randbelow(len(leftovers))
+            leftovers[pos], leftovers[-1] = leftovers[-1], leftovers[pos]
+            idx = leftovers.pop()
+            if self.take(idx):
+                return idx
+
+        del self.leftovers[key]
+        self.bitmap.discard_all(bucket)
+        return self.pick(bucket, key)
+
+
+class SeenRepo:
+    """Repository of the seen bitmaps, cached in memory."""
+
+    TRIVIA: Final[str] = "trivia"
+    WORD: Final[str] = "word"
+
+    TRIES: Final[int] = 8
+    MAX_USERS: Final[int] = 4096
+
+    def __init__(self, db: Database) -> None:
+        self.db: Database = db
+        self._cache: dict[tuple[int, str], SeenSet] = {}
+
+    async def get(self, user_id: int, kind: str) -> SeenSet:
+        """Get what a player has seen of a kind of item."""
+        seen = self._cache.get((user_id, kind))
+        if seen is not None:
+            return seen
+        async with self.db.create_session() as session:
+            stmt = select(Seen.bitmap).where(
+                Seen.user_id == user_id,
+                Seen.kind == kind,
+            )
+            result = await session.execute(stmt)
+            bitmap: bytes | None = result.scalar()
+        if len(self._cache) >= self.MAX_USERS:
+            self._cache.pop(next(iter(self._cache)))
+        seen = self._cache[(user_id, kind)] = SeenSet(Bitmap(bitmap or b""))
+        return seen
+
+    async def save(self, user_id: int, kind: str, seen: SeenSet) -> None:
+        """Save the bitmap of a player."""
+        async with self.db.create_session() as session:
+            stmt = insert(Seen).values(
+                user_id=user_id,
+                kind=kind,
+                bitmap=bytes(seen.bitmap),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Seen.user_id, Seen.kind],
+                set_={
+                    "bitmap": stmt.excluded.bitmap,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def pick(
+        self,
+        user_id: int,
+        kind: str,
+        bucket: Sequence[int],
+        key: Hashable = None,
+    ) -> int:
+        """Pick an item of the bucket the player has not seen yet."""
+        assert len(bucket) > 0, "the bucket is empty"
+        seen = await self.get(user_id, kind)
+        idx = seen.pick(bucket, key)
+        await self.save(user_id, kind, seen)
+        return idx
+
+
+# TODO: move this to a container
+seen_repo = SeenRepo(database)
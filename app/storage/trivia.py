@@ -1,9 +1,66 @@
-from sqlalchemy import func, select
+import logging
+from collections.abc import Sequence
+from typing import Any, Final
 
-from app.models.trivia import Trivia
+from sqlalchemy import Connection, Row, delete, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert as upsert
+
+from app.models.trivia import Trivia, TriviaDifficulty, trivia_hash
 
 from .database import Database, trivia_database
 
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH: Final[int] = 10_000
+
+
+def dedupe_trivias(conn: Connection) -> int:
+    """Hash every trivia and delete the duplicates, return how many.
+
+    The oldest copy of a question is kept.
+    """
+    rows = conn.execute(
+        select(
+            Trivia.id,
+            Trivia.content_hash,
+            Trivia.question,
+            Trivia.correct_answer,
+            Trivia.incorrect_answer_1,
+            Trivia.incorrect_answer_2,
+            Trivia.incorrect_answer_3,
+        ).order_by(Trivia.id)
+    )
+    kept: set[str] = set()
+    duplicates: list[int] = []
+    rehashed: list[tuple[str, int]] = []
+    for row in rows:
+        digest = trivia_hash(
+            row.question,
+            row.correct_answer,
+            [
+                row.incorrect_answer_1,
+                row.incorrect_answer_2,
+                row.incorrect_answer_3,
+            ],
+        )
+        if digest in kept:
+            duplicates.append(row.id)
+            continue
+        kept.add(digest)
+        if row.content_hash != digest:
+            rehashed.append((digest, row.id))
+
+    # the duplicates go first, so the new hashes never collide
+    for start in range(0, len(duplicates), DELETE_BATCH):
+        batch = duplicates[start : start + DELETE_BATCH]
+        conn.execute(delete(Trivia).where(Trivia.id.in_(batch)))
+    if rehashed:
+        conn.exec_driver_sql(
+            "UPDATE trivia SET content_hash = ? WHERE id = ?", rehashed
+        )
+    logger.info("[trivia] deleted %d duplicate trivias", len(duplicates))
+    return len(duplicates)
+
 
 class TriviaRepo:
     """Repository for interacting with Trivia."""
@@ -15,13 +72,82 @@ class TriviaRepo:
         self,
         trivia: Trivia,
     ) -> Trivia:
-        """Create a trivia."""
+        """Create a trivia, return the stored one.
+
+        Like create_many, a trivia whose content hash is already stored
+        is skipped rather than raising, the stored copy is returned.
+        """
+        values = {
+            column.key: value
+            for column in inspect(Trivia).column_attrs
+            if (value := getattr(trivia, column.key)) is not None
+        }
+        stmt = upsert(Trivia).on_conflict_do_nothing(
+            index_elements=[Trivia.content_hash]
+        )
+        digest = trivia_hash(
+            trivia.question,
+            trivia.correct_answer,
+            [
+                trivia.incorrect_answer_1,
+                trivia.incorrect_answer_2,
+                trivia.incorrect_answer_3,
+            ],
+        )
         async with self.db.create_session() as session:
-            session.add(trivia)
+            await session.execute(stmt, [values])
             await session.commit()
-            await session.refresh(trivia)
+            result = await session.execute(
+                select(Trivia).where(Trivia.content_hash == digest)
+            )
+            return result.scalar_one()
+
+    async def create_many(self, trivias: Sequence[dict[str, Any]]) -> int:
+        """Insert trivias in one transaction, return how many are new.
+
+        Trivias whose content hash is already stored are skipped.
+        """
+        if not trivias:
+            return 0
+        stmt = upsert(Trivia).on_conflict_do_nothing(
+            index_elements=[Trivia.content_hash]
+        )
+        async with self.db.engine.begin() as conn:
+            result = await conn.execute(stmt, trivias)
+        return result.rowcount
+
+    async def compact(self) -> int:
+        """Delete the duplicate trivias and shrink the file.
+
+        Return how many trivias were deleted.
+        """
+        async with self.db.engine.begin() as conn:
+            deleted = await conn.run_sync(dedupe_trivias)
+        async with self.db.engine.connect() as conn:
+            # VACUUM cannot run in a transaction
+            autocommit = await conn.execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+            await autocommit.exec_driver_sql("VACUUM")
+        return deleted
+
+    async def get(self, id: int) -> Trivia | None:
+        """Get trivia by id."""
+        async with self.db.create_read_session() as session:
+            stmt = select(Trivia).where(Trivia.id == id)
+            result = await session.execute(stmt)
+            trivia: Trivia | None = result.scalar()
             return trivia
 
+    async def get_keys(
+        self,
+    ) -> Sequence[Row[tuple[int, TriviaDifficulty, str]]]:
+        """Get the id, difficulty and category of every trivia."""
+        async with self.db.create_read_session() as session:
+            stmt = select(Trivia.id, Trivia.difficulty, Trivia.category)
+            result = await session.execute(stmt)
+            return result.all()
+
     async def get_random(self) -> Trivia:
         """Get a random trivia question."""
         async with self.db.create_session() as session:
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import secrets
+from typing import Final
+
+from app.models.trivia import Trivia, TriviaDifficulty
+
+from .seen import SeenRepo, seen_repo
+from .trivia import TriviaRepo, trivia_repo
+
+logger = logging.getLogger(__name__)
+
+BucketKey = tuple[TriviaDifficulty | None, str | None]
+
+
+class TriviaPoolEmptyError(Exception):
+    """No trivia matches the requested difficulty and category."""
+
+
+class TriviaPool:
+    """Trivia ids bucketed by difficulty and category.
+
+    The ids are loaded once, picking one is a constant time choice,
+    and a background task keeps the next questions loaded in a queue.
+    Given a player, trivias they have already seen are skipped.
+    """
+
+    PREFETCH: Final[int] = int(os.getenv("TRIVIA_PREFETCH", "8"))
+
+    def __init__(
+        self,
+        repo: TriviaRepo,
+        seen: SeenRepo,
+        prefetch: int | None = None,
+    ) -> None:
+        self.repo = repo
+        self.seen = seen
+        self.buckets: dict[BucketKey, list[int]] = {}
+        self.loaded: bool = False
+        self.queue: asyncio.Queue[Trivia] = asyncio.Queue(
+            maxsize=prefetch or self.PREFETCH
+        )
+        self._task: asyncio.Task[None] | None = None
+
+    async def load(self) -> None:
+        """Bucket the ids of every trivia.
+
+        A trivia is in the bucket of its difficulty and category,
+        of its difficulty, of its category and of every trivia.
+        """
+        buckets: dict[BucketKey, list[int]] = {}
+        for id, difficulty, category in await self.repo.get_keys():
+            for key in (
+                (difficulty, category),
+                (difficulty, None),
+                (None, category),
+                (None, None),
+            ):
+                buckets.setdefault(key, []).append(id)
+        self.buckets = buckets
+        self.loaded = True
+        logger.info(
+            "[trivia] %d trivias in the pool",
+            len(buckets.get((None, None), [])),
+        )
+
+    def pick(
+        self,
+        difficulty: TriviaDifficulty | None = None,
+        category: str | None = None,
+    ) -> int:
+        """Pick a random trivia id."""
+        bucket = self.buckets.get((difficulty, category))
+        if not bucket:
+            raise TriviaPoolEmptyError((difficulty, category))
+        return secrets.choice(bucket)
+
+    async def _fetch(
+        self,
+        difficulty: TriviaDifficulty | None = None,
+        category: str | None = None,
+        user_id: int | None = None,
+    ) -> Trivia:
+        if not self.loaded:
+            await self.load()
+        if user_id is None:
+            id = self.pick(difficulty, category)
+        else:
+            key = (difficulty, category)
+            if not self.buckets.get(key):
+                raise TriviaPoolEmptyError(key)
+            id = await self.seen.pick(
+                user_id, SeenRepo.TRIVIA, self.buckets[key], key
+            )
+        trivia = await self.repo.get(id)
+        assert trivia, "trivia is gone from the database"
+        return trivia
+
+    async def _prefetch(self) -> None:
+        try:
+            while True:
+                await self.queue.put(await self._fetch())
+        except TriviaPoolEmptyError:
+            logger.warning("[trivia] no trivia to prefetch")
+        except Exception:
+            logger.exception("[trivia] prefetching stopped")
+
+    def start(self) -> None:
+        """Start filling the prefetch queue in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._prefetch())
+
+    async def stop(self) -> None:
+        """Stop the prefetch task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get_random(
+        self,
+        difficulty: TriviaDifficulty | None = None,
+        category: str | None = None,
+        user_id: int | None = None,
+    ) -> Trivia:
+        """Get a random trivia, a prefetched one when no filter is given."""
+        if difficulty is None and category is None and not self.queue.empty():
+            if user_id is None:
+                return self.queue.get_nowait()
+            seen = await self.seen.get(user_id, SeenRepo.TRIVIA)
+            if not self.queue.empty():
+                trivia = self.queue.get_nowait()
+                if seen.take(trivia.id):
+                    await self.seen.save(user_id, SeenRepo.TRIVIA, seen)
+                    return trivia
+                # left for another player, nothing ran since the get
+                # so its slot is still free
+                self.queue.put_nowait(trivia)
+        return await self._fetch(difficulty, category, user_id)
+
+
+# TODO: move this to a container
+trivia_pool = TriviaPool(trivia_repo, seen_repo)
@@ -1,15 +1,20 @@
 import logging
 from collections.abc import Sequence
-from typing import Any, Final
+from typing import Any, Final, NamedTuple
 from uuid import UUID
 
 from sqlalchemy import Result, desc, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
-from app.enums import MatchResult
 from app.models.guess import Guess
+from app.models.guess_result import GuessResult
 from app.models.wordle import Wordle, WordleStatus
 
+from .active_games import ActiveGameCache, active_games
+from .archive import ArchiveRepo
 from .database import Database, database
+from .player_stats import count_abort, count_game, count_win
 
 logger = logging.getLogger(__name__)
 
@@ -18,106 +23,187 @@ class WordleNotFoundError(Exception):
     """Wordle not found error."""
 
 
+class OngoingWordleExistsError(Exception):
+    """The user already has an active or pending wordle."""
+
+
+class WordleState(NamedTuple):
+    """Id and status of a wordle, without its word or guesses."""
+
+    id: UUID
+    status: int
+
+
 class WordleRepo:
-    """Repository for interacting with Wordle."""
+    """Repository for interacting with Wordle.
+
+    With a cache, ongoing wordles are read from memory
+    and every write goes through to the database first.
+    Guesses are only loaded by get_ongoing_wordle,
+    the other reads select the columns they need.
+    """
 
     TRIVIA_THRESHOLD: Final[int] = 3
 
-    def __init__(self, db: Database) -> None:
+    def __init__(
+        self,
+        db: Database,
+        cache: ActiveGameCache | None = None,
+    ) -> None:
         self.db: Database = db
+        self.cache: ActiveGameCache | None = cache
+
+    @property
+    def archive(self) -> ArchiveRepo:
+        """Archived wordles of the same database."""
+        return ArchiveRepo(self.db)
 
     async def create(
         self,
         word: str,
         user_id: int,
     ) -> Wordle:
-        """Create a wordle."""
+        """Create a wordle.
+
+        The unique index on ongoing wordles rejects a second game,
+        even when two starts race each other.
+        """
         async with self.db.create_session() as session:
             wordle = Wordle(
-                word=word, user_id=user_id, status=WordleStatus.ACTIVE.value
+                word=word,
+                user_id=user_id,
+                status=WordleStatus.ACTIVE.value,
+                guesses=[],
             )
             session.add(wordle)
-            await session.commit()
-            await session.refresh(wordle)
-            return wordle
+            await session.execute(count_game(user_id))
+            try:
+                await session.commit()
+            except IntegrityError as exc:
+                raise OngoingWordleExistsError(user_id) from exc
+        if self.cache is not None:
+            self.cache.put(wordle)
+        return wordle
 
     async def get(self, id: UUID) -> Wordle | None:
-        """Get wordle by id."""
+        """Get wordle by id, without its guesses unless cached or archived."""
+        if self.cache is not None and (cached := self.cache.get_by_id(id)):
+            return cached
         async with self.db.create_session() as session:
             stmt = select(Wordle).where(Wordle.id == id)
             result = await session.execute(stmt)
             wordle: Wordle | None = result.scalar()
-            return wordle
+        return wordle or await self.archive.get(id)
 
     async def get_by_user_id(self, user_id: int) -> Sequence[Wordle]:
-        """Get wordle by user id."""
-        async with self.db.create_session() as session:
+        """Get the live and archived wordles of a user, latest first.
+
+        Their guesses are not loaded.
+        """
+        async with self.db.create_read_session() as session:
             stmt = (
                 select(Wordle)
                 .where(Wordle.user_id == user_id)
-                .order_by(desc(Wordle.created_at))
+                .order_by(desc(Wordle.id))
             )
             result: Result[Any] = await session.execute(stmt)
-            wordles: Sequence[Wordle] = result.scalars().all()
-            return wordles
+            wordles: list[Wordle] = list(result.scalars().all())
+        wordles.extend(await self.archive.get_by_user_id(user_id))
+        wordles.sort(key=lambda wordle: wordle.id, reverse=True)
+        return wordles
 
-    async def get_active_wordle_by_user_id(
-        self,
-        user_id: int,
-    ) -> Wordle | None:
-        """Get the active wordle by user id."""
+    async def get_ongoing_state(self, user_id: int) -> WordleState | None:
+        """Get the id and status of the unfinished wordle of a user."""
+        if self.cache is not None and (wordle := self.cache.get(user_id)):
+            return WordleState(wordle.id, wordle.status)
         async with self.db.create_session() as session:
-            stmt = select(Wordle).where(
+            stmt = select(Wordle.id, Wordle.status).where(
                 Wordle.user_id == user_id,
-                Wordle.status == WordleStatus.ACTIVE.value,
+                Wordle.status.in_(
+                    [
+                        WordleStatus.ACTIVE.value,
+                        WordleStatus.PENDING.value,
+                    ]
+                ),
             )
+            row = (await session.execute(stmt)).first()
+        return None if row is None else WordleState(row.id, row.status)
 
-            result = await session.execute(stmt)
-            wordle: Wordle | None = result.scalar()
-            return wordle
+    async def get_active_wordle_by_user_id(
+        self,
+        user_id: int,
+    ) -> WordleState | None:
+        """Get the id of the active wordle by user id."""
+        state = await self.get_ongoing_state(user_id)
+        if state is None or state.status != WordleStatus.ACTIVE.value:
+            return None
+        return state
 
-    async def get_pending_wordle(self, user_id: int) -> Wordle | None:
-        """Get the pending wordle by user id."""
+    async def get_pending_wordle(self, user_id: int) -> WordleState | None:
+        """Get the id of the pending wordle by user id."""
+        state = await self.get_ongoing_state(user_id)
+        if state is None or state.status != WordleStatus.PENDING.value:
+            return None
+        return state
+
+    async def get_ongoing_wordle(self, user_id: int) -> Wordle | None:
+        """Get unfinished wordle game by user id, with its guesses."""
+        if self.cache is not None and (wordle := self.cache.get(user_id)):
+            return wordle
         async with self.db.create_session() as session:
-            stmt = select(Wordle).where(
-                Wordle.user_id == user_id,
-                Wordle.status == WordleStatus.PENDING.value,
+            stmt = (
+                select(Wordle)
+                .where(
+                    Wordle.user_id == user_id,
+                    Wordle.status.in_(
+                        [
+                            WordleStatus.ACTIVE.value,
+                            WordleStatus.PENDING.value,
+                        ]
+                    ),
+                )
+                .options(selectinload(Wordle.guesses))
             )
             result = await session.execute(stmt)
-            wordle: Wordle | None = result.scalar()
-            return wordle
+            wordle = result.scalar()
+        if wordle is not None and self.cache is not None:
+            self.cache.put(wordle)
+        return wordle
 
-    async def get_ongoing_wordle(self, user_id: int) -> Wordle | None:
-        """Get unfinished wordle game by user id."""
+    async def _get_status(self, id: UUID) -> int | None:
+        if self.cache is not None and (wordle := self.cache.get_by_id(id)):
+            return wordle.status
         async with self.db.create_session() as session:
-            stmt = select(Wordle).where(
-                Wordle.user_id == user_id,
-                Wordle.status.in_(
-                    [
-                        WordleStatus.ACTIVE.value,
-                        WordleStatus.PENDING.value,
-                    ]
-                ),
+            stmt = select(Wordle.status).where(Wordle.id == id)
+            status: int | None = (await session.execute(stmt)).scalar()
+            return status
+
+    async def _get_recent_results(self, id: UUID) -> Sequence[GuessResult]:
+        """Results of the last guesses of a wordle, oldest first."""
+        if self.cache is not None and (wordle := self.cache.get_by_id(id)):
+            return [
+                guess.result
+                for guess in wordle.guesses[-self.TRIVIA_THRESHOLD :]
+            ]
+        async with self.db.create_session() as session:
+            stmt = (
+                select(Guess.result)
+                .where(Guess.wordle_id == id)
+                .order_by(desc(Guess.id))
+                .limit(self.TRIVIA_THRESHOLD)
             )
-            result = await session.execute(stmt)
-            wordle: Wordle | None = result.scalar()
-            return wordle
+            results = (await session.execute(stmt)).scalars().all()
+            return results[::-1]
 
     async def _calculate_next_status(self, id: UUID) -> WordleStatus | None:
-        wordle = await wordle_repo.get(id=id)
-        if wordle is None:
-            return None
-        match wordle.status:
+        match await self._get_status(id):
+            case None:
+                return None
             case WordleStatus.ACTIVE.value:
-                guesses = await wordle_repo.get_guesses(wordle.user_id)
-                if len(guesses) < self.TRIVIA_THRESHOLD:
+                recent_results = await self._get_recent_results(id)
+                if len(recent_results) < self.TRIVIA_THRESHOLD:
                     return None
-                recent_results = [
-                    guess.result for guess in guesses[-self.TRIVIA_THRESHOLD :]
-                ]
-                if str(
-                    MatchResult.CORRECT_LETTER_CORRECT_POSITION
-                ) not in "".join(recent_results):
+                if not any(result.any_correct for result in recent_results):
                     return WordleStatus.PENDING.value
                 return None
             case WordleStatus.PENDING.value:
@@ -151,24 +237,24 @@ class WordleRepo:
                 .values(status=next_status)
             )
             await session.execute(stmt)
+            if next_status == WordleStatus.COMPLETED.value:
+                await session.execute(count_win(id))
+            elif next_status == WordleStatus.ABORTED.value:
+                await session.execute(count_abort(id))
             await session.commit()
+        if self.cache is not None:
+            self.cache.set_status(id, next_status)
 
     async def win_game(self, id: UUID) -> None:
         """Change the status when the play wins."""
 
     async def get_guesses(self, user_id: int) -> Sequence[Guess]:
         """Get the guesses of the active wordle of a user."""
-        async with self.db.create_session() as session:
-            stmt = select(Wordle).where(
-                Wordle.user_id == user_id,
-                Wordle.status == WordleStatus.ACTIVE.value,
-            )
-            result = await session.execute(stmt)
-            wordle: Wordle | None = result.scalar()
-            if wordle is None:
-                raise WordleNotFoundError
-            return wordle.guesses
+        wordle = await self.get_ongoing_wordle(user_id)
+        if wordle is None or wordle.status != WordleStatus.ACTIVE.value:
+            raise WordleNotFoundError
+        return wordle.guesses
 
 
 # TODO: move this to a container
-wordle_repo = WordleRepo(database)
+wordle_repo = WordleRepo(database, active_games)
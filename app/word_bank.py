@@ -0,0 +1,263 @@
+import mmap
+import struct
+import zlib
+from collections.abc import Mapping, Sequence
+from functools import cached_property
+from pathlib import Path
+from typing import Final, NamedTuple, overload
+
+MAGIC: Final[bytes] = b"MWB\x00"
+FORMAT_VERSION: Final[int] = 2
+
+# magic, format version, fingerprint, number of partitions, number of words,
+# number of hash index slots
+HEADER: Final[struct.Struct] = struct.Struct("<4sH32sHII")
+# word length, difficulty tag, first word index, number of words
+PARTITION: Final[struct.Struct] = struct.Struct("<B8sII")
+OFFSET: Final[struct.Struct] = struct.Struct("<I")
+OFFSET_PAIR: Final[struct.Struct] = struct.Struct("<2I")
+
+FIELD_SEP: Final[str] = "\x1e"
+ITEM_SEP: Final[str] = "\x1f"
+
+
+class WordBankFormatError(Exception):
+    """The word bank file is truncated or was written by another format."""
+
+
+class WordEntry(NamedTuple):
+    """A compiled word with its lexicon data."""
+
+    word: str
+    definition: str
+    lemmas: Sequence[str]
+    usages: Sequence[str]
+
+
+def _encode_entry(entry: WordEntry) -> bytes:
+    return FIELD_SEP.join(
+        (
+            entry.definition,
+            ITEM_SEP.join(entry.lemmas),
+            ITEM_SEP.join(entry.usages),
+        )
+    ).encode()
+
+
+def _decode_entry(word: str, raw: bytes) -> WordEntry:
+    definition, lemmas, usages = raw.decode().split(FIELD_SEP)
+    return WordEntry(
+        word=word,
+        definition=definition,
+        lemmas=lemmas.split(ITEM_SEP) if lemmas else [],
+        usages=usages.split(ITEM_SEP) if usages else [],
+    )
+
+
+def _hash_slots(size: int) -> int:
+    """Power of two keeping the hash index at most half full."""
+    return 1 << (2 * size).bit_length()
+
+
+def write_word_bank(
+    path: str | Path,
+    fingerprint: bytes,
+    partitions: Mapping[tuple[int, str], Sequence[WordEntry]],
+) -> None:
+    """Write the partitioned word bank into a snapshot file.
+
+    Layout: header, partition table, word offsets, record offsets,
+    hash index, word string table, record string table.
+    Words of a partition are stored contiguously,
+    so a partition is a plain range of word indexes.
+    The hash index is an open addressing table of word index + 1
+    keyed by the crc32 of the word, 0 marks an empty slot.
+    The file is written aside and renamed,
+    readers never see a half-written snapshot.
+    """
+    table = bytearray()
+    words: list[bytes] = []
+    records: list[bytes] = []
+    for (length, tag), entries in partitions.items():
+        table += PARTITION.pack(length, tag.encode(), len(words), len(entries))
+        for entry in entries:
+            words.append(entry.word.encode())
+            records.append(_encode_entry(entry))
+
+    def offsets(blobs: list[bytes]) -> bytes:
+        position = 0
+        result = [position]
+        for blob in blobs:
+            position += len(blob)
+            result.append(position)
+        return struct.pack(f"<{len(result)}I", *result)
+
+    n_slots = _hash_slots(len(words))
+    slots = [0] * n_slots
+    for idx, word in enumerate(words):
+        slot = zlib.crc32(word) & (n_slots - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (n_slots - 1)
+        slots[slot] = idx + 1
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                fingerprint,
+                len(partitions),
+                len(words),
+                n_slots,
+            )
+        )
+        file.write(table)
+        file.write(offsets(words))
+        file.write(offsets(records))
+        file.write(struct.pack(f"<{n_slots}I", *slots))
+        file.write(b"".join(words))
+        file.write(b"".join(records))
+    tmp_path.replace(path)
+
+
+class WordBank:
+    """Read-only view over a word bank snapshot.
+
+    Nothing is decoded up front,
+    words and records are sliced out of the buffer on access.
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytes) -> None:
+        if len(buffer) < HEADER.size:
+            msg = "snapshot is truncated"
+            raise WordBankFormatError(msg)
+        magic, version, fingerprint, n_partitions, n_words, n_slots = (
+            HEADER.unpack_from(buffer)
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            msg = "unknown snapshot format"
+            raise WordBankFormatError(msg)
+
+        self.buffer = buffer
+        self.fingerprint: bytes = fingerprint
+        self.partitions: dict[tuple[int, str], range] = {}
+        position = HEADER.size
+        for _ in range(n_partitions):
+            length, tag, start, count = PARTITION.unpack_from(buffer, position)
+            self.partitions[(length, tag.rstrip(b"\x00").decode())] = range(
+                start, start + count
+            )
+            position += PARTITION.size
+
+        self._size = n_words
+        self._word_offsets = position
+        self._record_offsets = self._word_offsets + OFFSET.size * (n_words + 1)
+        self._hash_index = self._record_offsets + OFFSET.size * (n_words + 1)
+        self._n_slots = n_slots
+        self._word_blob = self._hash_index + OFFSET.size * n_slots
+        try:
+            self._record_blob = self._word_blob + self._offset(
+                self._word_offsets, n_words
+            )
+            end = self._record_blob + self._offset(
+                self._record_offsets, n_words
+            )
+        except struct.error as exc:
+            msg = "snapshot is truncated"
+            raise WordBankFormatError(msg) from exc
+        if len(buffer) < end:
+            msg = "snapshot is truncated"
+            raise WordBankFormatError(msg)
+
+    @classmethod
+    def open(cls, path: str | Path) -> "WordBank":
+        """Memory-map a snapshot file."""
+        with Path(path).open("rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                msg = "snapshot is empty"
+                raise WordBankFormatError(msg) from exc
+        try:
+            return cls(buffer)
+        except WordBankFormatError:
+            buffer.close()
+            raise
+
+    @cached_property
+    def checksum(self) -> int:
+        """crc32 of the whole snapshot, changes with any word or record."""
+        return zlib.crc32(self.buffer)
+
+    def close(self) -> None:
+        """Unmap the snapshot."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def _offset(self, table: int, index: int) -> int:
+        offset: int = OFFSET.unpack_from(
+            self.buffer, table + OFFSET.size * index
+        )[0]
+        return offset
+
+    def _slice(self, table: int, blob: int, index: int) -> bytes:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        start, end = OFFSET_PAIR.unpack_from(
+            self.buffer, table + OFFSET.size * index
+        )
+        return self.buffer[blob + start : blob + end]
+
+    def word(self, index: int) -> str:
+        """Return the word at the given index."""
+        return self._slice(self._word_offsets, self._word_blob, index).decode()
+
+    def find(self, word: str) -> int | None:
+        """Return the index of the word, None if it is not in the bank."""
+        raw = word.encode()
+        mask = self._n_slots - 1
+        slot = zlib.crc32(raw) & mask
+        while found := self._offset(self._hash_index, slot):
+            idx = found - 1
+            if self._slice(self._word_offsets, self._word_blob, idx) == raw:
+                return idx
+            slot = (slot + 1) & mask
+        return None
+
+    def words(self, ids: Sequence[int]) -> "WordTable":
+        """Return a lazy view over the words of the given indexes."""
+        return WordTable(self, ids)
+
+    def entry(self, index: int) -> WordEntry:
+        """Return the word and its lexicon data at the given index."""
+        return _decode_entry(
+            self.word(index),
+            self._slice(self._record_offsets, self._record_blob, index),
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class WordTable(Sequence[str]):
+    """Words of word bank indexes, decoded on access."""
+
+    def __init__(self, bank: WordBank, ids: Sequence[int]) -> None:
+        self.bank = bank
+        self.ids = ids
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "WordTable": ...
+
+    def __getitem__(self, index: int | slice) -> "str | WordTable":
+        if isinstance(index, slice):
+            return WordTable(self.bank, self.ids[index])
+        return self.bank.word(self.ids[index])
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -1,13 +1,39 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
 import secrets
+import time
+import zlib
+from collections.abc import Sequence
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from enum import StrEnum
 from functools import lru_cache
+from itertools import chain
+from pathlib import Path
 from typing import TYPE_CHECKING, Final
 
-import nltk
+from .word_bank import (
+    WordBank,
+    WordBankFormatError,
+    WordEntry,
+    write_word_bank,
+)
 
 if TYPE_CHECKING:
-    from nltk.corpus.reader.wordnet import Lemma, Synset
+    from functools import _CacheInfo
+
+    from nltk.corpus.reader.wordnet import Synset
+
+logger = logging.getLogger(__name__)
+
+EMPTY_BANK: Final[frozenset[str]] = frozenset()
+
+
+class WordGeneratorNotReadyError(Exception):
+    """The word bank is still being built."""
 
 
 class Difficulty(StrEnum):
@@ -18,21 +44,34 @@ class Difficulty(StrEnum):
     HARD = "Hard"
 
 
-@dataclass
+@dataclass(frozen=True)
 class Word:
-    """The dataclass for a Word."""
+    """The dataclass for a Word, shared by every caller of the cache."""
 
     word: str
     definition: str
-    synonyms: set[str]
-    usages: list[str]
+    synonyms: frozenset[str]
+    usages: tuple[str, ...]
 
 
 class WordGenerator:
-    """The class for generating a random word between 5 to 10 chars."""
+    """The class for generating a random word between 5 to 10 chars.
+
+    Words are served from a precompiled word bank snapshot,
+    the wordnet corpus is only walked when the snapshot is missing or stale.
+
+    In shared mode, the snapshot published by another process is attached
+    and every lookup reads the mapped pages,
+    so bot processes on one host share a single copy of the lexicon.
+    """
 
     CORPORA_WORDNET: Final[str] = "corpora/wordnet"
     WORDNET: Final[str] = "wordnet"
+    SNAPSHOT_PATH: Final[str] = os.getenv("WORD_BANK_PATH", "./wordbank.bin")
+    SHARED: Final[bool] = os.getenv("WORD_BANK_SHARED", "0") == "1"
+    CALIBRATION_PATH: Final[str] = os.getenv(
+        "WORD_CALIBRATION_PATH", "./calibration.json"
+    )
 
     WORD_LENGTH_MIN: Final[int] = 5
     WORD_LENGTH_MAX: Final[int] = 15
@@ -40,21 +79,145 @@ class WordGenerator:
     WORD_AMOUNT_HARD: Final[int] = 1
     WORD_AMOUNT_EASY: Final[int] = 5
 
-    def __init__(self) -> None:
-        self.download_corpus()
-        self.synsets: list[Synset] = []
-        self.mp_len_words: dict[int, dict[Difficulty, list[str]]] = {
+    WORD_CACHE_SIZE: Final[int] = 1024
+
+    def __init__(
+        self,
+        snapshot_path: str | Path | None = None,
+        *,
+        shared: bool | None = None,
+        calibration_path: str | Path | None = None,
+    ) -> None:
+        self.shared: bool = self.SHARED if shared is None else shared
+        self._cached_word = lru_cache(maxsize=self.WORD_CACHE_SIZE)(
+            self._load_word
+        )
+        snapshot_path = snapshot_path or self.SNAPSHOT_PATH
+        self.bank: WordBank = (
+            self.attach_snapshot(snapshot_path)
+            if self.shared
+            else self.load_snapshot(snapshot_path)
+        )
+        self.mp_len_words: dict[int, dict[Difficulty, Sequence[str]]] = {
             val: {diff: [] for diff in Difficulty}
             for val in range(self.WORD_LENGTH_MIN, self.WORD_LENGTH_MAX + 1)
         }
-        self.mp_len_synsets: dict[int, dict[Difficulty, list[Synset]]] = {
-            val: {diff: [] for diff in Difficulty}
+        self.mp_len_ids: dict[int, dict[Difficulty, Sequence[int]]] = {
+            val: {diff: range(0) for diff in Difficulty}
             for val in range(self.WORD_LENGTH_MIN, self.WORD_LENGTH_MAX + 1)
         }
+        self.word_ids: dict[str, int] = {}
+        self.valid_words: dict[int, frozenset[str]] = {}
         self.separate_lengths()
+        # crc32 of the applied calibration, it reorders the buckets
+        self.calibration_checksum: int | None = None
+        self.calibrated: bool = self.load_calibration(
+            calibration_path or self.CALIBRATION_PATH
+        )
 
     def separate_lengths(self) -> None:
-        """Populate the wordnet data for each length."""
+        """Populate the word bank data for each length."""
+        for (length, tag), ids in self.bank.partitions.items():
+            difficulty = Difficulty(tag)
+            self.mp_len_ids.setdefault(length, {})[difficulty] = ids
+            words = self._words(ids)
+            self.mp_len_words.setdefault(length, {})[difficulty] = words
+            if not self.shared:
+                self.word_ids.update(zip(words, ids, strict=True))
+        if self.shared:
+            return
+        self.valid_words = {
+            length: frozenset(chain.from_iterable(words.values()))
+            for length, words in self.mp_len_words.items()
+        }
+
+    def _words(self, ids: Sequence[int]) -> Sequence[str]:
+        """Words of a bucket, decoded lazily when the bank is shared."""
+        if self.shared:
+            return self.bank.words(ids)
+        return [self.bank.word(idx) for idx in ids]
+
+    def load_calibration(self, path: str | Path) -> bool:
+        """Bucket the difficulties by simulated guess counts.
+
+        Every length keeps the size of its difficulty buckets,
+        the words needing the fewest guesses are EASY,
+        the ones needing the most are HARD.
+        Words missing from the table stay in the middle.
+        """
+        try:
+            raw = Path(path).read_bytes()
+        except FileNotFoundError:
+            return False
+        calibration = json.loads(raw)
+        if calibration["checksum"] != self.bank.checksum:
+            logger.info("[wordgen] calibration %s is stale", path)
+            return False
+
+        for length, expected in calibration["lengths"].items():
+            buckets = self.mp_len_ids.get(int(length))
+            if not buckets:
+                continue
+            middle = sum(expected.values()) / max(len(expected), 1)
+            ranked = sorted(
+                chain.from_iterable(buckets[diff] for diff in Difficulty),
+                key=lambda idx: expected.get(self.bank.word(idx), middle),
+            )
+            start = 0
+            for diff in Difficulty:
+                size = len(buckets[diff])
+                buckets[diff] = ranked[start : start + size]
+                # the solver and candidates read the words of the buckets
+                self.mp_len_words[int(length)][diff] = self._words(
+                    buckets[diff]
+                )
+                start += size
+        self.calibration_checksum = zlib.crc32(raw)
+        logger.info("[wordgen] difficulties calibrated with %s", path)
+        return True
+
+    @classmethod
+    def fingerprint(cls) -> bytes:
+        """Digest of the settings the snapshot is compiled with."""
+        settings = (
+            cls.WORD_LENGTH_MIN,
+            cls.WORD_LENGTH_MAX,
+            cls.WORD_AMOUNT_HARD,
+            cls.WORD_AMOUNT_EASY,
+            *Difficulty,
+        )
+        return hashlib.sha256(":".join(map(str, settings)).encode()).digest()
+
+    @classmethod
+    def attach_snapshot(cls, path: str | Path) -> WordBank:
+        """Map an up-to-date word bank snapshot, never compiling it."""
+        started = time.perf_counter()
+        bank = WordBank.open(path)
+        if bank.fingerprint != cls.fingerprint():
+            bank.close()
+            msg = f"snapshot {path} is stale"
+            raise WordBankFormatError(msg)
+        logger.info(
+            "[wordgen] attached snapshot %s in %.2fms",
+            path,
+            (time.perf_counter() - started) * 1000,
+        )
+        return bank
+
+    @classmethod
+    def load_snapshot(cls, path: str | Path) -> WordBank:
+        """Open the word bank snapshot, compile it first if needed."""
+        try:
+            return cls.attach_snapshot(path)
+        except (FileNotFoundError, WordBankFormatError) as exc:
+            logger.info("[wordgen] snapshot %s is unusable: %s", path, exc)
+        cls.build_snapshot(path)
+        return cls.attach_snapshot(path)
+
+    @classmethod
+    def build_snapshot(cls, path: str | Path) -> None:
+        """Compile the qualified wordnet words into a snapshot."""
+        cls.download_corpus()
         from nltk.corpus import wordnet
 
         temp_words: dict[int, dict[str, int]] = {}
@@ -62,100 +225,122 @@ class WordGenerator:
 
         for synset in wordnet.all_synsets():
             word = synset.name().split(".", 1)[0]
-            if not self.is_qualified(word):
+            if not cls.is_qualified(word):
                 continue
             word_length = len(word)
 
             temp_words.setdefault(word_length, {})
             if not temp_words.get(word_length, {}).get(word):
-                self.synsets.append(synset)
                 temp_words[word_length][word] = 1
                 temp_synsets.setdefault(word_length, [])
                 temp_synsets[word_length].append(synset)
             else:
                 temp_words[word_length][word] += 1
 
-        for i in range(self.WORD_LENGTH_MIN, self.WORD_LENGTH_MAX + 1):
+        partitions: dict[tuple[int, str], list[WordEntry]] = {}
+        for i in range(cls.WORD_LENGTH_MIN, cls.WORD_LENGTH_MAX + 1):
+            buckets: dict[Difficulty, list[WordEntry]] = {
+                diff: [] for diff in Difficulty
+            }
             for (word, val), synset in zip(
-                temp_words[i].items(), temp_synsets[i], strict=False
+                temp_words.get(i, {}).items(),
+                temp_synsets.get(i, []),
+                strict=False,
             ):
-                if val == self.WORD_AMOUNT_HARD:
-                    self.mp_len_words[i][Difficulty.HARD].append(word)
-                    self.mp_len_synsets[i][Difficulty.HARD].append(synset)
-                elif self.WORD_AMOUNT_HARD < val < self.WORD_AMOUNT_EASY:
-                    self.mp_len_words[i][Difficulty.MEDIUM].append(word)
-                    self.mp_len_synsets[i][Difficulty.MEDIUM].append(synset)
+                if val == cls.WORD_AMOUNT_HARD:
+                    difficulty = Difficulty.HARD
+                elif cls.WORD_AMOUNT_HARD < val < cls.WORD_AMOUNT_EASY:
+                    difficulty = Difficulty.MEDIUM
                 else:
-                    self.mp_len_words[i][Difficulty.EASY].append(word)
-                    self.mp_len_synsets[i][Difficulty.EASY].append(synset)
+                    difficulty = Difficulty.EASY
+                buckets[difficulty].append(
+                    WordEntry(
+                        word=word,
+                        definition=synset.definition(),
+                        lemmas=[lm.name() for lm in synset.lemmas()],
+                        usages=synset.examples(),
+                    )
+                )
+            for difficulty, entries in buckets.items():
+                partitions[(i, difficulty.value)] = entries
+
+        write_word_bank(path, cls.fingerprint(), partitions)
+        logger.info("[wordgen] compiled the word bank into %s", path)
 
     @classmethod
     def boot(cls) -> None:
-        """Try accessing wordnet data to trigger data validation."""
-        from nltk.corpus import wordnet
-
-        list(wordnet.all_synsets())
+        """Ensure the word bank snapshot exists and is up to date."""
+        cls.load_snapshot(cls.SNAPSHOT_PATH).close()
 
     @classmethod
     def download_corpus(cls) -> None:
         """Ensure the wordnet corpus is downloaded."""
+        import nltk
+
         try:
             nltk.data.find(cls.CORPORA_WORDNET)
         except LookupError:
             nltk.download(cls.WORDNET)
 
-    def _random_word_in_synset(self) -> tuple[str, "Synset"]:
-        synset: Synset = secrets.choice(self.synsets)
-        lemma: Lemma = secrets.choice(synset.lemmas())
-        return lemma.name(), synset
-
-    def is_qualified(self, word: str) -> bool:
+    @classmethod
+    def is_qualified(cls, word: str) -> bool:
         """Word qualification for adding into bank."""
         return (
             "-" not in word
             and "_" not in word
-            and self.WORD_LENGTH_MIN <= len(word) <= self.WORD_LENGTH_MAX
+            and cls.WORD_LENGTH_MIN <= len(word) <= cls.WORD_LENGTH_MAX
         )
 
     def is_valid(self, word: str) -> bool:
         """Check if the word exists in the bank."""
-        if len(word) not in self.mp_len_words:
-            return False
-        return (
-            word
-            in self.mp_len_words[len(word)][Difficulty.EASY]
-            + self.mp_len_words[len(word)][Difficulty.MEDIUM]
-            + self.mp_len_words[len(word)][Difficulty.HARD]
+        if self.shared:
+            return self.bank.find(word) is not None
+        return word in self.valid_words.get(len(word), EMPTY_BANK)
+
+    def _word_id(self, word: str) -> int:
+        if not self.shared:
+            return self.word_ids[word]
+        idx = self.bank.find(word)
+        if idx is None:
+            raise KeyError(word)
+        return idx
+
+    def _load_word(self, idx: int) -> Word:
+        entry = self.bank.entry(idx)
+        return Word(
+            word=entry.word,
+            definition=entry.definition,
+            synonyms=frozenset(entry.lemmas),
+            usages=tuple(entry.usages),
         )
 
+    def bucket(self, length: int, difficulty: Difficulty) -> "Sequence[int]":
+        """Word bank indexes of the words of a length and difficulty."""
+        return self.mp_len_ids.get(length, {}).get(difficulty, range(0))
+
+    def word_at(self, idx: int) -> Word:
+        """Get the Word dataclass at a word bank index."""
+        return self._cached_word(idx)
+
     def random(self, length: int, difficulty: Difficulty) -> Word:
-        """Randomizes a word from the synset."""
-        dataset: list[Synset] = self.mp_len_synsets.get(length, {}).get(
-            difficulty, []
-        )
+        """Randomizes a word from the bank."""
+        dataset = self.bucket(length, difficulty)
 
         assert len(dataset) > 0, "the word bank is empty"
 
-        synset = secrets.choice(dataset)
-        return Word(
-            word=synset.name().split(".", 1)[0],
-            definition=synset.definition(),
-            synonyms={lm.name() for lm in synset.lemmas()},
-            usages=synset.examples(),
-        )
+        return self.word_at(secrets.choice(dataset))
 
     def get_word(self, word: str) -> Word:
-        """Get Word dataclass with the given word."""
-        from nltk.corpus import wordnet
+        """Get Word dataclass with the given word.
 
-        synset: Synset = wordnet.synsets(word)[0]
+        Records are cached,
+        a word picked by random() is a cache hit for its hints.
+        """
+        return self._cached_word(self._word_id(word.lower()))
 
-        return Word(
-            word=synset.name().split(".", 1)[0],
-            definition=synset.definition(),
-            synonyms={lm.name() for lm in synset.lemmas()},
-            usages=synset.examples(),
-        )
+    def cache_info(self) -> "_CacheInfo":
+        """Hits, misses and size of the Word record cache."""
+        return self._cached_word.cache_info()
 
     def __str__(self) -> str:
         bank_stat = " | ".join(
@@ -175,16 +360,73 @@ class WordGenerator:
         )
 
 
-@lru_cache
+class WordGeneratorLoader:
+    """Build the word generator off the event loop and share it when ready."""
+
+    def __init__(self, snapshot_path: str | Path | None = None) -> None:
+        self.snapshot_path = snapshot_path
+        self._future: asyncio.Future[WordGenerator] | None = None
+        self._wordgen: WordGenerator | None = None
+        self.build_seconds: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the word generator is built."""
+        return self._wordgen is not None
+
+    def _build(self) -> WordGenerator:
+        started = time.perf_counter()
+        wordgen = WordGenerator(self.snapshot_path)
+        self.build_seconds = time.perf_counter() - started
+        self._wordgen = wordgen
+        logger.info(
+            "[wordgen] word bank ready in %.3fs: %s",
+            self.build_seconds,
+            wordgen,
+        )
+        return wordgen
+
+    def start(
+        self,
+        executor: Executor | None = None,
+    ) -> "asyncio.Future[WordGenerator]":
+        """Start building the word generator in an executor."""
+        if self._future is None:
+            loop = asyncio.get_running_loop()
+            self._future = loop.run_in_executor(executor, self._build)
+        return self._future
+
+    async def wait(self) -> WordGenerator:
+        """Wait until the word generator is ready."""
+        if self._wordgen is not None:
+            return self._wordgen
+        return await asyncio.shield(self.start())
+
+    def get(self) -> WordGenerator:
+        """Return the word generator, it must be ready inside the event loop.
+
+        Outside of an event loop (scripts, tests),
+        it is built on the spot.
+        """
+        if self._wordgen is not None:
+            return self._wordgen
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._build()
+        raise WordGeneratorNotReadyError
+
+
+wordgen_loader = WordGeneratorLoader()
+
+
 def get_wordgen() -> WordGenerator:
     """Ensure only 1 instance of wordgen is used."""
-    return WordGenerator()
+    return wordgen_loader.get()
 
 
 if __name__ == "__main__":
-    import logging
-
     logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger(__name__)
+    WordGenerator.build_snapshot(WordGenerator.SNAPSHOT_PATH)
     wordgen = WordGenerator()
     logger.info(wordgen)
@@ -0,0 +1,49 @@
+"""Latency of narrowing down the candidates after a guess.
+
+Run with ``python -m benchmarks.candidates``.
+"""
+
+import argparse
+import random
+import string
+
+from app.core.candidates import CandidateIndex, CandidateSet
+from app.core.scoring import score_pairs
+
+from .common import measure
+
+
+def run(words: int, length: int) -> None:
+    """Time index building and the first narrowing of random games."""
+    rng = random.Random(0)  # noqa: S311
+    bank = sorted(
+        {
+            "".join(rng.choices(string.ascii_uppercase, k=length))
+            for _ in range(words)
+        }
+    )
+    build_ms = measure(lambda: CandidateIndex(bank), number=1, repeat=3) / 1e6
+    print(f"index of {len(bank)} words: {build_ms:.1f}ms")
+
+    index = CandidateIndex(bank)
+    target, guess = rng.choice(bank), rng.choice(bank)
+    history = [(guess, score_pairs([guess], [target])[0].tolist())]
+
+    def narrow() -> None:
+        CandidateSet(index).apply(history)
+
+    narrow_us = measure(narrow, number=1000) / 1e3
+    print(f"first guess narrowing: {narrow_us:.1f}us")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=30_000)
+    parser.add_argument("--length", type=int, default=5)
+    args = parser.parse_args()
+    run(args.words, args.length)
+
+
+if __name__ == "__main__":
+    main()
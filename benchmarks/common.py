@@ -0,0 +1,54 @@
+import random
+import string
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from app.word_bank import WordEntry, write_word_bank
+from app.word_generator import Difficulty, WordGenerator
+
+
+def synthetic_word_bank(
+    path: str | Path,
+    words_per_bucket: int = 2000,
+    seed: int = 2024,
+) -> Path:
+    """Write a snapshot of random words, sized like the wordnet bank."""
+    rng = random.Random(seed)  # noqa: S311
+    seen: set[str] = set()
+    partitions: dict[tuple[int, str], list[WordEntry]] = {}
+    for length in range(
+        WordGenerator.WORD_LENGTH_MIN,
+        WordGenerator.WORD_LENGTH_MAX + 1,
+    ):
+        for difficulty in Difficulty:
+            entries: list[WordEntry] = []
+            while len(entries) < words_per_bucket:
+                word = "".join(rng.choices(string.ascii_lowercase, k=length))
+                if word in seen:
+                    continue
+                seen.add(word)
+                entries.append(
+                    WordEntry(
+                        word=word,
+                        definition=f"the definition of {word}",
+                        lemmas=[word, word.upper()],
+                        usages=[f"a {word} in a sentence"],
+                    )
+                )
+            partitions[(length, difficulty.value)] = entries
+    path = Path(path)
+    write_word_bank(path, WordGenerator.fingerprint(), partitions)
+    return path
+
+
+def measure(
+    func: Callable[[], Any],
+    *,
+    number: int,
+    repeat: int = 5,
+) -> float:
+    """Return the best time of a single call in nanoseconds."""
+    timings = timeit.Timer(func).repeat(repeat=repeat, number=number)
+    return min(timings) / number * 1e9
@@ -0,0 +1,94 @@
+"""Random against time-ordered primary keys of guess-like rows.
+
+Run with ``python -m benchmarks.ids``.
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from app.models.ids import uuid7
+
+from .common import measure
+
+SCHEMA = """
+CREATE TABLE guess (
+    id CHAR(32) PRIMARY KEY,
+    created_at DATETIME,
+    content VARCHAR,
+    result INTEGER
+);
+CREATE INDEX ix_guess_created_at ON guess (created_at);
+"""
+RECENT = 100
+
+
+def _insert(
+    path: Path, new_id: Callable[[], UUID], rows: int, batch: int
+) -> float:
+    """Insert rows in batches, return how many per second."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    started = datetime(2024, 7, 1)  # noqa: DTZ001
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        with conn:
+            conn.executemany(
+                "INSERT INTO guess VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        new_id().hex,
+                        str(started + timedelta(milliseconds=idx)),
+                        "WORLD",
+                        0b100000,
+                    )
+                    for idx in range(offset, min(offset + batch, rows))
+                ],
+            )
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return rows / elapsed
+
+
+def _recent(path: Path, order: str) -> float:
+    """Time reading the latest rows, return nanoseconds."""
+    conn = sqlite3.connect(path)
+    stmt = f"SELECT * FROM guess ORDER BY {order} DESC LIMIT {RECENT}"  # noqa: S608
+    try:
+        return measure(lambda: conn.execute(stmt).fetchall(), number=1000)
+    finally:
+        conn.close()
+
+
+def run(rows: int, batch: int) -> None:
+    """Time inserting and reading the most recent rows by key."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, new_id, order in (
+            ("uuid4", uuid4, "created_at"),
+            ("uuid7", uuid7, "id"),
+        ):
+            path = Path(tmpdir) / f"{name}.db"
+            per_second = _insert(path, new_id, rows, batch)
+            size_mb = path.stat().st_size / 1e6
+            print(f"{name} insert: {per_second:,.0f} rows/s, {size_mb:.1f}MB")
+
+            recent_us = _recent(path, order) / 1e3
+            print(f"{name} latest {RECENT} by {order}: {recent_us:.1f}us")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
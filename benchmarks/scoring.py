@@ -0,0 +1,76 @@
+"""Throughput of guess scoring, per pair and in batches.
+
+Run with ``python -m benchmarks.scoring``.
+"""
+
+import argparse
+import random
+import string
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.core.scoring import encode_words, score_bucket, score_pairs
+from app.core.wordle import WordleGame
+
+
+def random_words(rng: random.Random, count: int, length: int) -> list[str]:
+    """Random uppercase words."""
+    return [
+        "".join(rng.choices(string.ascii_uppercase, k=length))
+        for _ in range(count)
+    ]
+
+
+def timed(label: str, pairs: int, func: Callable[[], Any]) -> None:
+    """Run func once and print its pairs per second rate."""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<20} {pairs / elapsed:>14,.0f} pairs/s")
+
+
+def run(pairs: int, length: int) -> None:
+    """Score the same random pairs with every scoring path."""
+    rng = random.Random(0)  # noqa: S311
+    guesses = random_words(rng, pairs, length)
+    words = random_words(rng, pairs, length)
+    bucket = encode_words(words)
+    game = WordleGame()
+
+    reference_pairs = min(pairs, 100_000)
+    timed(
+        "guess, new word",
+        reference_pairs,
+        lambda: [
+            list(game.gen_colors_for_guess(guess, word))
+            for guess, word in zip(
+                guesses[:reference_pairs],
+                words[:reference_pairs],
+                strict=True,
+            )
+        ],
+    )
+    timed(
+        "guess, active word",
+        reference_pairs,
+        lambda: [
+            list(game.gen_colors_for_guess(guess, words[0]))
+            for guess in guesses[:reference_pairs]
+        ],
+    )
+    timed("score_pairs", pairs, lambda: score_pairs(guesses, words))
+    timed("score_bucket", pairs, lambda: score_bucket(guesses[0], bucket))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=1_000_000)
+    parser.add_argument("--length", type=int, default=5)
+    args = parser.parse_args()
+    run(args.pairs, args.length)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Attach time and private memory of word bank worker processes.
+
+Run with ``python -m benchmarks.shared_word_bank``.
+Every worker builds a WordGenerator from the same snapshot,
+in private mode (per-process word lists and indexes)
+and in shared mode (everything read from the mapped snapshot),
+then reports its construction time and private resident memory.
+Memory figures are read from /proc, so they are Linux only.
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from app.word_generator import WordGenerator
+
+from .common import synthetic_word_bank
+
+
+def private_memory_kb() -> int:
+    """Resident memory of this process not backed by a file."""
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("RssAnon:"):
+            return int(line.split()[1])
+    return 0
+
+
+def worker(path: Path, *, shared: bool) -> tuple[float, int]:
+    """Build a generator, return its build time in ms and its memory cost."""
+    before = private_memory_kb()
+    started = time.perf_counter()
+    wordgen = WordGenerator(path, shared=shared)
+    elapsed = (time.perf_counter() - started) * 1000
+    wordgen.is_valid("hello")
+    return elapsed, private_memory_kb() - before
+
+
+def run(path: Path, workers: int) -> None:
+    """Start the workers in both modes and print what they cost."""
+    context = multiprocessing.get_context("spawn")
+    print(f"{'mode':>8} {'workers':>7} {'build ms':>9} {'private MiB':>12}")
+    for shared in (False, True):
+        with context.Pool(workers) as pool:
+            results = pool.starmap(worker_entry, [(path, shared)] * workers)
+        build_ms = max(elapsed for elapsed, _ in results)
+        private_mb = sum(memory for _, memory in results) / 1024
+        mode = "shared" if shared else "private"
+        print(f"{mode:>8} {workers:>7} {build_ms:>9.2f} {private_mb:>12.1f}")
+
+
+def worker_entry(path: Path, shared: bool) -> tuple[float, int]:  # noqa: FBT001
+    """Positional entry point for Pool.starmap."""
+    return worker(path, shared=shared)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snapshot", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.snapshot is not None:
+        run(args.snapshot, args.workers)
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run(synthetic_word_bank(Path(tmpdir) / "wordbank.bin"), args.workers)
+
+
+if __name__ == "__main__":
+    main()
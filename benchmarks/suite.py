@@ -0,0 +1,323 @@
+"""Benchmark suite of the word bank, the scoring and the repositories.
+
+Run with ``python -m benchmarks.suite``,
+pass ``--save-baselines`` to record the timings of this machine.
+Timings are saved as JSON and compared against stored baselines,
+a timing slower than its baseline by more than the tolerance
+is reported as a regression and fails the run.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import secrets
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Final
+from uuid import UUID, uuid4
+
+from app.core.scoring import word_masks
+from app.core.wordle import WordleGame
+from app.models.base import Base
+from app.models.guess import Guess
+from app.models.trivia import Trivia, TriviaDifficulty
+from app.models.wordle import Wordle, WordleStatus
+from app.storage.database import Database, SQLiteProfile
+from app.storage.guess import GuessRepo
+from app.storage.seen import SeenRepo
+from app.storage.trivia import TriviaRepo
+from app.storage.trivia_pool import TriviaPool
+from app.storage.wordle import WordleRepo
+from app.word_generator import Difficulty, WordGenerator
+from sqlalchemy import insert
+
+from .common import measure, synthetic_word_bank
+
+BASELINES_PATH: Final[Path] = Path(__file__).with_name("baselines.json")
+SEED_BATCH: Final[int] = 10_000
+
+Results = dict[str, float]
+
+
+def bench_wordgen(snapshot: Path, results: Results) -> WordGenerator:
+    """Time building and querying the word generator."""
+    results["wordgen.init"] = measure(
+        lambda: WordGenerator(snapshot), number=1, repeat=3
+    )
+    wordgen = WordGenerator(snapshot)
+    results["wordgen.separate_lengths"] = measure(
+        wordgen.separate_lengths, number=1, repeat=3
+    )
+
+    rng = random.Random(0)  # noqa: S311
+    words = [
+        rng.choice(wordgen.mp_len_words[length][difficulty])
+        for length in wordgen.mp_len_words
+        for difficulty in Difficulty
+        if wordgen.mp_len_words[length][difficulty]
+    ]
+    results["wordgen.is_valid"] = measure(
+        lambda: [wordgen.is_valid(word) for word in words], number=100
+    ) / len(words)
+    results["wordgen.random"] = measure(
+        lambda: wordgen.random(5, Difficulty.EASY), number=10_000
+    )
+    results["wordgen.get_word"] = measure(
+        lambda: [wordgen.get_word(word) for word in words], number=100
+    ) / len(words)
+
+    game = WordleGame(wordgen)
+    pairs = [(rng.choice(words), rng.choice(words)) for _ in range(1000)]
+    pairs = [
+        (guess.upper(), word.upper())
+        for guess, word in pairs
+        if len(guess) == len(word)
+    ] or [("HELLO", "WORLD")]
+    # the masks of an answer are built once per game, like the cache does
+    masks = {word: word_masks(word) for _, word in pairs}
+    results["wordle.gen_colors_for_guess"] = measure(
+        lambda: [
+            list(game.gen_colors_for_guess(guess, word, masks[word]))
+            for guess, word in pairs
+        ],
+        number=10,
+    ) / len(pairs)
+    return wordgen
+
+
+async def seed_database(db: Database, games: int, guesses: int) -> None:
+    """Fill the wordle, guess and trivia tables with realistic volumes."""
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(0)  # noqa: S311
+    users = max(games // 10, 1)
+    started = datetime(2024, 1, 1)  # noqa: DTZ001
+    wordle_ids: list[UUID] = []
+    ongoing: set[int] = set()
+    rows: list[dict[str, Any]] = []
+    for idx in range(games):
+        user_id = idx % users
+        if user_id in ongoing or rng.random() < 0.9:  # noqa: PLR2004
+            status = rng.choice(
+                [WordleStatus.COMPLETED.value, WordleStatus.ABORTED.value]
+            )
+        else:
+            status = rng.choice(
+                [WordleStatus.ACTIVE.value, WordleStatus.PENDING.value]
+            )
+            ongoing.add(user_id)
+        wordle_ids.append(uuid4())
+        created_at = started + timedelta(minutes=idx)
+        rows.append(
+            {
+                "id": wordle_ids[-1],
+                "created_at": created_at,
+                "updated_at": created_at,
+                "word": "HELLO",
+                "user_id": user_id,
+                "status": status,
+            }
+        )
+    async with db.engine.begin() as conn:
+        for start in range(0, len(rows), SEED_BATCH):
+            await conn.execute(
+                insert(Wordle), rows[start : start + SEED_BATCH]
+            )
+
+    async with db.engine.begin() as conn:
+        for start in range(0, guesses, SEED_BATCH):
+            await conn.execute(
+                insert(Guess),
+                [
+                    {
+                        "id": uuid4(),
+                        "created_at": started + timedelta(seconds=idx),
+                        "content": "WORLD",
+                        "result": "40132",
+                        "wordle_id": wordle_ids[idx % games],
+                    }
+                    for idx in range(start, min(start + SEED_BATCH, guesses))
+                ],
+            )
+
+    async with db.engine.begin() as conn:
+        await conn.execute(
+            insert(Trivia),
+            [
+                {
+                    "difficulty": rng.choice(list(TriviaDifficulty)),
+                    "category": "General Knowledge",
+                    "question": f"Question #{idx}?",
+                    "correct_answer": "yes",
+                    "incorrect_answer_1": "no",
+                    "incorrect_answer_2": "maybe",
+                    "incorrect_answer_3": "never",
+                }
+                for idx in range(5000)
+            ],
+        )
+
+
+async def ameasure(
+    func: Callable[[], Awaitable[Any]],
+    *,
+    number: int,
+    repeat: int = 3,
+) -> float:
+    """Return the best time of a single awaited call in nanoseconds."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) / number * 1e9
+
+
+async def bench_repositories(
+    db_path: Path,
+    games: int,
+    guesses: int,
+    results: Results,
+) -> None:
+    """Time every repository method against a seeded database."""
+    db = Database(f"sqlite+aiosqlite:///{db_path}", SQLiteProfile())
+    if not db_path.exists():
+        await seed_database(db, games, guesses)
+    wordle_repo = WordleRepo(db)
+    guess_repo = GuessRepo(db)
+    trivia_repo = TriviaRepo(db)
+    questions = itertools.count()
+    trivia_pool = TriviaPool(trivia_repo, SeenRepo(db))
+    await trivia_pool.load()
+
+    # players outside of the seeded ones, each may only have one game
+    wordle = await wordle_repo.create("HELLO", -secrets.randbits(48))
+    user_id = wordle.user_id
+    guess = await guess_repo.create("WORLD", "40132", wordle.id)
+    history = await wordle_repo.get_by_user_id(0)
+    wordle_ids = [prev.id for prev in history]
+
+    cases: dict[str, Callable[[], Awaitable[Any]]] = {
+        "wordle_repo.create": (
+            lambda: wordle_repo.create("HELLO", -secrets.randbits(48))
+        ),
+        "wordle_repo.get": lambda: wordle_repo.get(wordle.id),
+        "wordle_repo.get_by_user_id": lambda: wordle_repo.get_by_user_id(0),
+        "wordle_repo.get_active_wordle_by_user_id": (
+            lambda: wordle_repo.get_active_wordle_by_user_id(user_id)
+        ),
+        "wordle_repo.get_pending_wordle": (
+            lambda: wordle_repo.get_pending_wordle(user_id)
+        ),
+        "wordle_repo.get_ongoing_wordle": (
+            lambda: wordle_repo.get_ongoing_wordle(user_id)
+        ),
+        "wordle_repo.change_status": (
+            lambda: wordle_repo.change_status(wordle.id, is_winning=False)
+        ),
+        "wordle_repo.get_guesses": lambda: wordle_repo.get_guesses(user_id),
+        "guess_repo.create": (
+            lambda: guess_repo.create("WORLD", "40132", wordle.id)
+        ),
+        "guess_repo.get": lambda: guess_repo.get(guess.id),
+        "guess_repo.get_by_wordle_id": (
+            lambda: guess_repo.get_by_wordle_id(wordle.id)
+        ),
+        "guess_repo.count_by_wordle_ids": (
+            lambda: guess_repo.count_by_wordle_ids(wordle_ids)
+        ),
+        # every question is new, a duplicate would be skipped
+        "trivia_repo.create": lambda: trivia_repo.create(
+            Trivia(
+                difficulty=TriviaDifficulty.EASY,
+                category="General Knowledge",
+                question=f"Is this benchmark #{next(questions)}?",
+                correct_answer="yes",
+                incorrect_answer_1="no",
+                incorrect_answer_2="maybe",
+                incorrect_answer_3="never",
+            )
+        ),
+        "trivia_repo.get_random": trivia_repo.get_random,
+        "trivia_pool.get_random": trivia_pool.get_random,
+    }
+    for name, case in cases.items():
+        results[name] = await ameasure(case, number=20)
+    await db.dispose()
+
+
+def compare(results: Results, baselines: Results, tolerance: float) -> bool:
+    """Print every timing against its baseline, False on regressions."""
+    ok = True
+    print(f"{'benchmark':<45} {'ns':>14} {'baseline':>14} {'ratio':>7}")
+    for name, value in results.items():
+        baseline = baselines.get(name)
+        ratio = value / baseline if baseline else None
+        flag = ""
+        if ratio is not None and ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            ok = False
+        print(
+            f"{name:<45} {value:>14.0f} "
+            f"{baseline if baseline is not None else float('nan'):>14.0f} "
+            f"{ratio if ratio is not None else float('nan'):>7.2f}{flag}"
+        )
+    return ok
+
+
+def main() -> None:
+    """Run the suite."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snapshot", type=Path, default=None)
+    parser.add_argument("--db", type=Path, default=None)
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--guesses", type=int, default=1_000_000)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baselines", type=Path, default=BASELINES_PATH)
+    parser.add_argument("--save-baselines", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot = args.snapshot or synthetic_word_bank(
+            Path(tmpdir) / "wordbank.bin"
+        )
+        bench_wordgen(snapshot, results)
+        db_path = args.db or Path(tmpdir) / "bench.db"
+        asyncio.run(
+            bench_repositories(db_path, args.games, args.guesses, results)
+        )
+
+    report = {
+        "created_at": datetime.now().astimezone().isoformat(),
+        "python": sys.version,
+        "machine": platform.platform(),
+        "games": args.games,
+        "guesses": args.guesses,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    baselines: Results = {}
+    if args.baselines.exists():
+        baselines = json.loads(args.baselines.read_text())["results"]
+    ok = compare(results, baselines, args.tolerance)
+    if args.save_baselines:
+        args.baselines.write_text(json.dumps(report, indent=2) + "\n")
+        return
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Micro-benchmark of WordGenerator.is_valid over the full word bank.
+
+Run with ``python -m benchmarks.word_validation``,
+pass ``--snapshot`` to measure a compiled wordnet snapshot
+instead of a synthetic bank of the same size.
+"""
+
+import argparse
+import random
+import tempfile
+from functools import partial
+from pathlib import Path
+
+from app.word_generator import Difficulty, WordGenerator
+
+from .common import measure, synthetic_word_bank
+
+
+def legacy_is_valid(wordgen: WordGenerator, word: str) -> bool:
+    """The list concatenation and scan is_valid used to do."""
+    if len(word) not in wordgen.mp_len_words:
+        return False
+    buckets = wordgen.mp_len_words[len(word)]
+    return word in list(buckets[Difficulty.EASY]) + list(
+        buckets[Difficulty.MEDIUM]
+    ) + list(buckets[Difficulty.HARD])
+
+
+def run(wordgen: WordGenerator, number: int) -> None:
+    """Time hits and misses of every length against both lookups."""
+    rng = random.Random(0)  # noqa: S311
+    print(
+        f"{'length':>6} {'words':>7} {'case':>5} {'legacy ns':>12} "
+        f"{'index ns':>10}"
+    )
+    for length, buckets in sorted(wordgen.mp_len_words.items()):
+        words = [word for bucket in buckets.values() for word in bucket]
+        if not words:
+            continue
+        cases = {
+            "hit": rng.choice(words),
+            "miss": "q" * length,
+        }
+        for case, word in cases.items():
+            legacy = measure(
+                partial(legacy_is_valid, wordgen, word), number=number
+            )
+            index = measure(
+                partial(wordgen.is_valid, word), number=number * 100
+            )
+            print(
+                f"{length:>6} {len(words):>7} {case:>5} {legacy:>12.0f} "
+                f"{index:>10.0f}"
+            )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snapshot", type=Path, default=None)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.snapshot is not None:
+        run(WordGenerator(args.snapshot), args.number)
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = synthetic_word_bank(Path(tmpdir) / "wordbank.bin")
+        run(WordGenerator(path), args.number)
+
+
+if __name__ == "__main__":
+    main()
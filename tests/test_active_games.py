@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from app.models.base import Base
+from app.models.wordle import WordleStatus
+from app.storage.active_games import ActiveGameCache
+from app.storage.database import Database
+from app.storage.guess import GuessRepo
+from app.storage.wordle import WordleRepo
+from sqlalchemy import event
+
+USER_ID = 42
+
+
+class TestActiveGameCache(unittest.IsolatedAsyncioTestCase):
+    """Tests for the write-through cache of ongoing wordles."""
+
+    async def asyncSetUp(self) -> None:
+        """Create the tables in a scratch database."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        async with self.db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.cache = ActiveGameCache()
+        self.wordle_repo = WordleRepo(self.db, self.cache)
+        self.guess_repo = GuessRepo(self.db, self.cache)
+
+        self.statements: list[str] = []
+
+        def record(*args: Any) -> None:  # noqa: ANN401
+            self.statements.append(args[2])
+
+        event.listen(
+            self.db.engine.sync_engine, "before_cursor_execute", record
+        )
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    async def test_guess_is_one_write(self) -> None:
+        """Tests that a guess on a cached game is one write transaction.
+
+        The guess is inserted along with the player stats, nothing is read.
+        """
+        wordle = await self.wordle_repo.create("HELLO", USER_ID)
+        self.statements.clear()
+
+        ongoing = await self.wordle_repo.get_ongoing_wordle(USER_ID)
+        assert ongoing is wordle
+        await self.guess_repo.create("WORLD", "40132", wordle.id)
+        guesses = await self.wordle_repo.get_guesses(USER_ID)
+        await self.wordle_repo.change_status(wordle.id, is_winning=False)
+
+        assert [guess.content for guess in guesses] == ["WORLD"]
+        assert sorted(
+            statement.split(" (")[0] for statement in self.statements
+        ) == ["INSERT INTO guess", "INSERT INTO player_stats"]
+
+    async def test_status_changes_go_through(self) -> None:
+        """Tests that statuses are saved and finished games evicted."""
+        wordle = await self.wordle_repo.create("HELLO", USER_ID)
+        for _ in range(WordleRepo.TRIVIA_THRESHOLD):
+            await self.guess_repo.create("WORLD", "44444", wordle.id)
+        await self.wordle_repo.change_status(wordle.id, is_winning=False)
+        assert await self.wordle_repo.get_pending_wordle(USER_ID) == (
+            wordle.id,
+            WordleStatus.PENDING.value,
+        )
+        assert (
+            await self.wordle_repo.get_active_wordle_by_user_id(USER_ID)
+            is None
+        )
+
+        await self.wordle_repo.change_status(
+            wordle.id, is_winning=False, is_ending=True
+        )
+        assert len(self.cache) == 0
+        assert await self.wordle_repo.get_ongoing_wordle(USER_ID) is None
+        saved = await self.wordle_repo.get(wordle.id)
+        assert saved is not None
+        assert saved.status == WordleStatus.ABORTED.value
+
+    async def test_cold_cache_loads_from_database(self) -> None:
+        """Tests that an ongoing game is cached on first read."""
+        wordle = await WordleRepo(self.db).create("HELLO", USER_ID)
+        await GuessRepo(self.db).create("WORLD", "40132", wordle.id)
+
+        loaded = await self.wordle_repo.get_ongoing_wordle(USER_ID)
+        assert loaded is not None
+        assert [guess.content for guess in loaded.guesses] == ["WORLD"]
+        assert self.cache.get(USER_ID) is loaded
+
+    async def test_masks_live_with_the_game(self) -> None:
+        """Tests that the scoring masks are built once per ongoing game."""
+        wordle = await self.wordle_repo.create("HELLO", USER_ID)
+        masks = self.cache.masks(wordle.id)
+        assert masks is not None
+        assert masks.word == "HELLO"
+        assert self.cache.masks(wordle.id) is masks
+
+        await self.wordle_repo.change_status(
+            wordle.id, is_winning=False, is_ending=True
+        )
+        assert self.cache.masks(wordle.id) is None
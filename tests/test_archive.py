@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from app.models.guess import Guess
+from app.models.wordle import Wordle, WordleStatus
+from app.storage.archive import ArchiveRepo
+from app.storage.database import Database
+from app.storage.guess import GuessRepo
+from app.storage.migrations import migrate
+from app.storage.player_stats import PlayerStatsRepo
+from app.storage.wordle import WordleRepo
+from sqlalchemy import func, select
+
+USER_ID = 42
+WON_IN = 3
+GAMES = 3
+
+
+class TestArchive(unittest.IsolatedAsyncioTestCase):
+    """Tests for the archival of finished wordles."""
+
+    async def asyncSetUp(self) -> None:
+        """Play a won, an ended and an ongoing wordle."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        await migrate(self.db)
+        self.wordle_repo = WordleRepo(self.db)
+        self.guess_repo = GuessRepo(self.db)
+        self.archive = ArchiveRepo(self.db)
+
+        self.won = await self.wordle_repo.create("HELLO", USER_ID)
+        self.guesses = [
+            await self.guess_repo.create(content, result, self.won.id)
+            for content, result in (
+                ("WORLD", "44104"),
+                ("HELPS", "00044"),
+                ("HELLO", "00000"),
+            )
+        ]
+        await self.wordle_repo.change_status(self.won.id, is_winning=True)
+        self.ended = await self.wordle_repo.create("PLANE", USER_ID)
+        await self.wordle_repo.change_status(self.ended.id, is_ending=True)
+        self.ongoing = await self.wordle_repo.create("ZEBRA", USER_ID)
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    async def count(self, model: type[Wordle | Guess]) -> int:
+        """Rows of a live table."""
+        async with self.db.create_session() as session:
+            stmt = select(func.count()).select_from(model)
+            return (await session.execute(stmt)).scalar_one()
+
+    async def test_cutoff(self) -> None:
+        """Tests that recently finished wordles stay live."""
+        assert await self.archive.archive() == 0
+        assert await self.count(Wordle) == GAMES
+
+    async def test_moves_finished_wordles(self) -> None:
+        """Tests that only the ongoing wordle is left in the live tables."""
+        stats = await PlayerStatsRepo(self.db).get(USER_ID)
+        assert stats is not None
+        archived = await self.archive.archive(timedelta(0), batch=1)
+        assert archived == GAMES - 1
+        assert await self.count(Wordle) == 1
+        assert await self.count(Guess) == 0
+        assert await self.wordle_repo.get_ongoing_wordle(USER_ID) is not None
+
+        await PlayerStatsRepo(self.db).rebuild()
+        rebuilt = await PlayerStatsRepo(self.db).get(USER_ID)
+        assert rebuilt is not None
+        assert rebuilt.as_dict() == stats.as_dict()
+
+    async def test_reads_are_transparent(self) -> None:
+        """Tests that archived wordles and guesses read like live ones."""
+        await self.archive.archive(timedelta(0))
+
+        history = await self.wordle_repo.get_by_user_id(USER_ID)
+        assert [wordle.id for wordle in history] == [
+            self.ongoing.id,
+            self.ended.id,
+            self.won.id,
+        ]
+        # a listing leaves the archived guesses packed
+        assert history[-1].guesses == []
+        won = await self.wordle_repo.get(self.won.id)
+        assert won is not None
+        assert won.status == WordleStatus.COMPLETED.value
+
+        guesses = await self.guess_repo.get_by_wordle_id(self.won.id)
+        assert [
+            (guess.content, guess.result, guess.created_at)
+            for guess in guesses
+        ] == [
+            (guess.content, guess.result, guess.created_at)
+            for guess in self.guesses
+        ]
+        assert (
+            await self.guess_repo.count_by_wordle_ids(
+                [self.won.id, self.ended.id]
+            )
+            == WON_IN
+        )
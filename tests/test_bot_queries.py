@@ -0,0 +1,211 @@
+import importlib
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+from unittest import mock
+from uuid import UUID
+
+from app.core.leaderboard import Leaderboard
+from app.models.wordle import WordleStatus
+from app.storage.active_games import ActiveGameCache
+from app.storage.database import Database
+from app.storage.guess import guess_repo
+from app.storage.migrations import migrate
+from app.storage.player import player_repo
+from app.storage.player_stats import player_stats_repo
+from app.storage.wordle import wordle_repo
+from app.word_bank import WordEntry, write_word_bank
+from app.word_generator import (
+    Difficulty,
+    WordGenerator,
+    WordGeneratorLoader,
+)
+from sqlalchemy import event
+
+USER_ID = 42
+ENTRIES: dict[tuple[int, str], list[WordEntry]] = {
+    (5, Difficulty.EASY): [
+        WordEntry("hello", "a greeting", ["hello", "hi"], []),
+        WordEntry("world", "the earth", ["world", "earth"], []),
+        WordEntry("plane", "an aircraft", [], []),
+    ],
+    (5, Difficulty.MEDIUM): [],
+    (5, Difficulty.HARD): [],
+}
+
+
+def make_interaction() -> mock.MagicMock:
+    """Discord interaction of the test user."""
+    interaction = mock.MagicMock()
+    interaction.user.id = USER_ID
+    interaction.user.name = "player"
+    interaction.user.display_name = "Player"
+    interaction.response.is_done.return_value = False
+    interaction.response.send_message = mock.AsyncMock()
+    interaction.response.defer = mock.AsyncMock()
+    interaction.followup.send = mock.AsyncMock()
+    interaction.channel.send = mock.AsyncMock()
+    return interaction
+
+
+class TestBotQueries(unittest.IsolatedAsyncioTestCase):
+    """Tests for the queries issued by every bot command."""
+
+    bot: ModuleType
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Import the bot with placeholder discord settings."""
+        with mock.patch.dict(
+            os.environ, {"DISCORD_TOKEN": "token", "GUILD_ID": "1"}
+        ):
+            cls.bot = importlib.import_module("app.bot")
+
+    async def asyncSetUp(self) -> None:
+        """Point the repositories at a scratch database and word bank."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        await migrate(self.db)
+        path = Path(self.tmpdir.name) / "wordbank.bin"
+        write_word_bank(path, WordGenerator.fingerprint(), ENTRIES)
+
+        self.loader = WordGeneratorLoader(path)
+        await self.loader.wait()
+
+        self.cache = ActiveGameCache()
+        for repo in (wordle_repo, guess_repo, player_repo, player_stats_repo):
+            self.enterContext(mock.patch.object(repo, "db", self.db))
+        for repo in (wordle_repo, guess_repo):
+            self.enterContext(mock.patch.object(repo, "cache", self.cache))
+        self.enterContext(
+            mock.patch.object(self.bot, "wordgen_loader", self.loader)
+        )
+        self.leaderboard = Leaderboard(player_stats_repo, min_games=1)
+        self.enterContext(
+            mock.patch.object(self.bot, "leaderboard", self.leaderboard)
+        )
+
+        self.statements: list[str] = []
+
+        def record(*args: Any) -> None:  # noqa: ANN401
+            match = re.search(r"(?:FROM|INTO|UPDATE) (\w+)", args[2])
+            self.statements.append(
+                f"{args[2].split()[0]} {match.group(1) if match else ''}"
+            )
+
+        event.listen(
+            self.db.engine.sync_engine, "before_cursor_execute", record
+        )
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    async def run_command(self, name: str, *args: Any) -> list[str]:  # noqa: ANN401
+        """Run a bot command, return the statements it issued."""
+        self.statements.clear()
+        command = getattr(self.bot, name)
+        await command.callback(make_interaction(), *args)
+        return list(self.statements)
+
+    async def start_game(self) -> None:
+        """Start a game like the selection view does, then forget it."""
+        await wordle_repo.create("HELLO", USER_ID)
+        self.cache.discard(await self.ongoing_id())
+
+    async def ongoing_id(self) -> UUID:
+        """Id of the ongoing game of the test user."""
+        state = await wordle_repo.get_ongoing_state(USER_ID)
+        assert state is not None
+        return state.id
+
+    async def test_start_wordle(self) -> None:
+        """Tests that starting checks the game status without guesses."""
+        assert await self.run_command("start_wordle") == [
+            "SELECT wordle",
+            "SELECT player",
+            "INSERT player",
+        ]
+        await self.start_game()
+        assert await self.run_command("start_wordle") == ["SELECT wordle"]
+
+    async def test_guess(self) -> None:
+        """Tests that guesses are loaded once, then served from memory."""
+        await self.start_game()
+        assert await self.run_command("guess", "world") == [
+            "SELECT wordle",
+            "SELECT guess",
+            "INSERT player_stats",
+            "INSERT guess",
+        ]
+        assert await self.run_command("guess", "world") == [
+            "INSERT player_stats",
+            "INSERT guess",
+        ]
+
+    async def test_guess_while_loading(self) -> None:
+        """Tests that a guess before the word list is built is answered."""
+        await self.start_game()
+        interaction = make_interaction()
+        with mock.patch.object(
+            self.bot, "wordgen_loader", WordGeneratorLoader()
+        ):
+            await self.bot.guess.callback(interaction, "world")
+        interaction.response.send_message.assert_awaited_once_with(
+            self.bot.ui.LOADING_MESSAGE
+        )
+
+    async def test_best_guess(self) -> None:
+        """Tests that suggestions load the guesses of the game."""
+        await self.start_game()
+        assert await self.run_command("best_guess") == [
+            "SELECT wordle",
+            "SELECT guess",
+        ]
+
+    async def test_end_wordle(self) -> None:
+        """Tests that ending a game never loads its guesses."""
+        assert await self.run_command("end_wordle") == ["SELECT wordle"]
+        await self.start_game()
+        assert await self.run_command("end_wordle") == [
+            "SELECT wordle",
+            "UPDATE wordle",
+            "INSERT player_stats",
+            "SELECT player_stats",
+        ]
+        assert await wordle_repo.get_ongoing_state(USER_ID) is None
+
+    async def test_player_stats(self) -> None:
+        """Tests that the stats are one read."""
+        assert await self.run_command("show_player_stats") == [
+            "SELECT player_stats",
+            "SELECT player",
+        ]
+
+    async def test_leaderboard(self) -> None:
+        """Tests that rankings are served from memory."""
+        await self.run_command("start_wordle")
+        await self.start_game()
+        await self.leaderboard.reconcile()
+        assert await self.run_command("show_rank") == []
+        assert await self.run_command("show_leaderboard") == ["SELECT player"]
+
+    async def test_listing(self) -> None:
+        """Tests that listing the games of a player skips their guesses."""
+        await self.start_game()
+        await wordle_repo.change_status(
+            await self.ongoing_id(), is_ending=True
+        )
+        self.statements.clear()
+        history = await wordle_repo.get_by_user_id(USER_ID)
+        assert [wordle.status for wordle in history] == [
+            WordleStatus.ABORTED.value
+        ]
+        assert self.statements == ["SELECT wordle", "SELECT wordle_archive"]
@@ -0,0 +1,151 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pytest
+from app.core.calibration import calibrate, play, write_calibration
+from app.core.scoring import encode_words, score_bucket
+from app.core.solver import PatternMatrixMissingError, Solver
+from app.word_bank import WordEntry, write_word_bank
+from app.word_generator import Difficulty, WordGenerator
+
+WORDS: dict[Difficulty, list[str]] = {
+    Difficulty.EASY: ["hello", "world", "plane"],
+    Difficulty.MEDIUM: ["crane", "zebra"],
+    Difficulty.HARD: ["fjord"],
+}
+GAMES = 4
+
+
+def naive_play(words: list[str], opener: str, answer: str) -> int:
+    """Play one game guess by guess, keeping the consistent words."""
+    candidates = list(words)
+    guess = opener
+    for turn in range(1, len(words) + 1):
+        if guess == answer:
+            return turn
+        result = score_bucket(guess, [answer]).tolist()
+        candidates = [
+            word
+            for word in candidates
+            if score_bucket(guess, [word]).tolist() == result
+        ]
+        guess = candidates[0]
+    msg = "the game never ends"
+    raise AssertionError(msg)
+
+
+class TestCalibration(unittest.TestCase):
+    """Tests for the simulated difficulty calibration."""
+
+    def setUp(self) -> None:
+        """Write a tiny word bank."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wordbank.bin"
+        write_word_bank(
+            self.path,
+            WordGenerator.fingerprint(),
+            {
+                (5, difficulty.value): [
+                    WordEntry(word, "", [], []) for word in words
+                ]
+                for difficulty, words in WORDS.items()
+            },
+        )
+
+    def tearDown(self) -> None:
+        """Remove the word bank and the calibration."""
+        self.tmpdir.cleanup()
+
+    def test_play_matches_naive_games(self) -> None:
+        """Tests that one tree walk plays every answer like a real game."""
+        words = [word for bucket in WORDS.values() for word in bucket]
+        order = np.array([3, 0, 5, 1, 4, 2])
+        ordered = [words[idx] for idx in order]
+        guesses = play(encode_words(words), int(order[0]), order)
+        for idx, answer in enumerate(words):
+            assert guesses[idx] == naive_play(ordered, ordered[0], answer)
+
+    def test_calibration_buckets_random(self) -> None:
+        """Tests that random() draws from the calibrated buckets."""
+        wordgen = WordGenerator(self.path)
+        expected = calibrate(wordgen, games=GAMES, workers=1)
+        assert set(expected[5]) == set(wordgen.valid_words[5])
+        assert all(guesses >= 1 for guesses in expected[5].values())
+
+        calibration = Path(self.tmpdir.name) / "calibration.json"
+        hardest = max(expected[5], key=expected[5].__getitem__)
+        expected[5][hardest] = 99.0
+        write_calibration(calibration, wordgen, GAMES, expected)
+
+        calibrated = WordGenerator(self.path, calibration_path=calibration)
+        assert calibrated.calibrated
+        assert calibrated.random(5, Difficulty.HARD).word == hardest
+
+    def test_calibration_moves_words(self) -> None:
+        """Tests that the words of a bucket follow its calibrated ids."""
+        wordgen = WordGenerator(self.path)
+        expected = calibrate(wordgen, games=GAMES, workers=1)
+        calibration = Path(self.tmpdir.name) / "calibration.json"
+        # the easy words become the hardest ones
+        for rank, word in enumerate(WORDS[Difficulty.EASY]):
+            expected[5][word] = 100.0 + rank
+        write_calibration(calibration, wordgen, GAMES, expected)
+
+        for shared in (False, True):
+            calibrated = WordGenerator(
+                self.path, calibration_path=calibration, shared=shared
+            )
+            assert calibrated.calibrated
+            assert list(calibrated.mp_len_words[5][Difficulty.HARD]) == [
+                "plane"
+            ]
+            for diff in Difficulty:
+                assert list(calibrated.mp_len_words[5][diff]) == [
+                    calibrated.bank.word(idx)
+                    for idx in calibrated.mp_len_ids[5][diff]
+                ]
+
+    def test_calibration_after_solver_build(self) -> None:
+        """Tests that calibrating never reuses matrices of the old order."""
+        patterns = Path(self.tmpdir.name) / "patterns"
+        solver = Solver(WordGenerator(self.path), patterns)
+        for diff in Difficulty:
+            solver.build(5, diff, workers=1)
+
+        wordgen = WordGenerator(self.path)
+        expected = calibrate(wordgen, games=GAMES, workers=1)
+        calibration = Path(self.tmpdir.name) / "calibration.json"
+        # the easy words become the hardest ones
+        for rank, word in enumerate(WORDS[Difficulty.EASY]):
+            expected[5][word] = 100.0 + rank
+        write_calibration(calibration, wordgen, GAMES, expected)
+
+        calibrated = Solver(
+            WordGenerator(self.path, calibration_path=calibration), patterns
+        )
+        history = [("zebra", score_bucket("zebra", ["plane"])[0].tolist())]
+        with pytest.raises(PatternMatrixMissingError):
+            calibrated.remaining(5, history)
+
+        for diff in Difficulty:
+            calibrated.build(5, diff, workers=1)
+        remaining = calibrated.remaining(5, history)
+        words = calibrated.wordgen.mp_len_words[5]
+        assert {
+            words[diff][col]
+            for diff, columns in remaining.items()
+            for col in columns
+        } == {"plane"}
+
+    def test_stale_calibration_is_ignored(self) -> None:
+        """Tests that a table of another word bank is not used."""
+        calibration = Path(self.tmpdir.name) / "calibration.json"
+        calibration.write_text(
+            json.dumps({"checksum": 0, "games": 1, "lengths": {}})
+        )
+        wordgen = WordGenerator(self.path, calibration_path=calibration)
+        assert not wordgen.calibrated
+        assert wordgen.random(5, Difficulty.HARD).word == "fjord"
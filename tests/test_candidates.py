@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from app.core.candidates import CandidateIndex, CandidateSet
+from app.core.scoring import score_bucket, score_pairs
+
+ALPHABET = "ABCDEFGHIJKWXYZ"
+
+
+class TestCandidates(unittest.TestCase):
+    """Tests for narrowing down the candidates of a game."""
+
+    def setUp(self) -> None:
+        """Index a bank of random words."""
+        rng = random.Random(2024)  # noqa: S311
+        self.words = sorted(
+            {"".join(rng.choices(ALPHABET, k=5)) for _ in range(3000)}
+        )
+        self.index = CandidateIndex(self.words)
+        self.rng = rng
+
+    def test_matches_brute_force(self) -> None:
+        """Tests that every step keeps exactly the consistent words."""
+        for _ in range(20):
+            target = self.rng.choice(self.words)
+            candidates = CandidateSet(self.index)
+            history: list[tuple[str, list[int]]] = []
+            for _ in range(4):
+                guess = self.rng.choice(self.words)
+                result = score_pairs([guess], [target])[0].tolist()
+                history.append((guess, result))
+                candidates.apply(history)
+
+                expected = set(self.words)
+                for prev, prev_result in history:
+                    scores = score_bucket(prev, self.words).tolist()
+                    expected &= {
+                        word
+                        for word, score in zip(self.words, scores, strict=True)
+                        if score == prev_result
+                    }
+                assert set(self.index.decode(candidates.bits)) == expected
+                assert target in expected
+
+    def test_spread(self) -> None:
+        """Tests that a settled position has no letter spread."""
+        target = self.words[0]
+        guess = target[0] + "WWWW"
+        candidates = CandidateSet(self.index)
+        candidates.apply([(guess, score_pairs([guess], [target])[0])])
+        assert len(candidates) > 1
+        assert self.index.letter_spread(candidates.bits, 0) == 0.0
+        assert self.index.letter_spread(candidates.bits, 1) > 0.0
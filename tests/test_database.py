@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+from app.storage.database import Database, SQLiteProfile
+from app.storage.migrations import migrate
+from app.storage.wordle import WordleRepo
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+USER_ID = 42
+
+
+class TestSQLiteProfile(unittest.IsolatedAsyncioTestCase):
+    """Tests for the SQLite performance profile."""
+
+    async def asyncSetUp(self) -> None:
+        """Create a profiled scratch database."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profile = SQLiteProfile(busy_timeout_ms=1234)
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}",
+            self.profile,
+        )
+        await migrate(self.db)
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    async def test_pragmas(self) -> None:
+        """Tests that every pooled connection gets the PRAGMAs."""
+        async with self.db.engine.connect() as conn:
+            journal_mode = await conn.exec_driver_sql("PRAGMA journal_mode")
+            assert journal_mode.scalar() == "wal"
+            busy_timeout = await conn.exec_driver_sql("PRAGMA busy_timeout")
+            assert busy_timeout.scalar() == self.profile.busy_timeout_ms
+
+    async def test_read_pool(self) -> None:
+        """Tests that readers see the commits and cannot write."""
+        wordle = await WordleRepo(self.db).create("HELLO", USER_ID)
+        assert self.db.read_engine is not self.db.engine
+        history = await WordleRepo(self.db).get_by_user_id(USER_ID)
+        assert [prev.id for prev in history] == [wordle.id]
+
+        async with self.db.create_read_session() as session:
+            with pytest.raises(OperationalError):
+                await session.execute(text("DELETE FROM wordle"))
@@ -0,0 +1,218 @@
+import itertools
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+from app.gather_trivias import Checkpoint, OpentdbError, TriviaGatherer
+from app.models.trivia import Trivia
+from app.storage.database import Database, SQLiteProfile
+from app.storage.migrations import migrate_trivia
+from app.storage.trivia import TriviaRepo
+from sqlalchemy import func, select
+
+QUESTIONS = 120
+PAGE_SIZE = 50
+PAGES = 3
+TOKEN = "t0k3n"  # noqa: S105
+HTTP_500 = 500
+INTERVAL_SECONDS = 0.05
+
+
+class StubOpentdb(ThreadingHTTPServer):
+    """opentdb serving a fixed set of questions to a single token."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.questions: list[dict[str, Any]] = [
+            {
+                "type": "multiple",
+                "difficulty": "easy",
+                "category": "Science &amp; Nature",
+                "question": f"Question #{idx}?",
+                "correct_answer": "yes",
+                "incorrect_answers": ["no", "maybe", "never"],
+            }
+            for idx in range(QUESTIONS)
+        ]
+        self.served = 0
+        self.token_requests = 0
+        self.rate_limits = 0
+        self.errors = 0
+        self.pages_before_outage: int | None = None
+        self.lock = threading.Lock()
+
+    def api(self, params: dict[str, str]) -> tuple[int, dict[str, Any]]:
+        """Status and body of a question request."""
+        with self.lock:
+            if params.get("token") != TOKEN:
+                return 200, {"response_code": 3, "results": []}
+            if self.pages_before_outage == 0 or self.errors:
+                self.errors = max(self.errors - 1, 0)
+                return HTTP_500, {}
+            if self.rate_limits:
+                self.rate_limits -= 1
+                return 200, {"response_code": 5, "results": []}
+            if self.served == len(self.questions):
+                return 200, {"response_code": 4, "results": []}
+            amount = int(params["amount"])
+            page = self.questions[self.served : self.served + amount]
+            self.served += len(page)
+            if self.pages_before_outage is not None:
+                self.pages_before_outage -= 1
+            return 200, {"response_code": 0, "results": page}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes the opentdb endpoints to the stub server."""
+
+    server: StubOpentdb
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Answer like opentdb."""
+        url = urlparse(self.path)
+        params = {
+            key: values[0] for key, values in parse_qs(url.query).items()
+        }
+        if url.path == "/api_token.php":
+            with self.server.lock:
+                self.server.token_requests += 1
+            status, body = 200, {"response_code": 0, "token": TOKEN}
+        else:
+            status, body = self.server.api(params)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args: object) -> None:
+        """Keep the test output quiet."""
+
+
+class TestGatherTrivias(unittest.IsolatedAsyncioTestCase):
+    """Tests for the trivia ingestion against a stub opentdb."""
+
+    async def asyncSetUp(self) -> None:
+        """Start the stub server and a scratch trivia database."""
+        self.server = StubOpentdb()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.sent_at: list[float] = []
+
+        async def record(_: httpx.Request) -> None:
+            self.sent_at.append(time.monotonic())
+
+        self.client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{self.server.server_port}",
+            trust_env=False,
+            event_hooks={"request": [record]},
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'trivia.db'}",
+            SQLiteProfile(journal_mode="DELETE"),
+        )
+        await migrate_trivia(self.db)
+        self.checkpoint_path = Path(self.tmpdir.name) / "checkpoint.json"
+
+    async def asyncTearDown(self) -> None:
+        """Stop the server, dispose of the scratch database."""
+        await self.client.aclose()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    def gatherer(self, **kwargs: Any) -> TriviaGatherer:  # noqa: ANN401
+        """Gatherer on the stub, without waiting between retries."""
+        kwargs.setdefault("page_size", PAGE_SIZE)
+        kwargs.setdefault("interval_seconds", 0)
+        return TriviaGatherer(
+            self.client,
+            TriviaRepo(self.db),
+            self.checkpoint_path,
+            backoff_seconds=0,
+            **kwargs,
+        )
+
+    async def questions(self) -> list[str]:
+        """Questions stored in the database."""
+        async with self.db.create_session() as session:
+            result = await session.execute(select(Trivia.question))
+            return list(result.scalars())
+
+    async def test_gathers_every_question(self) -> None:
+        """Tests that retried pages fetched concurrently are all stored."""
+        self.server.rate_limits = 2
+        self.server.errors = 1
+        checkpoint = await self.gatherer(concurrency=3).run()
+
+        assert checkpoint == Checkpoint(TOKEN, PAGES, QUESTIONS, done=True)
+        assert Checkpoint.load(self.checkpoint_path) == checkpoint
+        questions = await self.questions()
+        assert sorted(questions) == sorted(
+            question["question"] for question in self.server.questions
+        )
+        async with self.db.create_session() as session:
+            stmt = select(func.count()).where(
+                Trivia.category == "Science & Nature"
+            )
+            assert (await session.execute(stmt)).scalar_one() == QUESTIONS
+
+    async def test_rate_limit(self) -> None:
+        """Tests that concurrent workers never exceed the request rate."""
+        await self.gatherer(
+            concurrency=3, interval_seconds=INTERVAL_SECONDS
+        ).run()
+        # timed as sent, the arrivals at the server jitter with the network
+        gaps = [
+            later - earlier
+            for earlier, later in itertools.pairwise(self.sent_at)
+        ]
+        assert len(gaps) >= PAGES
+        # the clocks of the loop and the hook may round apart
+        assert min(gaps) >= INTERVAL_SECONDS * 0.9
+
+    async def test_resumes_from_checkpoint(self) -> None:
+        """Tests that an interrupted run resumes with its token."""
+        self.server.pages_before_outage = 1
+        with pytest.raises(OpentdbError):
+            await self.gatherer(concurrency=1, retries=1).run()
+        checkpoint = Checkpoint.load(self.checkpoint_path)
+        assert checkpoint == Checkpoint(TOKEN, 1, PAGE_SIZE)
+
+        self.server.pages_before_outage = None
+        checkpoint = await self.gatherer().run()
+        assert checkpoint.done
+        assert self.server.token_requests == 1
+        assert len(await self.questions()) == QUESTIONS
+
+        # a finished checkpoint fetches nothing more
+        await self.gatherer().run()
+        assert len(await self.questions()) == QUESTIONS
+
+    async def test_skips_stored_questions(self) -> None:
+        """Tests that a question served again is stored once."""
+        repeated = dict(self.server.questions[0])
+        repeated["question"] = "  question #0? "
+        repeated["incorrect_answers"] = ["never", "maybe", "no"]
+        self.server.questions.append(repeated)
+        checkpoint = await self.gatherer(page_size=QUESTIONS).run()
+        assert checkpoint.trivias == QUESTIONS
+        assert len(await self.questions()) == QUESTIONS
+
+    async def test_unknown_token(self) -> None:
+        """Tests that a token opentdb does not know is an error."""
+        with pytest.raises(OpentdbError):
+            await self.gatherer().run("expired")
+        assert await self.questions() == []
@@ -0,0 +1,27 @@
+import itertools
+import unittest
+
+from app.enums import MatchResult
+from app.models.guess_result import GuessResult
+
+LENGTH = 5
+
+
+class TestGuessResult(unittest.TestCase):
+    """Tests for the packed colours of a guess."""
+
+    def test_round_trip(self) -> None:
+        """Tests that colours are unpacked as they were packed."""
+        result = GuessResult.parse("40132")
+        assert len(result) == LENGTH
+        assert list(result) == [4, 0, 1, 3, 2]
+        assert str(result) == "40132"
+        assert GuessResult.parse("00000") != GuessResult.parse("0000")
+
+    def test_checks(self) -> None:
+        """Tests the bitwise checks against every result of a length."""
+        correct = MatchResult.CORRECT_LETTER_CORRECT_POSITION
+        for colors in itertools.product(range(len(MatchResult)), repeat=5):
+            result = GuessResult.from_colors(colors)
+            assert result.won == all(color == correct for color in colors)
+            assert result.any_correct == (correct in colors)
@@ -0,0 +1,96 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.models.guess import Guess
+from app.storage.database import Database
+from app.storage.guess import GuessRepo
+from app.storage.guess_writer import GuessWriter
+from app.storage.migrations import migrate
+from app.storage.player_stats import PlayerStatsRepo
+from app.storage.wordle import WordleRepo
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+USER_ID = 42
+GUESSES = 20
+
+
+class TestGuessWriter(unittest.IsolatedAsyncioTestCase):
+    """Tests for the group commit of guesses."""
+
+    async def asyncSetUp(self) -> None:
+        """Create a scratch database with a wordle to guess."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        await migrate(self.db)
+        self.wordle = await WordleRepo(self.db).create("HELLO", USER_ID)
+        self.writer = GuessWriter(self.db, flush_ms=20)
+        self.repo = GuessRepo(self.db, writer=self.writer)
+
+        self.commits = 0
+
+        def record(*_: object) -> None:
+            self.commits += 1
+
+        event.listen(self.db.engine.sync_engine, "commit", record)
+
+    async def asyncTearDown(self) -> None:
+        """Stop the writer and dispose of the scratch database."""
+        await self.writer.stop()
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    async def test_group_commit(self) -> None:
+        """Tests that concurrent guesses are committed together."""
+        guesses = await asyncio.gather(
+            *(
+                self.repo.create("WORLD", "40132", self.wordle.id)
+                for _ in range(GUESSES)
+            )
+        )
+        assert self.commits == 1
+        saved = await self.repo.get_by_wordle_id(self.wordle.id)
+        assert {guess.id for guess in saved} == {guess.id for guess in guesses}
+        stats = await PlayerStatsRepo(self.db).get(USER_ID)
+        assert stats is not None
+        assert stats.guesses == GUESSES
+
+    async def test_batch_size(self) -> None:
+        """Tests that groups are capped at the batch size."""
+        self.writer.max_batch = GUESSES // 2
+        await asyncio.gather(
+            *(
+                self.repo.create("WORLD", "40132", self.wordle.id)
+                for _ in range(GUESSES)
+            )
+        )
+        assert self.commits == GUESSES // self.writer.max_batch
+
+    async def test_failure_is_isolated(self) -> None:
+        """Tests that a faulty guess does not fail its group."""
+        good = Guess(content="WORLD", result="40132", wordle_id=self.wordle.id)
+        bad = Guess(content=None, result="40132", wordle_id=self.wordle.id)
+        results = await asyncio.gather(
+            self.writer.write(good),
+            self.writer.write(bad),
+            return_exceptions=True,
+        )
+        assert results[0] is None
+        assert isinstance(results[1], IntegrityError)
+        async with self.db.create_session() as session:
+            ids = (await session.execute(select(Guess.id))).scalars().all()
+        assert ids == [good.id]
+
+    async def test_stop_drains(self) -> None:
+        """Tests that stopping commits the queued guesses."""
+        task = asyncio.create_task(
+            self.repo.create("WORLD", "40132", self.wordle.id)
+        )
+        await asyncio.sleep(0)
+        await self.writer.stop()
+        assert len(await self.repo.get_by_wordle_id(self.wordle.id)) == 1
+        await task
@@ -0,0 +1,25 @@
+import unittest
+
+from app.models.ids import uuid7
+
+IDS = 10_000
+UUID_VERSION = 7
+MS = 1_720_000_000_000
+
+
+class TestUUID7(unittest.TestCase):
+    """Tests for the time-ordered ids."""
+
+    def test_monotonic(self) -> None:
+        """Tests that ids made in a row are in order and unique."""
+        ids = [uuid7() for _ in range(IDS)]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == IDS
+        assert {id.version for id in ids} == {UUID_VERSION}
+        assert {id.variant for id in ids} == {ids[0].variant}
+
+    def test_given_time(self) -> None:
+        """Tests that an id made at a time starts with that time."""
+        id = uuid7(MS)
+        assert id.int >> 80 == MS
+        assert uuid7(MS - 1) < id < uuid7(MS + 1)
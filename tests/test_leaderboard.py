@@ -0,0 +1,140 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.core.leaderboard import (
+    Leaderboard,
+    LeaderboardMetric,
+    RankedSet,
+    Standing,
+)
+from app.models.player_stats import PlayerStats
+from app.storage.database import Database
+from app.storage.migrations import migrate
+from app.storage.player_stats import PlayerStatsRepo
+from sqlalchemy import insert, update
+
+KEYS = 500
+MIN_GAMES = 2
+# user id: games, wins, won games by guesses
+STATS: dict[int, tuple[int, int, dict[str, int]]] = {
+    1: (4, 3, {"3": 2, "6": 1}),
+    2: (2, 2, {"5": 2}),
+    3: (1, 1, {"2": 1}),
+    # aborted every game without a guess
+    4: (10, 0, {}),
+}
+
+
+class TestRankedSet(unittest.TestCase):
+    """Tests for the order-statistic treap."""
+
+    def test_matches_sorted_list(self) -> None:
+        """Tests ranks and indexes against a sorted list."""
+        rng = random.Random(0)  # noqa: S311
+        ranked = RankedSet(seed=0)
+        expected: set[tuple[int, int]] = set()
+        for _ in range(KEYS):
+            key = (rng.randrange(50), rng.randrange(10))
+            if key in expected and rng.random() < 0.5:  # noqa: PLR2004
+                ranked.discard(key)
+                expected.discard(key)
+            else:
+                ranked.add(key)
+                expected.add(key)
+
+        keys = sorted(expected)
+        assert len(ranked) == len(keys)
+        assert list(ranked) == keys
+        for idx, key in enumerate(keys):
+            assert ranked[idx] == key
+            assert ranked.rank(key) == idx
+        assert ranked.rank((50, 0)) == len(keys)
+
+
+class TestLeaderboard(unittest.IsolatedAsyncioTestCase):
+    """Tests for the in-memory rankings of the players."""
+
+    async def asyncSetUp(self) -> None:
+        """Seed the stats of a few players."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        await migrate(self.db)
+        async with self.db.engine.begin() as conn:
+            await conn.execute(
+                insert(PlayerStats),
+                [
+                    {
+                        "user_id": user_id,
+                        "games": games,
+                        "wins": wins,
+                        "guesses": sum(
+                            int(guesses) * won
+                            for guesses, won in histogram.items()
+                        ),
+                        "histogram": histogram,
+                    }
+                    for user_id, (games, wins, histogram) in STATS.items()
+                ],
+            )
+        self.leaderboard = Leaderboard(
+            PlayerStatsRepo(self.db), min_games=MIN_GAMES
+        )
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    async def test_rankings(self) -> None:
+        """Tests the top players and the place of a player."""
+        assert await self.leaderboard.reconcile() == len(STATS)
+        assert self.leaderboard.top(LeaderboardMetric.WINS, 2) == [
+            Standing(1, 1, 3),
+            Standing(2, 2, 2),
+        ]
+        assert self.leaderboard.top(LeaderboardMetric.WIN_RATE, 5) == [
+            Standing(1, 2, 1.0),
+            Standing(2, 1, 0.75),
+            Standing(3, 4, 0.0),
+        ]
+        assert self.leaderboard.top(LeaderboardMetric.AVERAGE_GUESSES, 5) == [
+            Standing(1, 1, 4.0),
+            Standing(2, 2, 5.0),
+        ]
+        # too few games to rank a rate, too few wins to rank an average
+        assert self.leaderboard.standing(LeaderboardMetric.WIN_RATE, 3) is None
+        assert (
+            self.leaderboard.standing(LeaderboardMetric.AVERAGE_GUESSES, 4)
+            is None
+        )
+
+    async def test_refresh_and_reconcile(self) -> None:
+        """Tests that changed stats are picked up."""
+        await self.leaderboard.reconcile()
+        async with self.db.engine.begin() as conn:
+            await conn.execute(
+                update(PlayerStats)
+                .where(PlayerStats.user_id == 3)  # noqa: PLR2004
+                .values(games=5, wins=5, guesses=10)
+            )
+        await self.leaderboard.refresh(3)
+        assert self.leaderboard.standing(
+            LeaderboardMetric.WINS, 3
+        ) == Standing(1, 3, 5)
+
+        async with self.db.engine.begin() as conn:
+            await conn.execute(
+                update(PlayerStats)
+                .where(PlayerStats.user_id == 1)
+                .values(wins=4)
+            )
+        assert await self.leaderboard.reconcile() == 1
+        assert await self.leaderboard.reconcile() == 0
+        # ties go to the lowest user id
+        assert self.leaderboard.standing(
+            LeaderboardMetric.WIN_RATE, 1
+        ) == Standing(1, 1, 1.0)
@@ -0,0 +1,262 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from app.models.base import Base
+from app.models.guess import Guess
+from app.models.guess_result import GuessResult
+from app.models.trivia import Trivia
+from app.models.wordle import Wordle, WordleStatus
+from app.storage.database import Database
+from app.storage.guess import GuessRepo
+from app.storage.migrations import (
+    MIGRATIONS,
+    TRIVIA_MIGRATIONS,
+    _pack_guess_results,
+    _time_ordered_ids,
+    migrate,
+    migrate_trivia,
+    schema_version,
+)
+from app.storage.trivia import TriviaRepo
+from app.storage.wordle import OngoingWordleExistsError, WordleRepo
+from sqlalchemy import insert, select
+
+USER_ID = 42
+GAMES = 3
+UUID_VERSION = 7
+
+
+class TestMigrations(unittest.IsolatedAsyncioTestCase):
+    """Tests for the schema migrations."""
+
+    async def asyncSetUp(self) -> None:
+        """Point at a scratch database."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    async def index_names(self) -> set[str]:
+        """Names of the indexes in the database."""
+        async with self.db.engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+            return set(result.scalars())
+
+    async def table_names(self) -> set[str]:
+        """Names of the tables in the database."""
+        async with self.db.engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+            return set(result.scalars())
+
+    async def test_fresh_database(self) -> None:
+        """Tests that a new database is created at the latest version."""
+        await migrate(self.db)
+        async with self.db.engine.connect() as conn:
+            assert await conn.run_sync(schema_version) == len(MIGRATIONS)
+            plan = await conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT * FROM guess "
+                "WHERE wordle_id = ? ORDER BY id",
+                (uuid4().hex,),
+            )
+            assert "ix_guess_wordle_id_id" in str(plan.all())
+            assert "TEMP B-TREE" not in str(plan.all())
+        assert "uq_wordle_user_id_ongoing" in await self.index_names()
+        assert await self.table_names() == {
+            "guess",
+            "player",
+            "player_stats",
+            "seen",
+            "wordle",
+            "wordle_archive",
+        }
+
+    async def test_fresh_trivia_database(self) -> None:
+        """Tests that a trivia database only gets the trivia table."""
+        await migrate_trivia(self.db)
+        async with self.db.engine.connect() as conn:
+            assert await conn.run_sync(schema_version) == len(
+                TRIVIA_MIGRATIONS
+            )
+        assert await self.table_names() == {"trivia"}
+
+    async def test_upgrade_in_place(self) -> None:
+        """Tests that an old database gets the indexes and one game left."""
+        async with self.db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    await conn.exec_driver_sql(f"DROP INDEX {index.name}")
+            started = datetime(2024, 7, 1)  # noqa: DTZ001
+            await conn.execute(
+                insert(Wordle),
+                [
+                    {
+                        "id": uuid4(),
+                        "created_at": started + timedelta(minutes=idx),
+                        "updated_at": started,
+                        "word": "HELLO",
+                        "user_id": USER_ID,
+                        "status": status.value,
+                    }
+                    for idx, status in enumerate(
+                        [
+                            WordleStatus.ACTIVE,
+                            WordleStatus.PENDING,
+                            WordleStatus.ACTIVE,
+                        ]
+                    )
+                ],
+            )
+
+        await migrate(self.db)
+
+        async with self.db.engine.connect() as conn:
+            result = await conn.execute(
+                select(Wordle.status).order_by(Wordle.created_at)
+            )
+            assert list(result.scalars()) == [
+                WordleStatus.ABORTED.value,
+                WordleStatus.ABORTED.value,
+                WordleStatus.ACTIVE.value,
+            ]
+        assert "uq_wordle_user_id_ongoing" in await self.index_names()
+
+    async def test_one_ongoing_game(self) -> None:
+        """Tests that a second ongoing game of a user is rejected."""
+        await migrate(self.db)
+        repo = WordleRepo(self.db)
+        await repo.create("HELLO", USER_ID)
+        with pytest.raises(OngoingWordleExistsError):
+            await repo.create("WORLD", USER_ID)
+
+    async def test_pack_guess_results(self) -> None:
+        """Tests that results saved as digits are packed in place."""
+        await migrate(self.db)
+        wordle = await WordleRepo(self.db).create("HELLO", USER_ID)
+        async with self.db.engine.begin() as conn:
+            await conn.exec_driver_sql("DROP TABLE guess")
+            await conn.exec_driver_sql(
+                "CREATE TABLE guess (id CHAR(32) PRIMARY KEY, "
+                "created_at DATETIME, content VARCHAR, result VARCHAR, "
+                "wordle_id CHAR(32) REFERENCES wordle (id))"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO guess VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        uuid4().hex,
+                        f"2024-07-01 00:0{idx}:00.000000",
+                        "WORLD",
+                        result,
+                        wordle.id.hex,
+                    )
+                    for idx, result in enumerate(["40132", "00000"])
+                ],
+            )
+            await conn.exec_driver_sql(
+                "PRAGMA user_version = "
+                f"{MIGRATIONS.index(_pack_guess_results)}"
+            )
+
+        await migrate(self.db)
+
+        guesses = await GuessRepo(self.db).get_by_wordle_id(wordle.id)
+        assert [guess.result for guess in guesses] == [
+            GuessResult.parse("40132"),
+            GuessResult.parse("00000"),
+        ]
+        assert "ix_guess_wordle_id_id" in await self.index_names()
+        assert "ix_guess_wordle_id_created_at" not in await self.index_names()
+
+    async def test_time_ordered_ids(self) -> None:
+        """Tests that random ids are re-keyed in the order of creation."""
+        await migrate(self.db)
+        started = datetime(2024, 7, 1)  # noqa: DTZ001
+        # the random ids are sorted against the creation order
+        wordle_ids = sorted((uuid4() for _ in range(GAMES)), reverse=True)
+        async with self.db.engine.begin() as conn:
+            await conn.execute(
+                insert(Wordle),
+                [
+                    {
+                        "id": id,
+                        "created_at": started + timedelta(minutes=idx),
+                        "updated_at": started,
+                        "word": "HELLO",
+                        "user_id": USER_ID,
+                        "status": WordleStatus.ABORTED.value,
+                    }
+                    for idx, id in enumerate(wordle_ids)
+                ],
+            )
+            await conn.execute(
+                insert(Guess),
+                [
+                    {
+                        "id": uuid4(),
+                        "created_at": started + timedelta(minutes=idx),
+                        "content": "WORLD",
+                        "result": "40132",
+                        "wordle_id": id,
+                    }
+                    for idx, id in enumerate(wordle_ids)
+                ],
+            )
+            await conn.exec_driver_sql(
+                f"PRAGMA user_version = {MIGRATIONS.index(_time_ordered_ids)}"
+            )
+
+        await migrate(self.db)
+
+        async with self.db.engine.connect() as conn:
+            wordles = await conn.execute(
+                select(Wordle.id, Wordle.created_at).order_by(Wordle.id)
+            )
+            ids, times = zip(*wordles.all(), strict=True)
+            assert list(times) == sorted(times)
+            assert {id.version for id in ids} == {UUID_VERSION}
+            guesses = await conn.execute(
+                select(Guess.wordle_id).order_by(Guess.id)
+            )
+            assert tuple(guesses.scalars()) == ids
+
+    async def test_hash_trivias(self) -> None:
+        """Tests that duplicate trivias are dropped and hashed uniquely."""
+        async with self.db.engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE trivia (id INTEGER PRIMARY KEY, "
+                "created_at DATETIME, difficulty VARCHAR, category VARCHAR, "
+                "question VARCHAR, correct_answer VARCHAR, "
+                "incorrect_answer_1 VARCHAR, incorrect_answer_2 VARCHAR, "
+                "incorrect_answer_3 VARCHAR)"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO trivia VALUES "
+                "(?, '2024-07-01', 'EASY', 'Science', ?, 'yes', ?, ?, 'c')",
+                [
+                    (1, "Is it?", "a", "b"),
+                    (2, "Is  it? ", "b", "a"),
+                    (3, "Is it?", "a", "z"),
+                ],
+            )
+
+        await migrate_trivia(self.db)
+
+        async with self.db.engine.connect() as conn:
+            ids = await conn.execute(select(Trivia.id).order_by(Trivia.id))
+            assert list(ids.scalars()) == [1, 3]
+        assert "uq_trivia_content_hash" in await self.index_names()
+        assert await TriviaRepo(self.db).compact() == 0
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.storage.database import Database
+from app.storage.guess import GuessRepo
+from app.storage.migrations import migrate
+from app.storage.player_stats import PlayerStatsRepo
+from app.storage.wordle import WordleRepo
+
+USER_ID = 42
+WON_IN = 3
+
+
+class TestPlayerStats(unittest.IsolatedAsyncioTestCase):
+    """Tests for the materialized player stats."""
+
+    async def asyncSetUp(self) -> None:
+        """Create a scratch database."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        await migrate(self.db)
+        self.wordle_repo = WordleRepo(self.db)
+        self.guess_repo = GuessRepo(self.db)
+        self.stats_repo = PlayerStatsRepo(self.db)
+
+    async def asyncTearDown(self) -> None:
+        """Dispose of the scratch database."""
+        await self.db.dispose()
+        self.tmpdir.cleanup()
+
+    async def play(self) -> None:
+        """Win a game in 3 guesses, give up one and leave one ongoing."""
+        won = await self.wordle_repo.create("HELLO", USER_ID)
+        for _ in range(WON_IN):
+            await self.guess_repo.create("WORLD", "40132", won.id)
+        await self.wordle_repo.change_status(won.id, is_winning=True)
+
+        ended = await self.wordle_repo.create("PLANE", USER_ID)
+        await self.guess_repo.create("CRANE", "00000", ended.id)
+        await self.wordle_repo.change_status(ended.id, is_ending=True)
+
+        await self.wordle_repo.create("ZEBRA", USER_ID)
+
+    async def test_incremental(self) -> None:
+        """Tests that every game event is counted."""
+        await self.play()
+        stats = await self.stats_repo.get(USER_ID)
+        assert stats is not None
+        assert (stats.games, stats.wins, stats.aborted, stats.guesses) == (
+            3,
+            1,
+            1,
+            WON_IN + 1,
+        )
+        assert stats.histogram == {str(WON_IN): 1}
+
+    async def test_rebuild(self) -> None:
+        """Tests that a rebuild gives the stats kept up incrementally."""
+        await self.play()
+        incremental = await self.stats_repo.get(USER_ID)
+        assert incremental is not None
+        assert await self.stats_repo.rebuild() == 1
+        rebuilt = await self.stats_repo.get(USER_ID)
+        assert rebuilt is not None
+        assert rebuilt.as_dict() == incremental.as_dict()
@@ -0,0 +1,81 @@
+import random
+import string
+import unittest
+
+from app.core.scoring import (
+    ALPHABET_SIZE,
+    DEVIATED_THRESHOLD,
+    DEVIATION_TABLE,
+    score_bucket,
+    score_pairs,
+    word_masks,
+)
+from app.core.wordle import WordleGame
+
+# letters close to each other, so deviated matches are frequent
+ALPHABET = string.ascii_uppercase[:10] + "XYZ" + "az"
+
+
+class TestScoring(unittest.TestCase):
+    """Cross-checks of batch scoring against WordleGame."""
+
+    def setUp(self) -> None:
+        """Seed the pair generator."""
+        self.rng = random.Random(2024)  # noqa: S311
+        self.game = WordleGame()
+
+    def random_word(self, length: int) -> str:
+        """Random word of the test alphabet."""
+        return "".join(self.rng.choices(ALPHABET, k=length))
+
+    def reference(self, guess: str, word: str) -> list[int]:
+        """Colors as the game computes them."""
+        return list(self.game.gen_colors_for_guess(guess, word))
+
+    def test_pairs_match_reference(self) -> None:
+        """Tests that every random pair scores like the game does."""
+        for length in range(5, 16):
+            guesses = [self.random_word(length) for _ in range(500)]
+            words = [self.random_word(length) for _ in range(500)]
+            scores = score_pairs(guesses, words)
+            for guess, word, score in zip(guesses, words, scores, strict=True):
+                assert score.tolist() == self.reference(guess, word)
+
+    def test_bucket_matches_reference(self) -> None:
+        """Tests that one guess scores a whole bucket like the game does."""
+        for length in range(5, 16):
+            guess = self.random_word(length)
+            words = [self.random_word(length) for _ in range(500)]
+            scores = score_bucket(guess, words)
+            for word, score in zip(words, scores, strict=True):
+                assert score.tolist() == self.reference(guess, word)
+
+    def test_known_guess(self) -> None:
+        """Tests the example of the game tests."""
+        assert score_pairs(["zehfq"], ["hello"]).tolist() == [[4, 0, 1, 3, 2]]
+
+    def test_masks_match_reference(self) -> None:
+        """Tests that mask scoring matches char by char scoring."""
+        for length in range(5, 16):
+            for _ in range(300):
+                word = self.random_word(length).upper()
+                guess = self.random_word(length).upper()
+                masks = word_masks(word)
+                assert masks is not None
+                expected = [
+                    self.game._gen_color(guesschar, wordchar, word)  # noqa: SLF001
+                    for guesschar, wordchar in zip(guess, word, strict=True)
+                ]
+                assert masks.score(guess) == expected
+                assert masks.score(guess.lower()) is None
+
+    def test_deviation_table(self) -> None:
+        """Tests that the deviation table is symmetric and 26 by 26."""
+        assert len(DEVIATION_TABLE) == len(DEVIATION_TABLE[0]) == ALPHABET_SIZE
+        for a, row in enumerate(DEVIATION_TABLE):
+            for b, near in enumerate(row):
+                assert (
+                    near
+                    == DEVIATION_TABLE[b][a]
+                    == (abs(a - b) < DEVIATED_THRESHOLD)
+                )
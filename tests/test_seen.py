@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.storage.database import Database
+from app.storage.migrations import migrate
+from app.storage.seen import Bitmap, SeenRepo, SeenSet
+
+USER_ID = 42
+BUCKET_SIZE = 50
+
+
+class TestBitmap(unittest.TestCase):
+    """Tests for the seen bitmaps."""
+
+    def test_round_trip(self) -> None:
+        """Tests that bits survive the bytes they are stored as."""
+        bitmap = Bitmap()
+        for idx in (0, 9, 1000):
+            bitmap.add(idx)
+        restored = Bitmap(bytes(bitmap))
+        assert [idx for idx in range(1001) if idx in restored] == [0, 9, 1000]
+
+        restored.discard_all([9, 5000])
+        assert [idx for idx in (9, 1000) if idx in restored] == [1000]
+
+    def test_pick_exhausts_the_bucket(self) -> None:
+        """Tests that nothing repeats until the bucket starts over."""
+        seen = SeenSet(Bitmap())
+        bucket = range(100, 100 + BUCKET_SIZE)
+        first = [seen.pick(bucket, "bucket") for _ in range(BUCKET_SIZE)]
+        assert sorted(first) == list(bucket)
+
+        second = [seen.pick(bucket, "bucket") for _ in range(BUCKET_SIZE)]
+        assert sorted(second) == list(bucket)
+
+
+class TestSeenRepo(unittest.IsolatedAsyncioTestCase):
+    """Tests for saving the seen bitmaps."""
+
+    async def test_saved_across_restarts(self) -> None:
+        """Tests that a new repository remembers what was seen."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = Database(f"sqlite+aiosqlite:///{Path(tmpdir) / 'test.db'}")
+            await migrate(db)
+            bucket = range(BUCKET_SIZE)
+            picked = {
+                await SeenRepo(db).pick(USER_ID, SeenRepo.WORD, bucket)
+                for _ in range(BUCKET_SIZE - 1)
+            }
+            assert len(picked) == BUCKET_SIZE - 1
+
+            last = await SeenRepo(db).pick(USER_ID, SeenRepo.WORD, bucket)
+            assert picked | {last} == set(bucket)
+            await db.dispose()
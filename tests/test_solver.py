@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pytest
+from app.core.scoring import score_bucket
+from app.core.solver import (
+    PatternMatrixMissingError,
+    Solver,
+    entropies,
+    pack_patterns,
+    pack_result,
+)
+from app.word_bank import WordEntry, write_word_bank
+from app.word_generator import Difficulty, WordGenerator
+
+WORDS: dict[Difficulty, list[str]] = {
+    Difficulty.EASY: ["hello", "world", "plane", "crane"],
+    Difficulty.MEDIUM: ["zebra", "quiet"],
+    Difficulty.HARD: ["fjord"],
+}
+
+
+class TestSolver(unittest.TestCase):
+    """Tests for the pattern matrix solver."""
+
+    def setUp(self) -> None:
+        """Build the matrices of a tiny word bank."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = Path(self.tmpdir.name) / "wordbank.bin"
+        write_word_bank(
+            path,
+            WordGenerator.fingerprint(),
+            {
+                (5, difficulty.value): [
+                    WordEntry(word, "", [], []) for word in words
+                ]
+                for difficulty, words in WORDS.items()
+            },
+        )
+        self.solver = Solver(WordGenerator(path), self.tmpdir.name)
+        for difficulty in Difficulty:
+            self.solver.build(5, difficulty, workers=2)
+
+    def tearDown(self) -> None:
+        """Remove the word bank and the matrices."""
+        self.tmpdir.cleanup()
+
+    def test_matrix_matches_scoring(self) -> None:
+        """Tests that every matrix cell is the packed score of its pair."""
+        guesses = self.solver.guesses(5)
+        for difficulty, answers in WORDS.items():
+            matrix = self.solver.matrix(5, difficulty)
+            for row, guess in enumerate(guesses):
+                expected = pack_patterns(score_bucket(guess, answers))
+                assert matrix[row].tolist() == expected.tolist()
+
+    def test_rank_narrows_to_the_answer(self) -> None:
+        """Tests that the history leaves only the consistent answer."""
+        result = score_bucket("crane", ["plane"])[0].tolist()
+        ranked = self.solver.rank(5, [("CRANE", result)])
+        assert ranked[0].word == "plane"
+        assert ranked[0].possible
+
+    def test_missing_matrix(self) -> None:
+        """Tests that unknown lengths report a missing matrix."""
+        with pytest.raises(PatternMatrixMissingError):
+            self.solver.matrix(6, Difficulty.EASY)
+
+    def test_entropies(self) -> None:
+        """Tests the entropy of known pattern rows."""
+        patterns = np.array([[1, 1, 1, 1], [1, 2, 3, 4], [1, 1, 2, 2]])
+        assert entropies(patterns).tolist() == [0.0, 2.0, 1.0]
+        assert pack_result([4, 0, 1, 3, 2]) == 4 + 1 * 25 + 3 * 125 + 2 * 625
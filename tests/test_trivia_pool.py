@@ -0,0 +1,123 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+from app.models.trivia import Trivia, TriviaDifficulty
+from app.storage.database import Database, SQLiteProfile
+from app.storage.migrations import migrate, migrate_trivia
+from app.storage.seen import SeenRepo
+from app.storage.trivia import TriviaRepo
+from app.storage.trivia_pool import TriviaPool, TriviaPoolEmptyError
+from sqlalchemy import insert
+
+PREFETCH = 3
+TRIVIAS = 12
+USER_ID = 42
+
+
+class TestTriviaPool(unittest.IsolatedAsyncioTestCase):
+    """Tests for the in-memory trivia pool."""
+
+    async def asyncSetUp(self) -> None:
+        """Seed trivias, then open the file like a frozen trivia.db."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'trivia.db'}"
+        writer = Database(url, SQLiteProfile(journal_mode="DELETE"))
+        await migrate_trivia(writer)
+        async with writer.engine.begin() as conn:
+            await conn.execute(
+                insert(Trivia),
+                [
+                    {
+                        "difficulty": list(TriviaDifficulty)[idx % 3],
+                        "category": "Science" if idx % 2 else "History",
+                        "question": f"Question #{idx}?",
+                        "correct_answer": "yes",
+                        "incorrect_answer_1": "no",
+                        "incorrect_answer_2": "maybe",
+                        "incorrect_answer_3": "never",
+                    }
+                    for idx in range(TRIVIAS)
+                ],
+            )
+        await writer.dispose()
+
+        self.db = Database(url, SQLiteProfile(immutable=True))
+        self.seen_db = Database(
+            f"sqlite+aiosqlite:///{Path(self.tmpdir.name) / 'test.db'}"
+        )
+        await migrate(self.seen_db)
+        self.pool = TriviaPool(
+            TriviaRepo(self.db), SeenRepo(self.seen_db), prefetch=PREFETCH
+        )
+
+    async def asyncTearDown(self) -> None:
+        """Stop prefetching and remove the database."""
+        await self.pool.stop()
+        await self.db.dispose()
+        await self.seen_db.dispose()
+        self.tmpdir.cleanup()
+
+    async def test_buckets(self) -> None:
+        """Tests that picks stay in their difficulty and category."""
+        await self.pool.load()
+        assert len(self.pool.buckets[(None, None)]) == TRIVIAS
+        for _ in range(10):
+            trivia = await self.pool.get_random(
+                TriviaDifficulty.HARD, "Science"
+            )
+            assert trivia.difficulty == TriviaDifficulty.HARD
+            assert trivia.category == "Science"
+        with pytest.raises(TriviaPoolEmptyError):
+            self.pool.pick(TriviaDifficulty.EASY, "Geography")
+
+    async def test_prefetch(self) -> None:
+        """Tests that the queue is kept full of loaded trivias."""
+        self.pool.start()
+        for _ in range(100):
+            if self.pool.queue.full():
+                break
+            await asyncio.sleep(0.01)
+        assert self.pool.queue.qsize() == PREFETCH
+
+        trivia = await self.pool.get_random()
+        assert trivia.question.startswith("Question #")
+
+    async def test_no_repeat(self) -> None:
+        """Tests that a player sees every trivia before any repeats."""
+        self.pool.start()
+        questions = [
+            (await self.pool.get_random(user_id=USER_ID)).id
+            for _ in range(TRIVIAS)
+        ]
+        assert sorted(questions) == sorted(self.pool.buckets[(None, None)])
+
+    async def test_seen_prefetched_trivia_is_kept(self) -> None:
+        """Tests that a trivia a player has seen stays queued for others."""
+        prefetched = await self.pool.get_random()
+        self.pool.queue.put_nowait(prefetched)
+        seen = await self.pool.seen.get(USER_ID, SeenRepo.TRIVIA)
+        assert seen.take(prefetched.id)
+
+        trivia = await self.pool.get_random(user_id=USER_ID)
+        assert trivia.id != prefetched.id
+        assert self.pool.queue.get_nowait() is prefetched
+
+    async def test_create_skips_duplicates(self) -> None:
+        """Tests that creating a stored question returns the stored copy."""
+        repo = TriviaRepo(self.db)
+        stored = await repo.create(
+            Trivia(
+                difficulty=TriviaDifficulty.EASY,
+                category="History",
+                question="question #0?",
+                correct_answer="yes",
+                incorrect_answer_1="never",
+                incorrect_answer_2="no",
+                incorrect_answer_3="maybe",
+            )
+        )
+        assert stored.id == 1
+        assert stored.question == "Question #0?"
@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from dataclasses import FrozenInstanceError
+from pathlib import Path
+
+import pytest
+from app.word_bank import (
+    WordBank,
+    WordBankFormatError,
+    WordEntry,
+    write_word_bank,
+)
+from app.word_generator import (
+    Difficulty,
+    WordGenerator,
+    WordGeneratorLoader,
+    WordGeneratorNotReadyError,
+)
+
+ENTRIES: dict[tuple[int, str], list[WordEntry]] = {
+    (5, Difficulty.EASY): [
+        WordEntry("hello", "a greeting", ["hello", "hi"], ["hello there"]),
+        WordEntry("world", "the earth", ["world", "earth"], []),
+    ],
+    (5, Difficulty.MEDIUM): [],
+    (5, Difficulty.HARD): [WordEntry("zebra", "an animal", ["zebra"], [])],
+    (6, Difficulty.EASY): [
+        WordEntry("planet", "a celestial body", [], ["a distant planet"]),
+    ],
+}
+
+
+class TestWordBank(unittest.TestCase):
+    """Tests for the word bank snapshot."""
+
+    def setUp(self) -> None:
+        """Prepare a scratch directory for snapshots."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wordbank.bin"
+
+    def tearDown(self) -> None:
+        """Remove the scratch directory."""
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self) -> None:
+        """Tests that partitions and entries survive the snapshot."""
+        write_word_bank(self.path, b"\x01" * 32, ENTRIES)
+        bank = WordBank.open(self.path)
+        assert bank.fingerprint == b"\x01" * 32
+        assert len(bank) == sum(map(len, ENTRIES.values()))
+        for key, entries in ENTRIES.items():
+            ids = bank.partitions[key]
+            assert [bank.entry(idx) for idx in ids] == entries
+        bank.close()
+
+    def test_find(self) -> None:
+        """Tests that the hash index finds every word and nothing else."""
+        write_word_bank(self.path, b"\x01" * 32, ENTRIES)
+        bank = WordBank.open(self.path)
+        for idx in range(len(bank)):
+            assert bank.find(bank.word(idx)) == idx
+        assert bank.find("hellos") is None
+        bank.close()
+
+    def test_rejects_garbage(self) -> None:
+        """Tests that unknown files are reported as format errors."""
+        self.path.write_bytes(b"not a word bank at all, really not")
+        with pytest.raises(WordBankFormatError):
+            WordBank.open(self.path)
+
+    def test_word_generator_uses_snapshot(self) -> None:
+        """Tests that the generator serves words from a fresh snapshot."""
+        write_word_bank(self.path, WordGenerator.fingerprint(), ENTRIES)
+        wordgen = WordGenerator(self.path)
+
+        assert wordgen.mp_len_words[5][Difficulty.EASY] == ["hello", "world"]
+        assert wordgen.is_valid("zebra")
+        assert not wordgen.is_valid("zebras")
+        assert wordgen.random(5, Difficulty.HARD).word == "zebra"
+
+        word = wordgen.get_word("HELLO")
+        assert word.definition == "a greeting"
+        assert word.synonyms == {"hello", "hi"}
+        assert word.usages == ("hello there",)
+
+    def test_word_cache(self) -> None:
+        """Tests that hints for a picked word are served from the cache."""
+        write_word_bank(self.path, WordGenerator.fingerprint(), ENTRIES)
+        wordgen = WordGenerator(self.path)
+
+        picked = wordgen.random(6, Difficulty.EASY)
+        assert wordgen.get_word(picked.word.upper()) is picked
+        info = wordgen.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+        # the cached record is shared, it cannot be changed in place
+        with pytest.raises(FrozenInstanceError):
+            picked.word = "planes"  # type: ignore[misc]
+
+    def test_shared_mode(self) -> None:
+        """Tests that an attached generator answers from the mapped file."""
+        write_word_bank(self.path, WordGenerator.fingerprint(), ENTRIES)
+        wordgen = WordGenerator(self.path, shared=True)
+
+        assert list(wordgen.mp_len_words[5][Difficulty.EASY]) == [
+            "hello",
+            "world",
+        ]
+        assert wordgen.is_valid("planet")
+        assert not wordgen.is_valid("planets")
+        assert wordgen.get_word("World").synonyms == {"world", "earth"}
+        assert not wordgen.word_ids
+        assert not wordgen.valid_words
+
+    def test_shared_mode_never_compiles(self) -> None:
+        """Tests that attaching a stale snapshot fails instead of building."""
+        write_word_bank(self.path, b"\x00" * 32, ENTRIES)
+        with pytest.raises(WordBankFormatError):
+            WordGenerator(self.path, shared=True)
+
+
+class TestWordGeneratorLoader(unittest.IsolatedAsyncioTestCase):
+    """Tests for building the word generator in the background."""
+
+    async def test_readiness(self) -> None:
+        """Tests that the generator is only handed out once built."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "wordbank.bin"
+            write_word_bank(path, WordGenerator.fingerprint(), ENTRIES)
+            loader = WordGeneratorLoader(path)
+
+            with pytest.raises(WordGeneratorNotReadyError):
+                loader.get()
+
+            wordgen = await loader.wait()
+            assert loader.ready
+            assert loader.get() is wordgen
+            assert loader.build_seconds is not None
+            assert wordgen.is_valid("planet")
@@ -1,7 +1,12 @@
 import unittest
 from collections.abc import Generator
+from unittest import mock
 
-from app.core.wordle import WordleGame
+import pytest
+from app.core.wordle import WordleGame, WordleGameNotFoundError
+from app.storage.wordle import wordle_repo
+
+USER_ID = 42
 
 
 class TestWordleGame(unittest.TestCase):
@@ -16,3 +21,19 @@ class TestWordleGame(unittest.TestCase):
         colors = game.gen_colors_for_guess(guess, word)
         assert isinstance(colors, Generator)
         assert list(colors) == [4, 0, 1, 3, 2]
+
+
+class TestWordleGameHints(unittest.IsolatedAsyncioTestCase):
+    """Tests for the hints of Wordle Game."""
+
+    async def test_letter_hint_without_game(self) -> None:
+        """Tests that a hint without an ongoing game is a handled error."""
+        with (
+            mock.patch.object(
+                wordle_repo,
+                "get_ongoing_wordle",
+                mock.AsyncMock(return_value=None),
+            ),
+            pytest.raises(WordleGameNotFoundError),
+        ):
+            await WordleGame().get_letter_hint(USER_ID)